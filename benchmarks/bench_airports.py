@@ -0,0 +1,90 @@
+# Búsqueda de aeropuertos para autocompletar (routing/airports.py) sobre
+# códigos y ciudades sintéticos: tiempo de construcción del índice y
+# microsegundos por búsqueda, por prefijo y por texto en medio del nombre,
+# contra recorrer la lista completa comparando cada texto normalizado, que es
+# también la referencia para verificar los resultados.
+#
+# Uso: python benchmarks/bench_airports.py [aeropuertos] [consultas] [máximo de resultados]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routing import AirportIndex
+from routing.airports import normalize
+from synthetic import airport_code, city_name
+
+
+def scan(codes, names, query, limit):
+    # Referencia: el mismo orden de search() recorriendo todos los aeropuertos
+    query = normalize(query)
+    tiers = [[], [], [], []]
+    for node, (code, name) in enumerate(zip(codes, names)):
+        words = [name[i:] for i in range(1, len(name)) if name[i - 1] in " -(/" and name[i] not in " -(/"]
+        if code.startswith(query):
+            tiers[0].append((code, node))
+        elif name.startswith(query):
+            tiers[1].append((name, node))
+        elif any(word.startswith(query) for word in words):
+            tiers[2].append((min(word for word in words if word.startswith(query)), node))
+        elif query in code or query in name:
+            tiers[3].append((node, node))
+    found = [node for tier in tiers for _, node in sorted(tier)]
+    return found[:limit]
+
+
+def make_queries(rng, codes, names, num_queries):
+    # Lo que se llevaría escrito: comienzos de códigos, de ciudades y de
+    # palabras, y trozos del medio del nombre, con mayúsculas y sin acentos
+    queries = {"prefijo": [], "en medio": []}
+    for _ in range(num_queries):
+        node = rng.randrange(len(codes))
+        name = names[node]
+        kind = rng.random()
+        if kind < 0.2:
+            queries["prefijo"].append(codes[node][:rng.randint(1, len(codes[node]))])
+        elif kind < 0.6:
+            word = name.split()[-1]
+            queries["prefijo"].append(normalize(word[:rng.randint(1, len(word))]).upper())
+        else:
+            start = rng.randrange(1, len(name) - 2)
+            queries["en medio"].append(name[start:start + rng.randint(3, 5)])
+    return queries
+
+
+def run(num_airports, num_queries, limit):
+    rng = random.Random(9)
+    codes = [airport_code(i) for i in range(num_airports)]
+    names = [city_name(rng) for _ in range(num_airports)]
+    t0 = time.perf_counter()
+    index = AirportIndex(codes, dict(zip(codes, names)))
+    built = time.perf_counter() - t0
+    print(f"{num_airports} aeropuertos: índice construido en {built:.2f} s "
+          f"({index.gram_keys.size} n-gramas, {len(index.word_keys[0])} palabras)")
+
+    normalized = [normalize(name) for name in names]
+    lowered = [code.lower() for code in codes]
+    for kind, texts in make_queries(rng, codes, names, num_queries).items():
+        samples = []
+        for text in texts:
+            t0 = time.perf_counter()
+            index.search(text, limit)
+            samples.append(time.perf_counter() - t0)
+        samples.sort()
+        checked = texts[:5]
+        t0 = time.perf_counter()
+        for text in checked:
+            assert index.search(text, limit) == scan(lowered, normalized, text, limit), text
+        plain = (time.perf_counter() - t0) / len(checked)
+        print(f"  {kind:<9} p50 {samples[len(samples) // 2] * 1e6:>8.1f} µs  "
+              f"p99 {samples[int(len(samples) * 0.99)] * 1e6:>8.1f} µs  ({len(texts)} consultas; "
+              f"recorrer la lista: {plain * 1000:.0f} ms por consulta, mismos resultados)")
+
+
+if __name__ == "__main__":
+    num_airports = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    limit = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+    run(num_airports, num_queries, limit)
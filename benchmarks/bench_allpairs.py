@@ -0,0 +1,58 @@
+# Medir la tabla precalculada de todas las rutas (routing/allpairs.py):
+# tiempo de construcción según la cantidad de procesos, tamaño del archivo
+# y latencia de una consulta frente a Graph.dijkstra.
+#
+# Uso: python benchmarks/bench_allpairs.py [aeropuertos] [consultas] [procesos...]
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routing import DirectedGraph, Graph, QueryCache
+from synthetic import random_network
+
+
+def run(graph_cls, num_airports, num_queries, worker_counts):
+    graph = graph_cls()
+    codes = random_network(graph, num_airports)
+    graph.cache = QueryCache(max_entries=0, max_tree_bytes=0)  # Medir los motores, no la caché
+    rng = random.Random(5)
+    queries = [(rng.choice(codes), rng.choice(codes), rng.random() < 0.5) for _ in range(num_queries)]
+    t0 = time.perf_counter()
+    expected = [graph.dijkstra(*query)[1:] for query in queries]
+    search_time = time.perf_counter() - t0
+
+    print(f"{graph_cls.__name__}: {num_airports} aeropuertos, {os.cpu_count()} núcleos")
+    filename = os.path.join(tempfile.mkdtemp(), "rutas.apsp")
+    baseline = None
+    for workers in worker_counts:
+        graph = graph_cls()
+        random_network(graph, num_airports)
+        graph.cache = QueryCache(max_entries=0, max_tree_bytes=0)
+        if os.path.exists(filename):
+            os.remove(filename)
+        t0 = time.perf_counter()
+        table = graph.prepare_route_table(filename, workers=workers)
+        build_time = time.perf_counter() - t0
+        baseline = baseline or build_time
+        print(f"  construcción con {workers:>2} proceso{'s' if workers > 1 else ' '}  {build_time:>8.2f} s"
+              f"   (x{baseline / build_time:.2f})")
+
+    t0 = time.perf_counter()
+    results = [graph.dijkstra(*query)[1:] for query in queries]
+    table_time = time.perf_counter() - t0
+    assert results == expected
+    print(f"  archivo {os.path.getsize(filename) / 2**20:.1f} MiB ({table.nbytes() / 2**20:.1f} MiB de matrices)")
+    print(f"  Graph.dijkstra  {search_time / num_queries * 1000:>9.3f} ms/consulta")
+    print(f"  tabla           {table_time / num_queries * 1000:>9.3f} ms/consulta (resultados verificados)")
+
+
+if __name__ == "__main__":
+    num_airports = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    worker_counts = [int(arg) for arg in sys.argv[3:]] or sorted({1, 2, 4, os.cpu_count()})
+    run(Graph, num_airports, num_queries, worker_counts)
+    run(DirectedGraph, num_airports, num_queries, worker_counts)
@@ -0,0 +1,82 @@
+# Medir qué tan trabada queda la interfaz durante una búsqueda: un bucle que
+# imita al de Tk (un tic cada POLL_MS, como poll_search) mide la pausa más
+# larga entre tics con la búsqueda en el mismo hilo y con SearchWorker. También
+# mide cuánto tarda una búsqueda nueva en reemplazar a otra que sigue corriendo.
+#
+# Uso: python benchmarks/bench_background.py [aeropuertos] [consultas]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routing import DirectedGraph, Graph, QueryCache, SearchWorker
+from synthetic import random_network
+
+POLL_MS = 50
+
+
+def event_loop(worker, timeout=120):
+    # Tics hasta que el hilo de fondo termina; devuelve la pausa más larga (s)
+    longest = 0.0
+    last = time.perf_counter()
+    deadline = last + timeout
+    while worker.poll() and last < deadline:
+        time.sleep(POLL_MS / 1000)
+        now = time.perf_counter()
+        longest = max(longest, now - last)
+        last = now
+    return longest
+
+
+def run(graph_cls, num_airports, num_queries):
+    graph = graph_cls()
+    codes = random_network(graph, num_airports)
+    graph.cache = QueryCache(max_entries=0, max_tree_bytes=0)  # Medir búsquedas completas
+    graph.view(False)
+    rng = random.Random(4)
+    queries = [(rng.choice(codes), rng.choice(codes), rng.random() < 0.5) for _ in range(num_queries)]
+
+    expected, elapsed = [], []
+    for query in queries:
+        t0 = time.perf_counter()
+        expected.append(graph.dijkstra(*query))
+        elapsed.append(time.perf_counter() - t0)
+    blocking = sum(elapsed) / num_queries
+
+    worker = SearchWorker()
+    results = []
+    stalls = []
+    for query in queries:
+        worker.submit(lambda query=query: graph.dijkstra(*query), lambda result, error: results.append(result))
+        stalls.append(event_loop(worker))
+    assert results == expected
+
+    # Reemplazo: la segunda consulta llega cuando la primera lleva medio camino;
+    # se mide la espera que agrega la primera sobre lo que tarda la segunda sola
+    waits = []
+    for i, (first, second) in enumerate(zip(queries, queries[1:])):
+        done = []
+        worker.submit(lambda: graph.dijkstra(*first), lambda result, error: done.append(result))
+        time.sleep(elapsed[i] / 2)
+        t0 = time.perf_counter()
+        worker.submit(lambda: graph.dijkstra(*second), lambda result, error: done.append(result))
+        while worker.poll():
+            time.sleep(0.001)
+        waits.append(time.perf_counter() - t0 - elapsed[i + 1])
+        assert done == [expected[i + 1]]
+    worker.close()
+
+    print(f"{graph_cls.__name__}: {num_airports} aeropuertos, {num_queries} consultas")
+    print(f"  en el hilo de Tk: interfaz trabada {blocking * 1000:>8.1f} ms por búsqueda")
+    print(f"  con SearchWorker: pausa máxima     {max(stalls) * 1000:>8.1f} ms entre tics de {POLL_MS} ms")
+    print(f"  búsqueda nueva con otra a medias:  {sorted(waits)[len(waits) // 2] * 1000:>8.1f} ms de espera extra "
+          f"(mediana; sin cancelar serían {sorted(elapsed)[num_queries // 2] * 500:.1f} ms)")
+
+
+if __name__ == "__main__":
+    num_airports = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    run(Graph, num_airports, num_queries)
+    run(DirectedGraph, num_airports, num_queries)
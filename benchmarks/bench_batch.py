@@ -0,0 +1,49 @@
+# Comparar una llamada a Graph.dijkstra por par contra el lote agrupado por
+# origen (un árbol por origen y modo de visa), en uno y varios procesos.
+#
+# Uso: python benchmarks/bench_batch.py [aeropuertos] [consultas] [orígenes] [procesos]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routing import DirectedGraph, Graph, QueryCache
+from synthetic import random_network
+
+
+def run(graph_cls, num_airports, num_queries, num_origins, workers):
+    graph = graph_cls()
+    codes = random_network(graph, num_airports)
+    graph.cache = QueryCache(max_entries=0, max_tree_bytes=0)
+    rng = random.Random(5)
+    origins = rng.sample(codes, num_origins)
+    queries = [(rng.choice(origins), rng.choice(codes), rng.random() < 0.5) for _ in range(num_queries)]
+    graph.view(False)
+
+    t0 = time.perf_counter()
+    expected = [graph.dijkstra(*query) for query in queries]
+    single = time.perf_counter() - t0
+
+    timings = {}
+    for label, pool_size in (("lote", None), (f"lote x{workers}", workers)):
+        t0 = time.perf_counter()
+        results = list(graph.dijkstra_many(queries, workers=pool_size))
+        timings[label] = time.perf_counter() - t0
+        assert [r[1] for r in results] == [e[1] for e in expected]
+
+    print(f"{graph_cls.__name__}: {num_airports} aeropuertos, {num_queries} consultas, "
+          f"{num_origins} orígenes (costos verificados)")
+    print(f"  una por par    {single:>8.2f} s")
+    for label, seconds in timings.items():
+        print(f"  {label:<14} {seconds:>8.2f} s")
+
+
+if __name__ == "__main__":
+    num_airports = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    num_origins = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    workers = int(sys.argv[4]) if len(sys.argv) > 4 else 4
+    run(Graph, num_airports, num_queries, num_origins, workers)
+    run(DirectedGraph, num_airports, num_queries, num_origins, workers)
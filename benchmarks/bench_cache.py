@@ -0,0 +1,60 @@
+# Medir el caché de consultas con una carga repetitiva como la del front-end:
+# pocos orígenes, muchos destinos y pares repetidos.
+#
+# Uso: python benchmarks/bench_cache.py [aeropuertos] [consultas]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routing import DirectedGraph, Graph, QueryCache
+from synthetic import random_network
+
+
+def workload(codes, num_queries, seed=11):
+    rng = random.Random(seed)
+    origins = rng.sample(codes, 5)
+    destinations = rng.sample(codes, 50)
+    return [(rng.choice(origins), rng.choice(destinations), rng.random() < 0.5, rng.random() < 0.5)
+            for _ in range(num_queries)]
+
+
+def answer(graph, start, end, has_visa, by_scales):
+    if by_scales:
+        return graph.dijkstra_min_scales(start, end, has_visa)
+    return graph.dijkstra(start, end, has_visa)[:2]
+
+
+def run(graph_cls, num_airports, num_queries):
+    graph = graph_cls()
+    codes = random_network(graph, num_airports)
+    queries = workload(codes, num_queries)
+    graph.freeze()
+    graph.view(False)
+
+    graph.cache = QueryCache(max_entries=0, max_tree_bytes=0)
+    t0 = time.perf_counter()
+    expected = [answer(graph, *query) for query in queries]
+    uncached = time.perf_counter() - t0
+
+    graph.cache = QueryCache()
+    t0 = time.perf_counter()
+    results = [answer(graph, *query) for query in queries]
+    cached = time.perf_counter() - t0
+
+    assert [r[1] for r in results] == [e[1] for e in expected]
+    stats = graph.cache.stats()
+    print(f"{graph_cls.__name__}: {num_airports} aeropuertos, {num_queries} consultas (costos verificados)")
+    print(f"  sin caché   {uncached / num_queries * 1000:>9.2f} ms/consulta")
+    print(f"  con caché   {cached / num_queries * 1000:>9.2f} ms/consulta")
+    print(f"  aciertos {stats['hits']}, fallos {stats['misses']} "
+          f"({stats['tree_hits']} resueltos con árboles, {stats['trees']} árboles guardados)")
+
+
+if __name__ == "__main__":
+    num_airports = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    run(Graph, num_airports, num_queries)
+    run(DirectedGraph, num_airports, num_queries)
@@ -0,0 +1,77 @@
+# La línea de comandos por lotes (routing/cli.py) sobre una red de aerolínea
+# sintética: consultas por segundo en uno y varios procesos, y memoria máxima
+# del proceso principal con archivos de consultas de distinto tamaño. Con
+# varios procesos debería ser la misma (se lee y escribe por bloques); en un
+# solo proceso además crece el caché de consultas del grafo, hasta su límite.
+# Cada corrida es un proceso aparte que escribe las respuestas a disco.
+#
+# Uso: python benchmarks/bench_cli.py [aeropuertos] [consultas] [procesos]
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import write_network
+
+# Corre la CLI y agrega al final de stderr la memoria máxima del proceso (KiB)
+RUNNER = ("import resource, sys\nfrom routing.cli import main\n"
+          "try:\n    main(sys.argv[1:])\n"
+          "finally:\n    print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, file=sys.stderr)")
+
+
+def write_queries(filename, codes, num_queries, seed=3):
+    # Mitad CSV y mitad JSON lines, con ambos criterios y ambos modos de visa
+    rng = random.Random(seed)
+    with open(filename, 'w', encoding='utf-8') as file:
+        for i in range(num_queries):
+            origin, destination = rng.choice(codes), rng.choice(codes)
+            has_visa, criterion = rng.random() < 0.5, rng.choice(("cost", "stops"))
+            if i % 2:
+                file.write(json.dumps({"origin": origin, "destination": destination, "visa": has_visa,
+                                       "criterion": criterion}) + "\n")
+            else:
+                file.write(f"{origin},{destination},{int(has_visa)},{criterion}\n")
+
+
+def run_cli(directory, queries_file, directed, workers):
+    args = [sys.executable, "-c", RUNNER, queries_file, "-o", os.path.join(directory, "respuestas.jsonl"),
+            "--routes", os.path.join(directory, "caminos.txt"), "--visa", os.path.join(directory, "visa_requirements.txt"),
+            "--workers", str(workers)] + (["--directed"] if directed else [])
+    t0 = time.perf_counter()
+    done = subprocess.run(args, capture_output=True, text=True, env=dict(os.environ, PYTHONPATH=ROOT), check=True)
+    elapsed = time.perf_counter() - t0
+    report = done.stderr.strip().splitlines()
+    with open(os.path.join(directory, "respuestas.jsonl"), encoding='utf-8') as file:
+        answers = sum(1 for _ in file)
+    return elapsed, int(report[-1]) / 1024, report[0], answers
+
+
+def run(num_airports, num_queries, workers):
+    for directed in (False, True):
+        directory = tempfile.mkdtemp()
+        write_network(directory, "hub", num_airports, directed=directed)
+        with open(os.path.join(directory, "visa_requirements.txt"), encoding='utf-8') as file:
+            codes = [line.split(",")[0] for line in file]
+        print(f"{'DirectedGraph' if directed else 'Graph'}: {num_airports} aeropuertos")
+        run_cli(directory, os.devnull, directed, 1)  # Compilar el snapshot antes de medir
+        for size in (num_queries // 10, num_queries):
+            queries_file = os.path.join(directory, f"consultas-{size}.txt")
+            write_queries(queries_file, codes, size)
+            for pool_size in sorted({1, workers}):
+                elapsed, peak_mib, report, answers = run_cli(directory, queries_file, directed, pool_size)
+                assert answers == size
+                print(f"  {size:>7} consultas, {pool_size} proceso{'s' if pool_size != 1 else ' '}: "
+                      f"{elapsed:>6.2f} s en total, memoria máxima {peak_mib:>6.1f} MiB   [{report}]")
+
+
+if __name__ == "__main__":
+    num_airports = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else max(2, os.cpu_count() or 1)
+    run(num_airports, num_queries, workers)
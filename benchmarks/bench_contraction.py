@@ -0,0 +1,62 @@
+# Jerarquías de contracción: tiempo de preproceso, memoria extra y consultas
+# punto a punto (costo y escalas) contra Dijkstra sin preproceso.
+#
+# Uso: python benchmarks/bench_contraction.py [aeropuertos] [consultas] [red: hub|geometric|random]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routing import DirectedGraph, Graph, QueryCache
+from synthetic import geometric_network, hub_network, random_network
+
+NETWORKS = {"hub": hub_network, "geometric": geometric_network, "random": random_network}
+
+
+def run(graph_cls, network, num_airports, num_queries):
+    graph = graph_cls()
+    NETWORKS[network](graph, num_airports)
+    codes = graph.airports()
+    rng = random.Random(7)
+    for code in codes:
+        graph.set_visa_requirement(code, "Requiere Visa" if rng.random() < 0.2 else "No Requiere Visa")
+    graph.cache = QueryCache(max_entries=0, max_tree_bytes=0)  # Medir los motores, no la caché
+    queries = [(*rng.sample(codes, 2), rng.random() < 0.5) for _ in range(num_queries)]
+
+    t0 = time.perf_counter()
+    graph.prepare_hierarchies()
+    preprocess = time.perf_counter() - t0
+    hierarchies = [graph.hierarchy(has_visa, unit_weights) for has_visa in (False, True) for unit_weights in (False, True)]
+    extra = sum(hierarchy.nbytes() for hierarchy in hierarchies)
+    base = graph.view(False).nbytes() + graph.view(True).nbytes()
+
+    timings = {}
+    for use_hierarchies in (False, True):
+        graph.use_hierarchies = use_hierarchies
+        t0 = time.perf_counter()
+        costs = [graph.dijkstra(*query)[1] for query in queries]
+        t1 = time.perf_counter()
+        scales = [graph.dijkstra_min_scales(*query)[1] for query in queries]
+        t2 = time.perf_counter()
+        timings[use_hierarchies] = (costs, scales, t1 - t0, t2 - t1)
+    assert timings[False][:2] == timings[True][:2]
+
+    print(f"{graph_cls.__name__} ({network}): {num_airports} aeropuertos, {num_queries} consultas")
+    print(f"  preproceso (4 jerarquías) {preprocess:>9.1f} s")
+    print(f"  atajos                    {', '.join(str(h.num_shortcuts) for h in hierarchies)}")
+    print(f"  núcleo sin contraer       {', '.join(str(h.core_size) for h in hierarchies)} nodos")
+    print(f"  memoria extra             {extra / 2 ** 20:>9.1f} MiB (vistas: {base / 2 ** 20:.1f} MiB)")
+    for label, index in (("costo mínimo", 2), ("mínimo de escalas", 3)):
+        plain, contracted = timings[False][index], timings[True][index]
+        print(f"  {label:<18} Dijkstra {plain / num_queries * 1000:>8.2f} ms  "
+              f"jerarquía {contracted / num_queries * 1000:>7.2f} ms  ({plain / contracted:.0f}x)")
+
+
+if __name__ == "__main__":
+    num_airports = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    network = sys.argv[3] if len(sys.argv) > 3 else "hub"
+    run(Graph, network, num_airports, num_queries)
+    run(DirectedGraph, network, num_airports, num_queries)
@@ -0,0 +1,51 @@
+# Comparar la búsqueda completa sobre todo el grafo con la parada temprana
+# y la búsqueda bidireccional, verificando que los costos coincidan.
+#
+# Uso: python benchmarks/bench_engine.py [aeropuertos] [consultas]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routing import DirectedGraph, Graph
+from routing.cache import QueryCache
+from routing.engine import dijkstra
+from synthetic import random_network
+
+
+def run(graph_cls, num_airports, num_queries):
+    graph = graph_cls()
+    codes = random_network(graph, num_airports)
+    graph.cache = QueryCache(max_entries=0, max_tree_bytes=0)  # medir el motor, no el caché
+    rng = random.Random(7)
+    pairs = [(rng.choice(codes), rng.choice(codes)) for _ in range(num_queries)]
+    frozen = graph.freeze()
+    timings = {"completa": 0.0, "parada temprana": 0.0, "bidireccional": 0.0}
+
+    for start, end in pairs:
+        t0 = time.perf_counter()
+        reference = dijkstra(frozen, frozen.ids[start]).distances[frozen.ids[end]]
+        timings["completa"] += time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        _, early, _ = graph.dijkstra(start, end, True)
+        timings["parada temprana"] += time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        _, both, _ = graph.dijkstra(start, end, True, bidirectional=True)
+        timings["bidireccional"] += time.perf_counter() - t0
+
+        assert early == reference and both == reference, (start, end, reference, early, both)
+
+    print(f"{graph_cls.__name__}: {num_airports} aeropuertos, {num_queries} consultas (costos verificados)")
+    for name, seconds in timings.items():
+        print(f"  {name:<16}{seconds / num_queries * 1000:>10.2f} ms/consulta")
+
+
+if __name__ == "__main__":
+    num_airports = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    run(Graph, num_airports, num_queries)
+    run(DirectedGraph, num_airports, num_queries)
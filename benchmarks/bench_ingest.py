@@ -0,0 +1,65 @@
+# Comparar la carga línea por línea de caminos.txt (add_edge por tramo y un
+# set de tuplas de cadenas para los repetidos) con la carga por bloques.
+#
+# Uso: python benchmarks/bench_ingest.py [aristas] [aeropuertos]
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routing import DirectedGraph, Graph
+from synthetic import write_route_files
+
+
+def legacy_load(graph, filename):
+    # load_routes de proyecto.py antes de la carga por bloques
+    added_edges = set()
+    with open(filename, 'r') as archivo:
+        for linea in archivo:
+            origen, destino, peso = linea.strip().split(',')
+            if graph.directed or ((origen, destino) not in added_edges and (destino, origen) not in added_edges):
+                graph.add_edge(origen, destino, float(peso))
+                added_edges.add((origen, destino))
+    return graph.freeze()
+
+
+def streamed_load(graph, filename):
+    graph.load_routes(filename)
+    return graph.freeze()
+
+
+def measure(load, graph_cls, filename):
+    t0 = time.perf_counter()
+    frozen = load(graph_cls(), filename)
+    seconds = time.perf_counter() - t0
+    num_edges = frozen.num_edges
+    del frozen
+
+    tracemalloc.start()
+    load(graph_cls(), filename)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak, num_edges
+
+
+def run(num_edges, num_airports):
+    with tempfile.TemporaryDirectory() as directory:
+        routes_file, _ = write_route_files(directory, num_edges, num_airports)
+        for graph_cls in (Graph, DirectedGraph):
+            print(f"{graph_cls.__name__}: {num_edges} líneas, {num_airports} aeropuertos")
+            results = {}
+            for name, load in (("línea por línea", legacy_load), ("por bloques", streamed_load)):
+                seconds, peak, edges = measure(load, graph_cls, routes_file)
+                results[name] = edges
+                print(f"  {name:<16}{seconds:>8.2f} s  {num_edges / seconds / 1e6:>6.2f} M líneas/s"
+                      f"  pico {peak / 2**20:>8.1f} MiB")
+            assert len(set(results.values())) == 1, results
+
+
+if __name__ == "__main__":
+    num_edges = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    num_airports = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+    run(num_edges, num_airports)
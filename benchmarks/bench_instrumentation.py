@@ -0,0 +1,124 @@
+# Costo de la instrumentación por consulta (routing/instrumentation.py):
+# el bucle de Dijkstra tal como era antes de los contadores contra
+# engine.dijkstra sin observadores (lo que paga todo el mundo), y Graph.search
+# sin observadores, con un Profiler y con el Profiler escribiendo JSON lines.
+# Las variantes se alternan en cada ronda y de cada una se toma la mejor.
+#
+# Uso: python benchmarks/bench_instrumentation.py [aeropuertos] [consultas] [rondas]
+import heapq
+import os
+import random
+import sys
+import tempfile
+import time
+from itertools import repeat
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routing import DirectedGraph, Graph, Profiler, QueryCache
+from routing.csr import INF
+from routing.engine import dijkstra
+from synthetic import random_network
+
+
+def plain_dijkstra(csr, source, target=-1, unit_weights=False):
+    # engine.dijkstra antes de la instrumentación y la cancelación
+    ws = csr.workspace()
+    distances, parents, settled, touched = ws.distances, ws.parents, ws.settled, ws.touched
+    indptr, indices, weights = csr.indptr, csr.indices, csr.weights
+
+    distances[source] = 0
+    touched.append(source)
+    pq = [(0, source)]
+
+    while pq:
+        current_distance, current_node = heapq.heappop(pq)
+        if settled[current_node]:
+            continue
+        settled[current_node] = 1
+        if current_node == target:
+            break
+
+        start, stop = indptr[current_node], indptr[current_node + 1]
+        steps = repeat(1) if unit_weights else weights[start:stop].tolist()
+        for neighbor, weight in zip(indices[start:stop].tolist(), steps):
+            if settled[neighbor]:
+                continue
+            distance = current_distance + weight
+            if distance < distances[neighbor]:
+                if distances[neighbor] == INF:
+                    touched.append(neighbor)
+                distances[neighbor] = distance
+                parents[neighbor] = current_node
+                heapq.heappush(pq, (distance, neighbor))
+
+    return ws
+
+
+def timed(variants, rounds):
+    # variants: {nombre: (preparar, función, consultas)}; mejor tiempo por consulta
+    best = dict.fromkeys(variants, INF)
+    for _ in range(rounds):
+        for name, (prepare, function, queries) in variants.items():
+            finish = prepare()
+            t0 = time.perf_counter()
+            for query in queries:
+                function(*query)
+            best[name] = min(best[name], (time.perf_counter() - t0) / len(queries))
+            finish()
+    return best
+
+
+def run(graph_cls, num_airports, num_queries, rounds):
+    graph = graph_cls()
+    codes = random_network(graph, num_airports)
+    graph.cache = QueryCache(max_entries=0, max_tree_bytes=0)  # Cada consulta es una búsqueda completa
+    rng = random.Random(8)
+    queries = [(rng.choice(codes), rng.choice(codes), rng.random() < 0.5) for _ in range(num_queries)]
+    views = (graph.view(False), graph.view(True))
+    id_queries = [(views[has_visa], views[has_visa].ids[start], views[has_visa].ids[end])
+                  for start, end, has_visa in queries]
+
+    profiler = Profiler()
+    filename = os.path.join(tempfile.mkdtemp(), "consultas.jsonl")
+    writers = []
+
+    def observe(observer_factory):
+        def prepare():
+            observer = graph.add_observer(observer_factory())
+            return lambda: graph.remove_observer(observer)
+        return prepare
+
+    def with_writer():
+        writers.append(Profiler(filename))
+        return writers[-1]
+
+    nothing = lambda: lambda: None  # noqa: E731
+    best = timed({"plain": (nothing, plain_dijkstra, id_queries),
+                  "engine": (nothing, dijkstra, id_queries),
+                  "search": (nothing, graph.search, queries),
+                  "profiler": (observe(lambda: profiler), graph.search, queries),
+                  "jsonl": (observe(with_writer), graph.search, queries)}, rounds)
+    for writer in writers:
+        writer.close()
+    os.remove(filename)
+
+    print(f"{graph_cls.__name__}: {num_airports} aeropuertos, {num_queries} consultas, mejor de {rounds} rondas")
+    for name, label, reference in (("plain", "bucle sin instrumentar", None),
+                                   ("engine", "engine.dijkstra, desactivada", "plain"),
+                                   ("search", "Graph.search, desactivada", None),
+                                   ("profiler", "Graph.search + Profiler", "search"),
+                                   ("jsonl", "Graph.search + JSON lines", "search")):
+        note = f"   ({(best[name] / best[reference] - 1) * 100:+.1f} %)" if reference else ""
+        print(f"  {label:<30}{best[name] * 1000:>8.3f} ms/consulta{note}")
+    histograms = profiler.summary()["histograms"]["cost"]
+    print(f"  por consulta (p50): {histograms['settled']['p50']} asentados, "
+          f"{histograms['relaxed']['p50']} aristas, {histograms['pushes']['p50']} inserciones al montículo")
+
+
+if __name__ == "__main__":
+    num_airports = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    rounds = int(sys.argv[3]) if len(sys.argv) > 3 else 7
+    run(Graph, num_airports, num_queries, rounds)
+    run(DirectedGraph, num_airports, num_queries, rounds)
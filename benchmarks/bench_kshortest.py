@@ -0,0 +1,75 @@
+# Medir las k rutas alternativas (Yen) para k = 1..50 en una red sintética
+# grande: desvíos con A* sobre el árbol inverso compartido contra desvíos
+# con Dijkstra desde cero (potencial cero), que es el Yen de libro.
+#
+# Uso: python benchmarks/bench_kshortest.py [aeropuertos] [consultas] [k máximo de la base]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routing import DirectedGraph, Graph
+from routing.kshortest import distances_to, yen_paths
+from synthetic import random_network
+
+CHECKPOINTS = (1, 2, 5, 10, 20, 50)
+
+
+class Zero:
+    # Potencial nulo: A* se comporta como Dijkstra
+    def __getitem__(self, node):
+        return 0
+
+
+def timed(generator, limit):
+    # Tiempo acumulado hasta obtener la k-ésima ruta, para cada k de CHECKPOINTS
+    marks = {}
+    costs = []
+    t0 = time.perf_counter()
+    for k, (cost, _) in enumerate(generator, 1):
+        costs.append(cost)
+        if k in CHECKPOINTS:
+            marks[k] = time.perf_counter() - t0
+        if k == limit:
+            break
+    return marks, costs
+
+
+def run(graph_cls, num_airports, num_queries, baseline_k):
+    graph = graph_cls()
+    codes = random_network(graph, num_airports, visa_share=0.3)
+    view = graph.view(True)
+    rng = random.Random(11)
+    queries = [tuple(view.ids[code] for code in rng.sample(codes, 2)) for _ in range(num_queries)]
+
+    tree = {k: 0.0 for k in CHECKPOINTS}
+    plain = {k: 0.0 for k in CHECKPOINTS if k <= baseline_k}
+    reverse = 0.0
+    for source, target in queries:
+        t0 = time.perf_counter()
+        potential = distances_to(view, target)
+        reverse += time.perf_counter() - t0
+        marks, costs = timed(yen_paths(view, source, target, potential), CHECKPOINTS[-1])
+        for k in tree:
+            tree[k] += marks.get(k, 0.0)
+        marks, expected = timed(yen_paths(view, source, target, Zero()), baseline_k)
+        for k in plain:
+            plain[k] += marks.get(k, 0.0)
+        assert costs[:baseline_k] == expected
+
+    print(f"{graph_cls.__name__}: {num_airports} aeropuertos, {num_queries} consultas con visa")
+    print(f"  árbol inverso (una vez)   {reverse / num_queries * 1000:>9.1f} ms/consulta")
+    print(f"  {'k':>4} {'árbol + A*':>14} {'Dijkstra':>14}")
+    for k in CHECKPOINTS:
+        base = f"{plain[k] / num_queries * 1000:>11.1f} ms" if k in plain else f"{'-':>14}"
+        print(f"  {k:>4} {(tree[k] + reverse) / num_queries * 1000:>11.1f} ms {base}")
+
+
+if __name__ == "__main__":
+    num_airports = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    baseline_k = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    run(Graph, num_airports, num_queries, baseline_k)
+    run(DirectedGraph, num_airports, num_queries, baseline_k)
@@ -0,0 +1,70 @@
+# A* con landmarks (ALT) contra Dijkstra con parada temprana: nodos
+# asentados y tiempo por consulta, preproceso de cada estrategia de
+# selección y tamaño de las tablas en disco.
+#
+# Uso: python benchmarks/bench_landmarks.py [aeropuertos] [consultas] [landmarks]
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routing import DirectedGraph, Graph
+from routing.engine import astar, dijkstra, settled_count
+from routing.landmarks import LandmarkTable, save_tables
+from synthetic import geometric_network
+
+
+def measure(view, queries, unit_weights, table=None):
+    # (nodos asentados promedio, ms por consulta, distancias)
+    settled = 0
+    found = []
+    t0 = time.perf_counter()
+    for source, target in queries:
+        if table is None:
+            ws = dijkstra(view, source, target, unit_weights)
+        else:
+            ws = astar(view, source, target, table.potential(target), unit_weights)
+        settled += settled_count(ws)
+        found.append(ws.distances[target])
+    elapsed = time.perf_counter() - t0
+    return settled / len(queries), elapsed / len(queries) * 1000, found
+
+
+def run(graph_cls, num_airports, num_queries, count):
+    graph = graph_cls()
+    geometric_network(graph, num_airports)
+    view = graph.view(True)
+    rng = random.Random(9)
+    queries = [(rng.randrange(view.num_nodes), rng.randrange(view.num_nodes)) for _ in range(num_queries)]
+
+    print(f"{graph_cls.__name__}: {num_airports} aeropuertos, {num_queries} consultas, {count} landmarks")
+    for unit_weights, label in ((False, "costo"), (True, "escalas")):
+        settled, elapsed, expected = measure(view, queries, unit_weights)
+        print(f"  {label:<8} Dijkstra          {settled:>9.0f} asentados  {elapsed:>8.1f} ms")
+        for strategy in ("farthest", "avoid"):
+            t0 = time.perf_counter()
+            table = LandmarkTable.build(view, count, strategy, unit_weights)
+            build = time.perf_counter() - t0
+            settled, elapsed, found = measure(view, queries, unit_weights, table)
+            assert found == expected
+            source, target = queries[0]
+            lazy, full = table.potential(target), table.lower_bounds(target)
+            astar(view, source, target, lazy, unit_weights)
+            assert all(bound == full[node] for node, bound in lazy.items())
+            with tempfile.TemporaryDirectory() as directory:
+                filename = os.path.join(directory, "landmarks.npz")
+                save_tables(filename, {"tabla": table})
+                on_disk = os.path.getsize(filename)
+            print(f"  {label:<8} ALT {strategy:<13} {settled:>9.0f} asentados  {elapsed:>8.1f} ms"
+                  f"  (preproceso {build:.1f} s, {table.forward.dtype}, {on_disk / 2 ** 20:.1f} MiB en disco)")
+
+
+if __name__ == "__main__":
+    num_airports = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    count = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    run(Graph, num_airports, num_queries, count)
+    run(DirectedGraph, num_airports, num_queries, count)
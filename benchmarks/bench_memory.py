@@ -0,0 +1,55 @@
+# Comparar la memoria de graph_dict (dict de listas de tuplas) con la forma
+# CSR congelada para ambas variantes del grafo.
+#
+# Uso: python benchmarks/bench_memory.py [aeropuertos]
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routing import DirectedGraph, Graph
+from synthetic import random_network
+
+
+def traced(build):
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def run(graph_cls, num_airports):
+    graph = graph_cls()
+    random_network(graph, num_airports)
+    visa_requirements, graph.visa_requirements = graph.visa_requirements, {}
+
+    # Reconstruir graph_dict bajo tracemalloc para medir solo la adyacencia
+    edges = [(node, neighbor, weight) for node, neighbors in graph.graph_dict.items()
+             for neighbor, weight in neighbors]
+    adjacency, dict_bytes = traced(lambda: _rebuild(edges))
+    frozen, csr_bytes = traced(lambda: graph.freeze())
+    graph.visa_requirements = visa_requirements
+
+    num_edges = frozen.num_edges
+    print(f"{graph_cls.__name__}: {num_airports} aeropuertos, {num_edges} aristas dirigidas")
+    print(f"  dict de listas {dict_bytes / 2**20:>9.1f} MiB  ({dict_bytes / num_edges:.0f} B/arista)")
+    print(f"  CSR (total)    {csr_bytes / 2**20:>9.1f} MiB  ({csr_bytes / num_edges:.0f} B/arista)")
+    print(f"  CSR (arreglos) {frozen.nbytes() / 2**20:>9.1f} MiB  ({frozen.nbytes() / num_edges:.0f} B/arista)")
+    del adjacency
+
+
+def _rebuild(edges):
+    adjacency = {}
+    for node, neighbor, weight in edges:
+        adjacency.setdefault(node, []).append((neighbor, float(weight)))
+    return adjacency
+
+
+if __name__ == "__main__":
+    num_airports = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    run(Graph, num_airports)
+    run(DirectedGraph, num_airports)
@@ -0,0 +1,59 @@
+# Comparar motores de mínimo de escalas: Dijkstra con pesos 1 (montículo),
+# Dijkstra bidireccional, y el BFS bidireccional por fronteras, con y sin el
+# desempate por la ruta más barata.
+#
+# Uso: python benchmarks/bench_minstops.py [aeropuertos] [consultas]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routing import DirectedGraph, Graph
+from routing.engine import bidirectional_shortest_path, min_stops_path, path_cost, shortest_path
+from synthetic import random_network
+
+ENGINES = {
+    "Dijkstra": lambda view, s, t: shortest_path(view, s, t, unit_weights=True),
+    "Dijkstra bidireccional": lambda view, s, t: bidirectional_shortest_path(view, s, t, unit_weights=True),
+    "BFS bidireccional": lambda view, s, t: min_stops_path(view, s, t),
+    "BFS + más barata": lambda view, s, t: min_stops_path(view, s, t, cheapest=True),
+}
+
+
+def run(graph_cls, num_airports, num_queries):
+    graph = graph_cls()
+    random_network(graph, num_airports)
+    rng = random.Random(9)
+    queries = [(rng.random() < 0.5, rng.randrange(num_airports), rng.randrange(num_airports))
+               for _ in range(num_queries)]
+    views = (graph.view(False), graph.view(True))
+    for view in views:
+        view.transpose()
+
+    print(f"{graph_cls.__name__}: {num_airports} aeropuertos, {num_queries} consultas")
+    reference = None
+    for name, engine in ENGINES.items():
+        t0 = time.perf_counter()
+        results = [engine(views[has_visa], s, t) for has_visa, s, t in queries]
+        elapsed = time.perf_counter() - t0
+        stops = [result[0] for result in results]
+        costs = [path_cost(views[has_visa], path) if path else None
+                 for (has_visa, _, _), (_, path) in zip(queries, results)]
+        if reference is None:
+            reference = stops, costs
+        assert stops == reference[0]
+        cost_note = ""
+        if name.endswith("barata"):
+            assert all(c is None or c <= r + 1e-9 for c, r in zip(costs, reference[1]))
+            cheaper = sum(c is not None and c < r - 1e-9 for c, r in zip(costs, reference[1]))
+            cost_note = f"   (más barata que la de Dijkstra en {cheaper} consultas)"
+        print(f"  {name:<24} {elapsed / num_queries * 1000:>9.2f} ms/consulta{cost_note}")
+
+
+if __name__ == "__main__":
+    num_airports = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    run(Graph, num_airports, num_queries)
+    run(DirectedGraph, num_airports, num_queries)
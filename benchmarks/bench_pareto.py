@@ -0,0 +1,52 @@
+# Comparar la búsqueda de Pareto (costo, escalas) en una sola pasada contra
+# correr las dos búsquedas existentes seguidas (costo mínimo y mínimo de escalas).
+#
+# Uso: python benchmarks/bench_pareto.py [aeropuertos] [consultas]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routing import DirectedGraph, Graph, QueryCache
+from synthetic import random_network
+
+
+def run(graph_cls, num_airports, num_queries):
+    graph = graph_cls()
+    codes = random_network(graph, num_airports, visa_share=0.3)
+    graph.cache = QueryCache(max_entries=0, max_tree_bytes=0)  # Medir el motor, no la caché
+    graph.view(False)
+    rng = random.Random(5)
+    queries = [(*rng.sample(codes, 2), True) for _ in range(num_queries)]
+
+    both = pareto = 0.0
+    sizes = []
+    for start, end, has_visa in queries:
+        t0 = time.perf_counter()
+        path, cost, _ = graph.dijkstra(start, end, has_visa)
+        _, scales = graph.dijkstra_min_scales(start, end, has_visa)
+        both += time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        routes = graph.pareto_routes(start, end, has_visa)
+        pareto += time.perf_counter() - t0
+
+        if isinstance(path, str):
+            assert isinstance(routes, str)
+            continue
+        assert routes[0][1] == cost and routes[-1][2] == scales
+        sizes.append(len(routes))
+
+    print(f"{graph_cls.__name__}: {num_airports} aeropuertos, {num_queries} consultas con visa")
+    print(f"  costo + escalas seguidas {both / num_queries * 1000:>9.1f} ms/consulta")
+    print(f"  frente de Pareto         {pareto / num_queries * 1000:>9.1f} ms/consulta"
+          f"  ({sum(sizes) / max(len(sizes), 1):.1f} rutas por frente)")
+
+
+if __name__ == "__main__":
+    num_airports = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    run(Graph, num_airports, num_queries)
+    run(DirectedGraph, num_airports, num_queries)
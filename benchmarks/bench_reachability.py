@@ -0,0 +1,63 @@
+# Medir el índice de alcanzabilidad (routing/reachability.py) con consultas
+# sin ruta: sin visa, la red queda partida en pedazos y Dijkstra recorre todo
+# lo alcanzable antes de rendirse.
+#
+# Uso: python benchmarks/bench_reachability.py [aeropuertos] [consultas] [proporción con visa]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routing import DirectedGraph, Graph, QueryCache
+from routing.engine import INF
+from synthetic import random_network
+
+
+def run(graph_cls, num_airports, num_queries, visa_share):
+    graph = graph_cls()
+    codes = random_network(graph, num_airports, edges_per_airport=2, visa_share=visa_share)
+    graph.cache = QueryCache(max_entries=0, max_tree_bytes=0)  # Medir el motor, no la caché
+    frozen = graph.freeze()
+    graph.view(False)
+
+    t0 = time.perf_counter()
+    graph.prepare_reachability()
+    build_time = time.perf_counter() - t0
+    index = graph.reachability(False)
+
+    # Pares sin ruta en la vista sin visa (origen y destino sin visa, para que lleguen a buscar)
+    rng = random.Random(3)
+    allowed = [code for code in codes if not graph.requires_visa(code)]
+    queries = []
+    while len(queries) < num_queries:
+        start, end = rng.choice(allowed), rng.choice(allowed)
+        graph.use_reachability = False
+        if graph.search(start, end, False)[0] == INF:
+            queries.append((start, end))
+    rejected = sum(index.reachable(frozen.ids[start], frozen.ids[end]) is False for start, end in queries)
+
+    timings = {}
+    for enabled in (False, True):
+        graph.use_reachability = enabled
+        t0 = time.perf_counter()
+        for start, end in queries:
+            assert graph.dijkstra(start, end, False)[0] == "No hay ruta disponible"
+        timings[enabled] = (time.perf_counter() - t0) / num_queries
+
+    print(f"{graph_cls.__name__}: {num_airports} aeropuertos, {visa_share:.0%} con visa, "
+          f"{num_queries} consultas sin ruta")
+    print(f"  índice: {build_time:.2f} s para las dos vistas, "
+          f"{sum(graph.reachability(v).nbytes() for v in (False, True)) / 2**20:.1f} MiB; "
+          f"descarta {rejected}/{num_queries} consultas sin buscar")
+    print(f"  sin índice  {timings[False] * 1000:>9.3f} ms/consulta")
+    print(f"  con índice  {timings[True] * 1000:>9.3f} ms/consulta")
+
+
+if __name__ == "__main__":
+    num_airports = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    visa_share = float(sys.argv[3]) if len(sys.argv) > 3 else 0.4
+    run(Graph, num_airports, num_queries, visa_share)
+    run(DirectedGraph, num_airports, num_queries, visa_share)
@@ -0,0 +1,87 @@
+# Medir la latencia de redibujo por búsqueda: la versión anterior de
+# GUI.visualize_graph (grafo de networkx, spring_layout y figura completa en
+# cada búsqueda) contra RouteMap.highlight (fondo guardado + ruta con blitting).
+# Usa el backend Agg, así que no necesita pantalla.
+#
+# Uso: python benchmarks/bench_redraw.py [búsquedas] [aeropuertos sintéticos]
+import os
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import networkx as nx
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from route_map import RouteMap
+from routing import Graph, QueryCache
+from synthetic import random_network
+
+
+def legacy_visualize(graph, figure, canvas, path):
+    # Cuerpo de visualize_graph en proyecto.py antes del caché de posiciones
+    G = nx.Graph()
+    for node, neighbors in graph.graph_dict.items():
+        for neighbor, weight in neighbors:
+            G.add_edge(node, neighbor, weight=weight)
+    pos = nx.spring_layout(G)
+    figure.clf()
+    ax = figure.add_subplot()
+    nx.draw(G, pos, ax=ax, with_labels=True, node_color='lightblue', edge_color='black', width=1,
+            node_size=700, font_size=8)
+    if isinstance(path, list):
+        nx.draw_networkx_edges(G, pos, ax=ax, edgelist=list(zip(path[:-1], path[1:])), edge_color='r', width=2)
+    edge_labels = dict([(edge, G[edge[0]][edge[1]]['weight']) for edge in G.edges()])
+    nx.draw_networkx_edge_labels(G, pos, ax=ax, edge_labels=edge_labels, font_size=8)
+    canvas.draw()
+
+
+def run(name, graph, num_searches):
+    graph.cache = QueryCache(max_entries=0, max_tree_bytes=0)
+    codes = graph.airports()
+    rng = random.Random(2)
+    paths = [graph.dijkstra(rng.choice(codes), rng.choice(codes), True)[0] for _ in range(num_searches)]
+
+    figure = plt.figure(figsize=(7, 4))
+    canvas = FigureCanvasAgg(figure)
+    legacy = []
+    for path in paths:
+        t0 = time.perf_counter()
+        legacy_visualize(graph, figure, canvas, path)
+        legacy.append(time.perf_counter() - t0)
+
+    figure = plt.figure(figsize=(7, 4))
+    canvas = FigureCanvasAgg(figure)
+    route_map = RouteMap(graph, figure, canvas)
+    t0 = time.perf_counter()
+    route_map.show()
+    first = time.perf_counter() - t0
+    cached = []
+    for path in paths:
+        t0 = time.perf_counter()
+        route_map.highlight(path)
+        cached.append(time.perf_counter() - t0)
+
+    print(f"{name}: {len(codes)} aeropuertos, {num_searches} búsquedas (mediana por búsqueda)")
+    print(f"  redibujo completo    {statistics.median(legacy) * 1000:>9.1f} ms")
+    print(f"  fondo + blitting     {statistics.median(cached) * 1000:>9.1f} ms  (fondo inicial {first * 1000:.0f} ms)")
+
+
+if __name__ == "__main__":
+    num_searches = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    num_airports = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    graph = Graph()
+    graph.load_routes(os.path.join(ROOT, "caminos.txt"))
+    graph.load_visa_requirements(os.path.join(ROOT, "visa_requirements.txt"))
+    run("caminos.txt", graph, num_searches)
+
+    graph = Graph()
+    random_network(graph, num_airports, edges_per_airport=2)
+    run("sintético", graph, num_searches)
@@ -0,0 +1,97 @@
+# Tiempos de dibujo del mapa en una red grande: el dibujo completo con
+# networkx (todas las aristas y todas sus etiquetas) contra RouteMap con
+# nivel de detalle. Usa el backend Agg, así que no necesita pantalla.
+#
+# Uso: python benchmarks/bench_render.py [aeropuertos] [búsquedas] [--sin-anterior]
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import networkx as nx
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from route_map import RouteMap, save_layout, topology_signature, undirected_edges
+from routing import Graph, QueryCache
+from synthetic import geometric_network
+
+
+def legacy_draw(graph, positions):
+    # show_graph de proyecto.py antes del nivel de detalle
+    figure = plt.figure(figsize=(7, 4))
+    canvas = FigureCanvasAgg(figure)
+    G = nx.Graph()
+    for node, neighbors in graph.graph_dict.items():
+        for neighbor, weight in neighbors:
+            G.add_edge(node, neighbor, weight=weight)
+    ax = figure.add_subplot()
+    nx.draw(G, positions, ax=ax, with_labels=True, node_color='lightblue', edge_color='black', width=1,
+            node_size=700, font_size=8)
+    edge_labels = {(u, v): f"{d['weight']:0.1f}" for u, v, d in G.edges(data=True)}
+    nx.draw_networkx_edge_labels(G, positions, ax=ax, edge_labels=edge_labels, font_size=8)
+    canvas.draw()
+    plt.close(figure)
+
+
+def zoom(route_map, steps):
+    # Simular la rueda del mouse en el centro de la vista
+    (xmin, xmax), (ymin, ymax) = route_map.ax.get_xlim(), route_map.ax.get_ylim()
+    event = SimpleNamespace(inaxes=route_map.ax, step=steps, xdata=(xmin + xmax) / 2, ydata=(ymin + ymax) / 2)
+    t0 = time.perf_counter()
+    route_map._on_scroll(event)
+    return time.perf_counter() - t0
+
+
+def run(num_airports, num_searches, with_legacy):
+    graph = Graph()
+    positions = geometric_network(graph, num_airports)
+    graph.cache = QueryCache(max_entries=0, max_tree_bytes=0)
+    frozen = graph.freeze()
+    codes = list(frozen.codes)
+    rng = random.Random(4)
+    paths = [graph.dijkstra(rng.choice(codes), rng.choice(codes), True)[0] for _ in range(num_searches)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        layout_file = os.path.join(directory, "layout.npz")
+        edges, _ = undirected_edges(frozen)
+        save_layout(layout_file, topology_signature(codes, edges), positions)
+
+        print(f"{num_airports} aeropuertos, {len(edges)} aristas")
+        if with_legacy:
+            t0 = time.perf_counter()
+            legacy_draw(graph, positions)
+            print(f"  networkx completo          {time.perf_counter() - t0:>9.2f} s")
+
+        figure = plt.figure(figsize=(7, 4))
+        canvas = FigureCanvasAgg(figure)
+        route_map = RouteMap(graph, figure, canvas, layout_file=layout_file)
+        route_map.refresh()
+        t0 = time.perf_counter()
+        route_map.show()
+        print(f"  nivel de detalle, fondo    {(time.perf_counter() - t0) * 1000:>9.1f} ms")
+
+        searches = []
+        for path in paths:
+            t0 = time.perf_counter()
+            route_map.highlight(path)
+            searches.append(time.perf_counter() - t0)
+        zoom_in = [zoom(route_map, 2) for _ in range(4)]
+        zoom_out = [zoom(route_map, -2) for _ in range(4)]
+        print(f"  resaltar ruta              {statistics.median(searches) * 1000:>9.1f} ms (mediana)")
+        print(f"  acercar (cuadro)           {statistics.median(zoom_in) * 1000:>9.1f} ms (mediana)")
+        print(f"  alejar (cuadro)            {statistics.median(zoom_out) * 1000:>9.1f} ms (mediana)")
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    num_airports = int(args[0]) if len(args) > 0 else 25_000
+    num_searches = int(args[1]) if len(args) > 1 else 20
+    run(num_airports, num_searches, "--sin-anterior" not in sys.argv)
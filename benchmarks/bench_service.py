@@ -0,0 +1,136 @@
+# Generador de carga para el servicio de rutas (routing/service.py): levanta
+# el servicio en localhost, abre varias conexiones persistentes que consultan
+# pares al azar y reporta p50/p99 y consultas por segundo. A mitad de la
+# corrida se recarga la red, para ver que las consultas no se bloquean.
+#
+# Uso: python benchmarks/bench_service.py [aeropuertos] [consultas] [conexiones] [trabajadores...]
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import airport_code, write_route_files
+
+
+def start_service(routes_file, visa_file, workers, port=0):
+    process = subprocess.Popen([sys.executable, "-m", "routing.service", routes_file, visa_file,
+                                "--port", str(port), "--workers", str(workers)],
+                               cwd=ROOT, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()  # "Escuchando en http://host:puerto (...)"
+    host, port = line.split("http://")[1].split(" ")[0].split(":")
+    return process, host, int(port)
+
+
+async def request(reader, writer, method, target, payload=None):
+    body = json.dumps(payload).encode('utf-8') if payload is not None else b""
+    writer.write(f"{method} {target} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n"
+                 .encode('latin-1') + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line == b"\r\n":
+            break
+        name, _, value = line.decode('latin-1').partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def client(host, port, queries, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while queries:
+            origin, destination, has_visa, criterion = queries.pop()
+            t0 = time.perf_counter()
+            status, result = await request(reader, writer, "GET",
+                                           f"/route?origin={origin}&destination={destination}"
+                                           f"&visa={int(has_visa)}&criterion={criterion}")
+            latencies.append((time.perf_counter(), time.perf_counter() - t0, "path" in result))
+            if status != 200:
+                errors.append(result)
+    finally:
+        writer.close()
+
+
+async def warm_up(host, port, queries, connections):
+    # Cada trabajador mapea el snapshot con su primera consulta
+    pending = list(queries)
+    await asyncio.gather(*(client(host, port, pending, [], []) for _ in range(connections)))
+
+
+async def load(host, port, queries, connections, reload_files):
+    latencies, errors = [], []
+    pending = list(queries)
+    t0 = time.perf_counter()
+    clients = [asyncio.create_task(client(host, port, pending, latencies, errors)) for _ in range(connections)]
+
+    # Recarga a mitad de la corrida, por otra conexión
+    while len(pending) > len(queries) // 2:
+        await asyncio.sleep(0.01)
+    reader, writer = await asyncio.open_connection(host, port)
+    reload_start = time.perf_counter()
+    status, result = await request(reader, writer, "POST", "/reload",
+                                   {"routes": reload_files[0], "visa": reload_files[1]})
+    reload_end = time.perf_counter()
+    writer.close()
+    assert status == 200 and result["generation"] == 2 and result["routes"] == reload_files[0], result
+
+    await asyncio.gather(*clients)
+    elapsed = time.perf_counter() - t0
+    return latencies, errors, elapsed, (reload_start, reload_end)
+
+
+def report(label, latencies, elapsed, reload_window):
+    times = np.array([latency for _, latency, _ in latencies]) * 1000
+    routed = sum(found for _, _, found in latencies)
+    during = np.array([latency for end, latency, _ in latencies
+                       if reload_window[0] <= end <= reload_window[1]]) * 1000
+    line = (f"  {label:<14} {len(times) / elapsed:>8.1f} consultas/s   p50 {np.percentile(times, 50):>7.2f} ms"
+            f"   p99 {np.percentile(times, 99):>7.2f} ms   {routed / len(latencies):.0%} con ruta")
+    if len(during):
+        line += f"   (durante la recarga de {reload_window[1] - reload_window[0]:.2f} s: " \
+                f"{len(during)} consultas, p99 {np.percentile(during, 99):.2f} ms)"
+    print(line)
+
+
+def run(num_airports, num_queries, connections, worker_counts):
+    directory = tempfile.mkdtemp()
+    num_edges = -(-num_airports * 4 // 100_000) * 100_000  # write_route_files escribe bloques de 100k
+    first = write_route_files(directory, num_edges, num_airports, seed=1)
+    os.makedirs(os.path.join(directory, "nueva"))
+    second = write_route_files(os.path.join(directory, "nueva"), num_edges, num_airports, seed=2)
+
+    rng = random.Random(7)
+    queries = [(airport_code(rng.randrange(num_airports)), airport_code(rng.randrange(num_airports)),
+                rng.random() < 0.5, rng.choice(("cost", "stops"))) for _ in range(num_queries)]
+    print(f"{num_airports} aeropuertos, {num_edges} tramos, {num_queries} consultas, "
+          f"{connections} conexiones (recarga de la red a mitad de la corrida)")
+    for workers in worker_counts:
+        process, host, port = start_service(*first, workers)
+        try:
+            asyncio.run(warm_up(host, port, queries[:connections * 4], connections))
+            latencies, errors, elapsed, reload_window = asyncio.run(load(host, port, queries, connections, second))
+        finally:
+            process.terminate()
+            process.wait()
+        assert not errors, errors[:3]
+        report(f"{workers} trabajador{'es' if workers > 1 else ''}", latencies, elapsed, reload_window)
+
+
+if __name__ == "__main__":
+    num_airports = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    connections = int(sys.argv[3]) if len(sys.argv) > 3 else 32
+    worker_counts = [int(arg) for arg in sys.argv[4:]] or [1, os.cpu_count()]
+    run(num_airports, num_queries, connections, worker_counts)
@@ -0,0 +1,58 @@
+# Comparar el arranque leyendo caminos.txt línea por línea con el arranque
+# desde el snapshot binario mapeado en memoria.
+#
+# Uso: python benchmarks/bench_snapshot.py [aristas] [aeropuertos]
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routing import DirectedGraph
+from synthetic import airport_code, write_route_files
+
+
+def run(num_edges, num_airports):
+    with tempfile.TemporaryDirectory() as directory:
+        routes_file, visa_file = write_route_files(directory, num_edges, num_airports)
+        size = os.path.getsize(routes_file)
+
+        t0 = time.perf_counter()
+        graph = DirectedGraph()
+        graph.load_routes(routes_file)
+        graph.load_visa_requirements(visa_file)
+        graph.freeze()
+        parse = time.perf_counter() - t0
+        del graph
+
+        t0 = time.perf_counter()
+        DirectedGraph().load_network(routes_file, visa_file)
+        compile_time = time.perf_counter() - t0
+        snapshot_file = routes_file + ".directed.snap"
+
+        loads = []
+        for _ in range(5):
+            t0 = time.perf_counter()
+            graph = DirectedGraph()
+            graph.load_network(routes_file, visa_file)
+            loads.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        graph.dijkstra(airport_code(0), airport_code(1), False, bidirectional=True)
+        first_query = time.perf_counter() - t0
+
+        print(f"DirectedGraph: {num_edges} aristas, {num_airports} aeropuertos")
+        print(f"  caminos.txt           {size / 2**20:>9.1f} MiB")
+        print(f"  snapshot              {os.path.getsize(snapshot_file) / 2**20:>9.1f} MiB")
+        print(f"  parsear .txt          {parse:>9.2f} s")
+        print(f"  compilar snapshot     {compile_time:>9.2f} s (una vez)")
+        print(f"  cargar snapshot       {statistics.median(loads) * 1000:>9.2f} ms (mediana de 5)")
+        print(f"  primera consulta      {first_query * 1000:>9.2f} ms (incluye vista sin visa)")
+
+
+if __name__ == "__main__":
+    num_edges = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    num_airports = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+    run(num_edges, num_airports)
@@ -0,0 +1,60 @@
+# Comparar el arranque en frío del núcleo sin interfaz contra las
+# importaciones que hacían proyecto.py / proyecto_dirigido.py al cargarse.
+#
+# Uso: python benchmarks/bench_startup.py [repeticiones]
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = {
+    "routing (headless)": "import routing",
+    "legacy GUI stack": (
+        "import tkinter, networkx, heapq\n"
+        "import matplotlib\n"
+        "matplotlib.use('TkAgg')\n"
+        "from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg\n"
+        "import matplotlib.pyplot"
+    ),
+}
+
+PROBE = """
+import resource, time, json
+t0 = time.perf_counter()
+exec(compile({code!r}, '<case>', 'exec'))
+elapsed = time.perf_counter() - t0
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{"seconds": elapsed, "rss_kb": rss_kb}}))
+"""
+
+
+def measure(code, repeat):
+    samples = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE.format(code=code)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout
+        samples.append(json.loads(out))
+    samples.sort(key=lambda s: s["seconds"])
+    return samples[len(samples) // 2]
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    baseline = measure("pass", repeat)
+    print(f"{'caso':<22}{'import (ms)':>14}{'RSS max (MiB)':>16}")
+    print(f"{'python vacío':<22}{baseline['seconds'] * 1000:>14.1f}{baseline['rss_kb'] / 1024:>16.1f}")
+    for name, code in CASES.items():
+        try:
+            result = measure(code, repeat)
+        except subprocess.CalledProcessError:
+            print(f"{name:<22}{'no disponible':>14}")
+            continue
+        print(f"{name:<22}{result['seconds'] * 1000:>14.1f}{result['rss_kb'] / 1024:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# Varios hilos sobre el mismo grafo, como la interfaz con SearchWorker más
+# otro código que consulta a la vez: uno con dijkstra, otro recorriendo
+# iter_routes y otro con lotes de dijkstra_many. Todos comparten los arreglos
+# de trabajo de las vistas, así que cada resultado se compara con el de un
+# solo hilo; también se mide cuánto cuesta turnarse el candado del grafo.
+#
+# Uso: python benchmarks/bench_threads.py [aeropuertos] [consultas por hilo]
+import os
+import random
+import sys
+import threading
+import time
+from itertools import islice
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routing import DirectedGraph, Graph, QueryCache
+from synthetic import random_network
+
+ROUTES = 5  # Rutas alternativas que se piden a iter_routes por consulta
+BATCH = 50  # Consultas por lote de dijkstra_many
+
+
+def run(graph_cls, num_airports, num_queries):
+    graph = graph_cls()
+    codes = random_network(graph, num_airports)
+    graph.cache = QueryCache(max_entries=0, max_tree_bytes=0)  # Que cada consulta busque de verdad
+    rng = random.Random(8)
+    queries = [(rng.choice(codes), rng.choice(codes), rng.random() < 0.5) for _ in range(num_queries)]
+    batches = [queries[i:i + BATCH] for i in range(0, num_queries, BATCH)]
+
+    tasks = {
+        "dijkstra": lambda: [graph.dijkstra(*query) for query in queries],
+        "iter_routes": lambda: [list(islice(graph.iter_routes(*query), ROUTES)) for query in queries],
+        "dijkstra_many": lambda: [list(graph.dijkstra_many(batch)) for batch in batches],
+    }
+    expected, alone = {}, 0.0
+    for name, task in tasks.items():
+        t0 = time.perf_counter()
+        expected[name] = task()
+        alone += time.perf_counter() - t0
+
+    results, errors = {}, []
+
+    def worker(name, task):
+        try:
+            results[name] = task()
+        except Exception as error:
+            errors.append((name, error))
+
+    threads = [threading.Thread(target=worker, args=item) for item in tasks.items()]
+    t0 = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    together = time.perf_counter() - t0
+    assert not errors, errors
+    for name in tasks:
+        wrong = sum(got != want for got, want in zip(results[name], expected[name]))
+        assert wrong == 0, f"{name}: {wrong} de {len(expected[name])} resultados distintos con hilos"
+
+    print(f"{graph_cls.__name__}: {num_airports} aeropuertos, {num_queries} consultas por hilo")
+    print(f"  uno tras otro: {alone:>7.2f} s   los tres hilos a la vez: {together:>7.2f} s   "
+          f"(mismos resultados)")
+
+
+if __name__ == "__main__":
+    num_airports = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    run(Graph, num_airports, num_queries)
+    run(DirectedGraph, num_airports, num_queries)
@@ -0,0 +1,123 @@
+# Consultas con horarios (routing/timetable.py) sobre un día de vuelos
+# sintético de millones de salidas (synthetic.write_timetable): carga del
+# archivo, llegada más temprana y perfil de salidas por consulta, y el mismo
+# Connection Scan recorriendo los vuelos de a uno en Python como referencia
+# (y para verificar las llegadas).
+#
+# Uso: python benchmarks/bench_timetable.py [aeropuertos] [salidas por tramo] [consultas]
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routing import DirectedGraph, format_time
+from routing.timetable import NEVER, earliest_arrival
+from synthetic import write_timetable
+
+
+def scan_one_by_one(timetable, source, target, departure):
+    # Connection Scan vuelo por vuelo, con la misma poda en el destino
+    ready = [NEVER] * timetable.num_stops
+    ready[source] = departure
+    departure_stops, arrival_stops = timetable.departure_stops.tolist(), timetable.arrival_stops.tolist()
+    departures, arrivals, ready_after = (timetable.departures.tolist(), timetable.arrivals.tolist(),
+                                         timetable.ready.tolist())
+    arrival = NEVER
+    for c in range(int(timetable.departures.searchsorted(departure)), timetable.num_flights):
+        if departures[c] >= arrival:
+            break
+        if departures[c] >= ready[departure_stops[c]] and ready_after[c] < ready[arrival_stops[c]]:
+            ready[arrival_stops[c]] = ready_after[c]
+            if arrival_stops[c] == target:
+                arrival = arrivals[c]
+    return arrival
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    return (ordered[len(ordered) // 2] * 1000, ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000,
+            sum(ordered) / len(ordered) * 1000)
+
+
+def run(num_airports, daily_flights, num_queries):
+    directory = tempfile.mkdtemp()
+    t0 = time.perf_counter()
+    timetable_file, connections_file, visa_file = write_timetable(directory, "hub", num_airports,
+                                                                  daily_flights=daily_flights)
+    generated = time.perf_counter() - t0
+
+    graph = DirectedGraph()
+    graph.load_visa_requirements(visa_file)
+    t0 = time.perf_counter()
+    stats = graph.load_timetable(timetable_file, connections_file)
+    loaded = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    views = (graph.timetable_view(False), graph.timetable_view(True))
+    viewed = time.perf_counter() - t0
+    timetable = graph.timetable
+    print(f"{num_airports} aeropuertos, {timetable.num_flights} vuelos ({stats.lines} líneas, generadas en "
+          f"{generated:.1f} s), bloques de {timetable.window} min")
+    print(f"  carga del horario:     {loaded:>8.2f} s  ({stats.lines / loaded / 1e6:.2f} M líneas/s)")
+    print(f"  vista sin visa:        {viewed:>8.2f} s  ({views[0].num_flights} vuelos)")
+
+    rng = random.Random(6)
+    codes = timetable.codes
+    queries = []
+    while len(queries) < num_queries:
+        # Solo consultas que buscan: las que rechaza la visa responden sin recorrer nada
+        query = (rng.choice(codes), rng.choice(codes), rng.random() < 0.5, rng.randrange(360, 720))
+        if not graph.visa_rejection(*query[:3]):
+            queries.append(query)
+    samples, found = [], 0
+    for start, end, has_visa, departure in queries:
+        t0 = time.perf_counter()
+        flights, arrival, _ = graph.earliest_arrival(start, end, has_visa, departure)
+        samples.append(time.perf_counter() - t0)
+        found += not isinstance(flights, str)
+    p50, p99, mean = percentiles(samples)
+    print(f"  llegada más temprana:  p50 {p50:>8.2f} ms  p99 {p99:>8.2f} ms  media {mean:>8.2f} ms  "
+          f"({found}/{num_queries} con ruta)")
+
+    samples, sizes = [], []
+    for start, end, has_visa, _ in queries[:max(1, num_queries // 10)]:
+        t0 = time.perf_counter()
+        front = graph.departure_profile(start, end, has_visa)
+        samples.append(time.perf_counter() - t0)
+        sizes.append(0 if isinstance(front, str) else len(front))
+    p50, p99, mean = percentiles(samples)
+    print(f"  perfil del día:        p50 {p50:>8.2f} ms  p99 {p99:>8.2f} ms  media {mean:>8.2f} ms  "
+          f"({sum(sizes) / len(sizes):.1f} salidas útiles en promedio)")
+
+    # Referencia vuelo por vuelo sobre algunas consultas con ruta
+    checked, vectorized, plain = 0, 0.0, 0.0
+    for start, end, has_visa, departure in queries:
+        if checked == 3:
+            break
+        view = views[has_visa]
+        source, target = view.ids[start], view.ids[end]
+        t0 = time.perf_counter()
+        arrival, legs = earliest_arrival(view, source, target, departure)
+        elapsed = time.perf_counter() - t0
+        if legs is None:
+            continue
+        vectorized += elapsed
+        t0 = time.perf_counter()
+        expected = scan_one_by_one(view, source, target, departure)
+        plain += time.perf_counter() - t0
+        assert arrival == expected, (start, end, departure, format_time(arrival), format_time(expected))
+        checked += 1
+    if checked:
+        print(f"  vuelo por vuelo:       {plain / checked * 1000:>8.1f} ms por consulta contra "
+              f"{vectorized / checked * 1000:.1f} ms por bloques (x{plain / vectorized:.0f}, mismas llegadas)")
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    num_airports = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    daily_flights = float(sys.argv[2]) if len(sys.argv) > 2 else 6
+    num_queries = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    run(num_airports, daily_flights, num_queries)
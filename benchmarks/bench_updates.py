@@ -0,0 +1,81 @@
+# Medir la reparación incremental de árboles: un flujo de cambios de precio
+# intercalados con consultas del front-end (pocos orígenes, muchos destinos),
+# frente a descartar el caché en cada cambio y volver a calcular.
+#
+# Uso: python benchmarks/bench_updates.py [aeropuertos] [consultas] [cambios por consulta]
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routing import DirectedGraph, Graph
+from synthetic import random_network
+
+
+def stream(graph, codes, num_queries, updates_per_query, seed=11):
+    # Lista de ("precio", origen, destino, peso) y ("consulta", origen, destino, visa, escalas)
+    rng = random.Random(seed)
+    frozen = graph.freeze()
+    origins = rng.sample(codes, 5)
+    destinations = rng.sample(codes, 50)
+    events = []
+    for _ in range(num_queries):
+        for _ in range(updates_per_query):
+            u = rng.randrange(frozen.num_nodes)
+            start, stop = frozen.indptr[u], frozen.indptr[u + 1]
+            if start == stop:
+                continue
+            edge = rng.randrange(start, stop)
+            v = int(frozen.indices[edge])
+            price = float(frozen.weights[edge]) * rng.uniform(0.7, 1.3)
+            events.append(("precio", frozen.codes[u], frozen.codes[v], round(price, 2)))
+        events.append(("consulta", rng.choice(origins), rng.choice(destinations),
+                       rng.random() < 0.5, rng.random() < 0.5))
+    return events
+
+
+def replay(graph, events, repair):
+    results = []
+    for event in events:
+        if event[0] == "precio":
+            graph.update_edge_weight(*event[1:])
+            if not repair:
+                graph.cache.clear()  # Comportamiento anterior: todo se descarta
+        else:
+            _, start, end, has_visa, by_scales = event
+            if by_scales:
+                results.append(graph.dijkstra_min_scales(start, end, has_visa)[1])
+            else:
+                results.append(graph.dijkstra(start, end, has_visa)[1])
+    return results
+
+
+def run(graph_cls, num_airports, num_queries, updates_per_query):
+    timings = {}
+    answers = {}
+    for repair in (False, True):
+        graph = graph_cls()
+        codes = random_network(graph, num_airports)
+        events = stream(graph, codes, num_queries, updates_per_query)
+        graph.view(False)
+        t0 = time.perf_counter()
+        answers[repair] = replay(graph, events, repair)
+        timings[repair] = time.perf_counter() - t0
+    assert np.allclose(answers[False], answers[True])
+
+    print(f"{graph_cls.__name__}: {num_airports} aeropuertos, {num_queries} consultas, "
+          f"{updates_per_query} cambios de precio por consulta (costos verificados)")
+    print(f"  descartar caché   {timings[False] / num_queries * 1000:>9.2f} ms por consulta")
+    print(f"  reparar árboles   {timings[True] / num_queries * 1000:>9.2f} ms por consulta")
+
+
+if __name__ == "__main__":
+    num_airports = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    updates_per_query = int(sys.argv[3]) if len(sys.argv) > 3 else 1
+    run(Graph, num_airports, num_queries, updates_per_query)
+    run(DirectedGraph, num_airports, num_queries, updates_per_query)
@@ -0,0 +1,69 @@
+# Medir el costo del filtro de visa en el ciclo interno: la comparación de
+# cadenas por arista de la versión original contra la vista ya podada.
+#
+# Uso: python benchmarks/bench_visa.py [aeropuertos] [consultas]
+import heapq
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from routing import DirectedGraph, Graph
+from routing.engine import dijkstra
+from synthetic import random_network
+
+
+def legacy_filtered(graph_dict, visa_requirements, start_node):
+    # Ciclo de proyecto_dirigido.py antes de las vistas: dict + cadena por arista
+    distances = {node: float('inf') for node in graph_dict}
+    distances[start_node] = 0
+    pq = [(0, start_node)]
+    while pq:
+        current_distance, current_node = heapq.heappop(pq)
+        if current_distance > distances[current_node]:
+            continue
+        for neighbor, weight in graph_dict[current_node]:
+            if visa_requirements.get(neighbor, "") == "Requiere Visa":
+                continue
+            distance = current_distance + weight
+            if distance < distances[neighbor]:
+                distances[neighbor] = distance
+                heapq.heappush(pq, (distance, neighbor))
+    return distances
+
+
+def run(graph_cls, num_airports, num_queries):
+    graph = graph_cls()
+    codes = random_network(graph, num_airports, visa_share=0.3)
+    allowed = [code for code in codes if not graph.requires_visa(code)]
+    sources = random.Random(3).sample(allowed, num_queries)
+
+    t0 = time.perf_counter()
+    view = graph.view(False)
+    build = time.perf_counter() - t0
+
+    legacy = pruned = 0.0
+    for start in sources:
+        t0 = time.perf_counter()
+        expected = legacy_filtered(graph.graph_dict, graph.visa_requirements, start)
+        legacy += time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        distances = dijkstra(view, view.ids[start]).distances
+        pruned += time.perf_counter() - t0
+
+        assert all(distances[view.ids[code]] == cost for code, cost in expected.items())
+
+    print(f"{graph_cls.__name__}: {num_airports} aeropuertos, {num_queries} árboles completos sin visa")
+    print(f"  construir vistas        {build * 1000:>9.1f} ms (una vez)")
+    print(f"  filtro por arista       {legacy / num_queries * 1000:>9.1f} ms/consulta")
+    print(f"  vista podada            {pruned / num_queries * 1000:>9.1f} ms/consulta")
+
+
+if __name__ == "__main__":
+    num_airports = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    num_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    run(Graph, num_airports, num_queries)
+    run(DirectedGraph, num_airports, num_queries)
@@ -0,0 +1,253 @@
+# Suite de benchmarks reproducible sobre redes de aerolínea sintéticas
+# (synthetic.airline_network): por topología (hub-and-spoke y libre de
+# escala) y tamaño, genera los archivos con el formato de caminos.txt y
+# visa_requirements.txt (no dirigidos para Graph / proyecto.py, dirigidos
+# para DirectedGraph / proyecto_dirigido.py) y mide:
+#  - carga: load_network en frío (compila el snapshot) y en caliente
+#  - memoria: tracemalloc tras load_routes + visas + las dos vistas
+#  - Graph.dijkstra y dijkstra_min_scales por consulta, sin caché
+# Las consultas medidas se verifican contra networkx (hasta --oracle-limit
+# aeropuertos) y los resultados se guardan en JSON; con --compare se marcan
+# las regresiones frente a un archivo anterior.
+#
+# Uso: python benchmarks/suite.py [--sizes 10,100,...] [--kinds hub,scalefree]
+#          [--visa 0.2] [--queries 50] [--budget 20] [--output resultados.json]
+#          [--compare anterior.json] [--threshold 0.2]
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from routing import DirectedGraph, Graph, QueryCache
+from routing.loaders import read_routes, read_visa_requirements
+from synthetic import NETWORK_KINDS, write_network
+
+SIZES = (10, 100, 1_000, 10_000, 100_000, 1_000_000)
+VARIANTS = {"proyecto.py": Graph, "proyecto_dirigido.py": DirectedGraph}
+NO_ROUTE = "No hay ruta disponible"
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    if not ordered:
+        return None
+    return {"queries": len(ordered), "mean_ms": sum(ordered) / len(ordered) * 1000,
+            "p50_ms": ordered[len(ordered) // 2] * 1000,
+            "p99_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000}
+
+
+class Oracle:
+    # Las mismas consultas resueltas con networkx directamente desde los
+    # archivos, con la regla de visas reescrita por separado
+    def __init__(self, routes_file, visa_file, directed):
+        import networkx as nx
+        self.nx = nx
+        self.directed = directed
+        self.graph = nx.DiGraph() if directed else nx.Graph()
+        for origin, destination, weight in read_routes(routes_file):
+            # Repetidos: DirectedGraph los conserva como paralelos (cuenta el
+            # más barato) y Graph se queda con el primero
+            if not self.graph.has_edge(origin, destination):
+                self.graph.add_edge(origin, destination, weight=weight)
+            elif directed and weight < self.graph[origin][destination]["weight"]:
+                self.graph[origin][destination]["weight"] = weight
+        self.visa = {code: required == "Requiere Visa" for code, _, required in read_visa_requirements(visa_file)}
+        self.allowed = {node for node in self.graph if not self.visa.get(node, False)}
+
+    def answer(self, start, end, has_visa, unit_weights):
+        # "visa" si se rechaza por visa, None si no hay ruta, o el costo
+        graph = self.graph
+        if not has_visa:
+            if (not self.directed and self.visa.get(start)) or self.visa.get(end):
+                return "visa"
+            graph = graph.subgraph(self.allowed | {start})
+        try:
+            return self.nx.shortest_path_length(graph, start, end, weight=None if unit_weights else "weight")
+        except self.nx.NetworkXNoPath:
+            return None
+
+    def check(self, start, end, has_visa, unit_weights, path, cost):
+        # Comparar el resultado de Graph (ruta o mensaje, costo) con networkx
+        expected = self.answer(start, end, has_visa, unit_weights)
+        if expected == "visa":
+            return isinstance(path, str) and path != NO_ROUTE
+        if expected is None:
+            return path == NO_ROUTE
+        if isinstance(path, str) or path[0] != start or path[-1] != end:
+            return False
+        legs = list(zip(path, path[1:]))
+        if not all(self.graph.has_edge(a, b) for a, b in legs):
+            return False
+        if not has_visa and any(self.visa.get(node) for node in path[1:]):
+            return False
+        walked = len(legs) if unit_weights else sum(self.graph[a][b]["weight"] for a, b in legs)
+        return abs(walked - expected) <= 1e-6 * max(1.0, expected) and abs(cost - expected) <= 1e-6 * max(1.0, expected)
+
+
+def traced_load(graph_cls, routes_file, visa_file):
+    # Memoria del grafo cargado desde texto con sus dos vistas de visa (MiB)
+    gc.collect()
+    tracemalloc.start()
+    graph = graph_cls()
+    graph.load_routes(routes_file)
+    graph.load_visa_requirements(visa_file)
+    graph.view(False)
+    graph.view(True)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del graph
+    return current / 2**20, peak / 2**20
+
+
+def timed_queries(method, queries, budget):
+    # Consultas hasta agotar el presupuesto (al menos tres); (resultados, segundos por consulta)
+    results, samples = [], []
+    started = time.perf_counter()
+    for query in queries:
+        if len(samples) >= 3 and time.perf_counter() - started > budget:
+            break
+        t0 = time.perf_counter()
+        results.append(method(*query))
+        samples.append(time.perf_counter() - t0)
+    return results, samples
+
+
+def run_case(kind, num_airports, name, graph_cls, directory, args):
+    routes_file, visa_file = write_network(directory, kind, num_airports, args.visa, graph_cls.directed, args.seed)
+    record = {"kind": kind, "airports": num_airports, "variant": name, "directed": graph_cls.directed,
+              "visa_share": args.visa, "seed": args.seed}
+
+    t0 = time.perf_counter()
+    graph_cls().load_network(routes_file, visa_file)
+    record["load_cold_s"] = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    graph = graph_cls()
+    graph.load_network(routes_file, visa_file)
+    record["load_warm_s"] = time.perf_counter() - t0
+    record["edges"] = graph.freeze().num_edges
+    record["memory_mib"], record["memory_peak_mib"] = traced_load(graph_cls, routes_file, visa_file)
+
+    graph.cache = QueryCache(max_entries=0, max_tree_bytes=0)  # Cada consulta es una búsqueda completa
+    graph.view(False)
+    graph.view(True)
+    rng = random.Random(args.seed)
+    codes = graph.airports()
+    queries = [(rng.choice(codes), rng.choice(codes), rng.random() < 0.5) for _ in range(args.queries)]
+    costs, cost_samples = timed_queries(graph.dijkstra, queries, args.budget)
+    stops, stop_samples = timed_queries(graph.dijkstra_min_scales, queries, args.budget)
+    record["dijkstra"] = summarize(cost_samples)
+    record["min_scales"] = summarize(stop_samples)
+
+    if num_airports <= args.oracle_limit:
+        oracle = Oracle(routes_file, visa_file, graph_cls.directed)
+        failures = [query for query, (path, cost, _) in zip(queries, costs)
+                    if not oracle.check(*query, False, path, cost)]
+        failures += [query for query, (path, num_scales) in zip(queries, stops)
+                     if not oracle.check(*query, True, path, num_scales)]
+        record["oracle"] = {"checked": len(costs) + len(stops), "failures": [list(query) for query in failures]}
+    for filename in os.listdir(directory):
+        os.remove(os.path.join(directory, filename))
+    return record
+
+
+def metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"date": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": commit, "python": platform.python_version(),
+            "numpy": np.__version__, "platform": platform.platform(), "cpus": os.cpu_count()}
+
+
+# Para contar como regresión, además de superar el umbral relativo, una
+# métrica tiene que empeorar al menos esto (el ruido de medir microsegundos)
+MIN_CHANGE = {"load_warm_ms": 5.0, "memory_mib": 1.0, "dijkstra.p50_ms": 1.0, "min_scales.p50_ms": 1.0}
+
+
+def metrics(record):
+    return {"load_warm_ms": record["load_warm_s"] * 1000, "memory_mib": record["memory_mib"],
+            "dijkstra.p50_ms": (record["dijkstra"] or {}).get("p50_ms"),
+            "min_scales.p50_ms": (record["min_scales"] or {}).get("p50_ms")}
+
+
+def compare(records, previous_file, threshold):
+    # Regresiones: métricas que empeoraron más de `threshold` frente al archivo anterior
+    with open(previous_file, encoding='utf-8') as file:
+        previous = {(r["kind"], r["airports"], r["variant"]): r for r in json.load(file)["results"]}
+    regressions = []
+    for record in records:
+        old = previous.get((record["kind"], record["airports"], record["variant"]))
+        if old is None:
+            continue
+        before = metrics(old)
+        for metric, value in metrics(record).items():
+            if value is None or not before[metric]:
+                continue
+            if value > before[metric] * (1 + threshold) and value - before[metric] >= MIN_CHANGE[metric]:
+                regressions.append(f"{record['kind']} {record['airports']} {record['variant']} {metric}: "
+                                   f"{before[metric]:.2f} -> {value:.2f} (x{value / before[metric]:.2f})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Suite de benchmarks de MetroTravel")
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)))
+    parser.add_argument("--kinds", default=",".join(sorted(NETWORK_KINDS)))
+    parser.add_argument("--variants", default=",".join(VARIANTS))
+    parser.add_argument("--visa", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--queries", type=int, default=50, help="consultas por medición (como máximo)")
+    parser.add_argument("--budget", type=float, default=20.0, help="segundos por medición de consultas")
+    parser.add_argument("--oracle-limit", type=int, default=20_000, help="verificar con networkx hasta este tamaño")
+    parser.add_argument("--output", default="resultados.json")
+    parser.add_argument("--compare", help="resultados anteriores para detectar regresiones")
+    parser.add_argument("--threshold", type=float, default=0.2, help="empeoramiento tolerado (0.2 = 20 %%)")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="metrotravel-bench-")
+    records = []
+    try:
+        for kind in args.kinds.split(","):
+            for num_airports in map(int, args.sizes.split(",")):
+                for name in args.variants.split(","):
+                    record = run_case(kind, num_airports, name, VARIANTS[name], directory, args)
+                    records.append(record)
+                    oracle = record.get("oracle")
+                    check = "" if oracle is None else (
+                        f"  networkx {oracle['checked'] - len(oracle['failures'])}/{oracle['checked']}")
+                    print(f"{kind:<9} {num_airports:>9} {name:<21} {record['edges']:>9} aristas  "
+                          f"carga {record['load_cold_s']:>7.2f} s / {record['load_warm_s'] * 1000:>5.1f} ms  "
+                          f"{record['memory_mib']:>8.1f} MiB  dijkstra {record['dijkstra']['p50_ms']:>9.2f} ms  "
+                          f"escalas {record['min_scales']['p50_ms']:>8.2f} ms{check}", flush=True)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump({"meta": metadata(), "results": records}, file, indent=2)
+    print(f"resultados en {args.output}")
+
+    failed = [record for record in records if record.get("oracle", {}).get("failures")]
+    for record in failed:
+        print(f"ERROR: {record['kind']} {record['airports']} {record['variant']} no coincide con networkx en "
+              f"{record['oracle']['failures']}")
+    regressions = compare(records, args.compare, args.threshold) if args.compare else []
+    for line in regressions:
+        print(f"REGRESIÓN: {line}")
+    return 1 if failed or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+# Generador de redes de aeropuertos sintéticas para los benchmarks
+#
+# Además de llenar un grafo directamente, genera redes de aerolínea con
+# semilla (hub-and-spoke y libre de escala) como archivos con el formato de
+# caminos.txt y visa_requirements.txt, dirigidos o no, y un día de vuelos
+# con horarios sobre la red dirigida (formato de routing/timetable.py):
+#   python benchmarks/synthetic.py hub 100000 salida/ --visa 0.3 --directed
+#   python benchmarks/synthetic.py hub 100000 salida/ --timetable --daily-flights 5
+import argparse
+import os
+import random
+
+import numpy as np
+
+
+def airport_code(i):
+    # Códigos tipo "A0001", únicos y ordenables
+    return f"A{i:05d}"
+
+
+def random_network(graph, num_airports, edges_per_airport=3, visa_share=0.2, seed=1):
+    # Llenar `graph` con una red conexa: un árbol aleatorio más aristas extra
+    rng = random.Random(seed)
+    codes = [airport_code(i) for i in range(num_airports)]
+    for i in range(1, num_airports):
+        graph.add_edge(codes[rng.randrange(i)], codes[i], float(rng.randint(10, 500)))
+    for _ in range(num_airports * (edges_per_airport - 1)):
+        a, b = rng.randrange(num_airports), rng.randrange(num_airports)
+        if a != b:
+            graph.add_edge(codes[a], codes[b], float(rng.randint(10, 500)))
+    for code in codes:
+        graph.set_visa_requirement(code, "Requiere Visa" if rng.random() < visa_share else "No Requiere Visa")
+    return codes
+
+
+def write_route_files(directory, num_edges, num_airports, seed=1):
+    # Archivos con el formato de caminos.txt y visa_requirements.txt
+    rng = random.Random(seed)
+    codes = [airport_code(i) for i in range(num_airports)]
+    routes_file = os.path.join(directory, "caminos.txt")
+    visa_file = os.path.join(directory, "visa_requirements.txt")
+    with open(routes_file, 'w') as file:
+        for _ in range(num_edges // 100_000):
+            file.write("".join(f"{rng.choice(codes)},{rng.choice(codes)},{rng.randint(10, 500)}.00\n"
+                               for _ in range(100_000)))
+    with open(visa_file, 'w') as file:
+        for code in codes:
+            file.write(f"{code},Ciudad {code},{'Requiere Visa' if rng.random() < 0.2 else 'No Requiere Visa'}\n")
+    return routes_file, visa_file
+
+
+def geometric_network(graph, num_airports, edges_per_airport=2, seed=1):
+    # Red con posiciones en el plano: cada aeropuerto se conecta con vecinos
+    # cercanos (misma celda de una grilla). Devuelve {codigo: (x, y)}.
+    rng = random.Random(seed)
+    codes = [airport_code(i) for i in range(num_airports)]
+    positions = {code: (rng.random(), rng.random()) for code in codes}
+    cells_per_side = max(1, int((num_airports / 8) ** 0.5))
+    cells = {}
+    for code, (x, y) in positions.items():
+        cells.setdefault((int(x * cells_per_side), int(y * cells_per_side)), []).append(code)
+    for code, (x, y) in positions.items():
+        cx, cy = int(x * cells_per_side), int(y * cells_per_side)
+        nearby = [other for dx in (-1, 0, 1) for dy in (-1, 0, 1) for other in cells.get((cx + dx, cy + dy), [])]
+        for other in rng.sample(nearby, min(edges_per_airport, len(nearby))):
+            if other != code:
+                graph.add_edge(code, other, float(rng.randint(10, 500)))
+    return positions
+
+
+def hub_network(graph, num_airports, hub_share=0.02, hub_edges=8, seed=1):
+    # Red tipo aerolínea: unos pocos hubs bien conectados entre sí y cada
+    # aeropuerto regional con vuelos a uno a tres hubs y a algún vecino.
+    # En un grafo dirigido cada vuelo tiene también su vuelta.
+    rng = random.Random(seed)
+    codes = [airport_code(i) for i in range(num_airports)]
+    num_hubs = max(2, int(num_airports * hub_share))
+    hubs = codes[:num_hubs]
+
+    def flight(a, b, low, high):
+        graph.add_edge(a, b, float(rng.randint(low, high)))
+        if graph.directed:
+            graph.add_edge(b, a, float(rng.randint(low, high)))
+
+    for i, hub in enumerate(hubs[1:], 1):
+        flight(hubs[rng.randrange(i)], hub, 100, 900)
+    for _ in range(num_hubs * (hub_edges - 1)):
+        flight(*rng.sample(hubs, 2), 100, 900)
+    for i, code in enumerate(codes[num_hubs:], num_hubs):
+        for hub in rng.sample(hubs, rng.randint(1, 3)):
+            flight(code, hub, 10, 300)
+        if rng.random() < 0.3:
+            flight(code, codes[rng.randrange(num_hubs, i + 1)], 10, 200)
+    return codes
+
+
+# Redes de aerolínea en arreglos, para escribirlas como archivos. Cada tramo
+# aparece una sola vez (sin repetidos ni lazos) y su precio crece con la
+# distancia entre posiciones al azar en el plano.
+SYLLABLES = ["ca", "ra", "mé", "lo", "ti", "sa", "bo", "gua", "na", "pe", "rí", "to", "ma", "lí", "cu", "ña",
+             "bar", "qui", "za", "ló", "de", "mon", "va", "ri", "sé", "cha"]
+PREFIXES = ["", "", "", "San ", "Santa ", "Puerto ", "Villa ", "Nueva "]
+
+
+def city_name(rng):
+    # Nombre de ciudad pronunciable, con acentos y a veces un prefijo
+    name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+    return rng.choice(PREFIXES) + name.capitalize()
+
+
+def _unique_legs(sources, targets):
+    # Quitar lazos y tramos repetidos en cualquier sentido (se queda el primero)
+    low, high = np.minimum(sources, targets), np.maximum(sources, targets)
+    keys = (low.astype(np.int64) << 32) | high
+    _, first = np.unique(keys, return_index=True)
+    first = np.sort(first[low[first] != high[first]])
+    return sources[first], targets[first]
+
+
+def hub_and_spoke_legs(num_airports, rng, hub_share=0.02, hub_degree=8, regional_share=0.3):
+    # Unos pocos hubs conectados entre sí (un árbol más enlaces al azar) y
+    # cada aeropuerto regional con vuelos a uno a tres hubs, elegidos con
+    # preferencia por los más grandes (Zipf), y a veces a otro regional
+    num_hubs = min(num_airports, max(2, int(num_airports * hub_share)))
+    hub_ids = np.arange(num_hubs)
+    sources = [hub_ids[1:], rng.integers(0, num_hubs, num_hubs * (hub_degree - 1) // 2)]
+    targets = [(rng.random(num_hubs - 1) * hub_ids[1:]).astype(np.int64),
+               rng.integers(0, num_hubs, num_hubs * (hub_degree - 1) // 2)]
+    regional = np.arange(num_hubs, num_airports)
+    popularity = 1.0 / np.arange(1, num_hubs + 1)
+    for count in (1, 2, 3):
+        chosen = regional[rng.integers(1, 4, len(regional)) >= count]
+        sources.append(chosen)
+        targets.append(rng.choice(num_hubs, len(chosen), p=popularity / popularity.sum()))
+    chosen = regional[rng.random(len(regional)) < regional_share]
+    sources.append(chosen)
+    targets.append(rng.integers(num_hubs, num_airports, len(chosen)))
+    return _unique_legs(np.concatenate(sources).astype(np.int64), np.concatenate(targets).astype(np.int64))
+
+
+def scale_free_legs(num_airports, rng, links=2):
+    # Barabási-Albert: cada aeropuerto nuevo se une a `links` anteriores
+    # elegidos con probabilidad proporcional a su grado
+    seeded = random.Random(int(rng.integers(2**32)))
+    repeated = list(range(min(links, num_airports)))
+    sources, targets = [], []
+    for node in range(len(repeated), num_airports):
+        chosen = set()
+        while len(chosen) < min(links, node):
+            chosen.add(repeated[seeded.randrange(len(repeated))])
+        for other in chosen:
+            sources.append(node)
+            targets.append(other)
+        repeated.extend(chosen)
+        repeated.extend([node] * len(chosen))
+    return _unique_legs(np.array(sources, dtype=np.int64), np.array(targets, dtype=np.int64))
+
+
+NETWORK_KINDS = {"hub": hub_and_spoke_legs, "scalefree": scale_free_legs}
+
+
+def airline_network(kind, num_airports, visa_share=0.2, directed=False, seed=1, one_way_share=0.05):
+    # Devuelve (códigos, ciudades, requiere visa por id, orígenes, destinos, precios).
+    # Dirigida: cada tramo tiene ida y vuelta con precios distintos, salvo
+    # una parte `one_way_share` que solo tiene ida.
+    rng = np.random.default_rng(seed)
+    sources, targets = NETWORK_KINDS[kind](num_airports, rng)
+    flip = rng.random(len(sources)) < 0.5
+    sources, targets = np.where(flip, targets, sources), np.where(flip, sources, targets)
+    positions = rng.random((num_airports, 2))
+    distance = np.hypot(*(positions[sources] - positions[targets]).T)
+    prices = np.round(20 + 500 * distance + rng.uniform(0, 40, len(sources)), 2)
+    if directed:
+        back = rng.random(len(sources)) >= one_way_share
+        sources, targets = np.concatenate((sources, targets[back])), np.concatenate((targets, sources[back]))
+        prices = np.concatenate((prices, np.round(prices[back] * rng.uniform(0.85, 1.15, back.sum()), 2)))
+    names = random.Random(seed)
+    cities = [city_name(names) for _ in range(num_airports)]
+    visa = rng.random(num_airports) < visa_share
+    return [airport_code(i) for i in range(num_airports)], cities, visa, sources, targets, prices
+
+
+def write_network(directory, kind, num_airports, visa_share=0.2, directed=False, seed=1):
+    # Escribir la red como caminos.txt y visa_requirements.txt en `directory`
+    codes, cities, visa, sources, targets, prices = airline_network(kind, num_airports, visa_share, directed, seed)
+    os.makedirs(directory, exist_ok=True)
+    routes_file = os.path.join(directory, "caminos.txt")
+    visa_file = os.path.join(directory, "visa_requirements.txt")
+    with open(routes_file, 'w', encoding='utf-8') as file:
+        for start in range(0, len(sources), 100_000):
+            stop = start + 100_000
+            file.write("".join(f"{codes[a]},{codes[b]},{price:.2f}\n" for a, b, price in
+                               zip(sources[start:stop].tolist(), targets[start:stop].tolist(),
+                                   prices[start:stop].tolist())))
+    with open(visa_file, 'w', encoding='utf-8') as file:
+        file.write("".join(f"{code},{city},{'Requiere Visa' if required else 'No Requiere Visa'}\n"
+                           for code, city, required in zip(codes, cities, visa.tolist())))
+    return routes_file, visa_file
+
+
+def airline_timetable(kind, num_airports, visa_share=0.2, seed=1, daily_flights=4):
+    # Un día de vuelos sobre la red dirigida de airline_network: cada tramo
+    # tiene 1 + Poisson(daily_flights - 1) salidas entre las 05:00 y las 23:55,
+    # con duración según la distancia (el precio base) y precio propio. Los
+    # aeropuertos con más tramos piden más tiempo de conexión. Devuelve
+    # (códigos, ciudades, visa, orígenes, destinos, salidas, llegadas, precios,
+    # conexión mínima por id).
+    codes, cities, visa, sources, targets, prices = airline_network(kind, num_airports, visa_share, True, seed)
+    rng = np.random.default_rng(seed + 1)
+    leg = np.repeat(np.arange(len(sources)), 1 + rng.poisson(daily_flights - 1, len(sources)))
+    departures = 300 + 5 * rng.integers(0, 228, len(leg))
+    arrivals = departures + 30 + 5 * np.round((prices[leg] - 20) * 0.16).astype(np.int64)
+    fares = np.round(prices[leg] * rng.uniform(0.8, 1.3, len(leg)), 2)
+    degree = np.bincount(sources, minlength=num_airports) + np.bincount(targets, minlength=num_airports)
+    transfer = np.where(degree >= 20, 60, np.where(degree >= 6, 45, 30))
+    return codes, cities, visa, sources[leg], targets[leg], departures, arrivals, fares, transfer
+
+
+def write_timetable(directory, kind, num_airports, visa_share=0.2, seed=1, daily_flights=4):
+    # Escribir horarios.txt, conexiones.txt y visa_requirements.txt en `directory`
+    codes, cities, visa, sources, targets, departures, arrivals, fares, transfer = airline_timetable(
+        kind, num_airports, visa_share, seed, daily_flights)
+    os.makedirs(directory, exist_ok=True)
+    timetable_file = os.path.join(directory, "horarios.txt")
+    connections_file = os.path.join(directory, "conexiones.txt")
+    visa_file = os.path.join(directory, "visa_requirements.txt")
+    clock = [f"{minute // 60 % 24:02d}:{minute % 60:02d}" + (f"+{minute // 1440}" if minute >= 1440 else "")
+             for minute in range(int(arrivals.max(initial=0)) + 1)]
+    with open(timetable_file, 'w', encoding='utf-8') as file:
+        for start in range(0, len(sources), 100_000):
+            stop = start + 100_000
+            file.write("".join(f"{codes[a]},{codes[b]},{clock[d]},{clock[r]},{fare:.2f}\n" for a, b, d, r, fare in
+                               zip(sources[start:stop].tolist(), targets[start:stop].tolist(),
+                                   departures[start:stop].tolist(), arrivals[start:stop].tolist(),
+                                   fares[start:stop].tolist())))
+    with open(connections_file, 'w', encoding='utf-8') as file:
+        file.write("".join(f"{code},{minutes}\n" for code, minutes in zip(codes, transfer.tolist())))
+    with open(visa_file, 'w', encoding='utf-8') as file:
+        file.write("".join(f"{code},{city},{'Requiere Visa' if required else 'No Requiere Visa'}\n"
+                           for code, city, required in zip(codes, cities, visa.tolist())))
+    return timetable_file, connections_file, visa_file
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generar una red de aerolínea sintética")
+    parser.add_argument("kind", choices=sorted(NETWORK_KINDS))
+    parser.add_argument("airports", type=int)
+    parser.add_argument("directory")
+    parser.add_argument("--visa", type=float, default=0.2, help="proporción de aeropuertos que requieren visa")
+    parser.add_argument("--directed", action="store_true", help="ida y vuelta como tramos separados")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timetable", action="store_true", help="un día de vuelos con horarios")
+    parser.add_argument("--daily-flights", type=float, default=4, help="salidas por tramo y día (promedio)")
+    args = parser.parse_args()
+    if args.timetable:
+        filenames = write_timetable(args.directory, args.kind, args.airports, args.visa, args.seed, args.daily_flights)
+    else:
+        filenames = write_network(args.directory, args.kind, args.airports, args.visa, args.directed, args.seed)
+    for filename in filenames:
+        print(filename)
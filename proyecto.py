@@ -1,164 +1,9 @@
 import tkinter as tk
 from tkinter import ttk, messagebox # Importar módulos necesarios de Tkinter
-import networkx as nx # Importar NetworkX para trabajar con grafos
-import matplotlib # Importar matplotlib para graficar
-matplotlib.use("TkAgg")
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.pyplot as plt
-
-class Graph:
-    def __init__(self):
-        self.graph_dict = {}
-        self.visa_requirements = {}
-        self.num_scales = {}
-
-    def add_edge(self, origin, destination, weight):
-        if origin not in self.graph_dict:
-            self.graph_dict[origin] = []
-        if destination not in self.graph_dict:
-            self.graph_dict[destination] = []
-        self.graph_dict[origin].append((destination, weight))
-        self.graph_dict[destination].append((origin, weight))  # Agregar la arista en ambas direcciones
-
-    def load_visa_requirements(self, filename):
-        with open(filename, 'r') as file:
-            for line in file:
-                airport_code, destination, visa_required = line.strip().split(',')
-                self.visa_requirements[airport_code] = visa_required.strip()
-
-    def dijkstra(self, start_node, end_node, has_visa):
-        if not has_visa:
-            if self.visa_requirements.get(start_node, "") == "Requiere Visa":
-                return "El origen requiere visa.", float('inf'), float('inf')
-            if self.visa_requirements.get(end_node, "") == "Requiere Visa":
-                return "El destino requiere visa.", float('inf'), float('inf')
-
-        distances = {node: float('inf') for node in self.graph_dict}
-        distances[start_node] = 0
-        parents = {node: None for node in self.graph_dict}
-        visited = set()
-        current_node = start_node
-
-        while current_node != end_node:
-            visited.add(current_node)
-            min_distance = float('inf')
-            next_node = None
-
-            for neighbor, weight in self.graph_dict[current_node]:
-                if neighbor in visited:
-                    continue
-                if not has_visa and self.visa_requirements.get(neighbor, "") == "Requiere Visa":
-                    continue
-
-                distance = distances[current_node] + weight
-                if distance < distances[neighbor]:
-                    distances[neighbor] = distance
-                    parents[neighbor] = current_node
-
-                if distances[neighbor] < min_distance:
-                    min_distance = distances[neighbor]
-                    next_node = neighbor
-
-            if next_node is None:
-                break
-
-            current_node = next_node
-
-        path = []
-        node = end_node
-        while node is not None:
-            path.append(node)
-            node = parents[node]
-        path.reverse()
-
-        self.num_scales = {node: 0 for node in path}
-        for i in range(1, len(path)):
-            self.num_scales[path[i]] = self.num_scales[path[i - 1]] + 1
-
-        if not path or path[0] != start_node:
-            return "No hay ruta disponible", float('inf'), float('inf')
-        else:
-            total_distance = distances[end_node]
-            return path, total_distance, self.num_scales[end_node]
-
-    def dijkstra_min_scales(self, start_node, end_node, has_visa):
-        if not has_visa:
-            if self.visa_requirements.get(start_node, "") == "Requiere Visa":
-                return "El origen requiere visa.", float('inf')
-            if self.visa_requirements.get(end_node, "") == "Requiere Visa":
-                return "El destino requiere visa.", float('inf')
-
-        distances = {node: float('inf') for node in self.graph_dict}
-        distances[start_node] = 0
-        parents = {node: None for node in self.graph_dict}
-        visited = set()
-        current_node = start_node
-
-        while current_node != end_node:
-            visited.add(current_node)
-            min_distance = float('inf')
-            next_node = None
-
-            for neighbor, _ in self.graph_dict[current_node]:
-                if neighbor in visited:
-                    continue
-                if not has_visa and self.visa_requirements.get(neighbor, "") == "Requiere Visa":
-                    continue
-
-                distance = distances[current_node] + 1
-                if distance < distances[neighbor]:
-                    distances[neighbor] = distance
-                    parents[neighbor] = current_node
-
-                if distances[neighbor] < min_distance:
-                    min_distance = distances[neighbor]
-                    next_node = neighbor
-
-            if next_node is None:
-                break
-
-            current_node = next_node
-
-        path = []
-        node = end_node
-        while node is not None:
-            path.append(node)
-            node = parents[node]
-        path.reverse()
-
-        if not path or path[0] != start_node:
-            return "No hay ruta disponible", float('inf')
-        else:
-            return path, distances[end_node]
+from routing import Graph, SearchWorker # Núcleo de rutas sin dependencias gráficas
 
-    def show_graph(self):
-        archivo = open("caminos.txt", "r")
-        added_edges = set()  # Conjunto para evitar duplicados de aristas
-
-        for linea in archivo:
-            origen, destino, peso = linea.strip().split(',')
-            peso = float(peso)
-            if (origen, destino) not in added_edges and (destino, origen) not in added_edges:
-                self.add_edge(origen, destino, peso)
-                added_edges.add((origen, destino))
-        
-        archivo.close()
-        
-        G = nx.Graph()
-        for node, neighbors in self.graph_dict.items():
-            for neighbor, weight in neighbors:
-                G.add_edge(node, neighbor, weight=weight)
-
-        pos = nx.spring_layout(G, k=0.05, scale=0.5)
-        edges = G.edges()
-        weights = [G[u][v]['weight'] for u, v in edges]
-        min_edge_size = 1
-        max_edge_size = 3
-        edge_sizes = [min_edge_size + (max_edge_size - min_edge_size) * (w - min(weights)) / (max(weights) - min(weights)) for w in weights]
-
-        nx.draw(G, pos, with_labels=True, node_color='lightblue', edge_color='black', width=edge_sizes, node_size=700, font_size=8)
-        edge_labels = dict([((u, v,), f"{d['weight']:0.1f}") for u, v, d in G.edges(data=True)])
-        nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels, font_size=8)
+POLL_MS = 50 # Cada cuánto se revisa el hilo de búsqueda desde el bucle de Tk
+MAX_COMPLETIONS = 50 # Aeropuertos que se listan en cada combobox
 
 class GUI:
     def __init__(self, master):
@@ -166,41 +11,29 @@ class GUI:
         self.master = master
         master.title("MetroTravel") # Título de la ventana principal
         self.graph = Graph() # Instancia de la clase Graph para manejar el grafo
-        self.graph.show_graph() # Mostrar el grafo inicial
-        self.graph.load_visa_requirements("visa_requirements.txt")  # Cargar requisitos de visa desde archivo
-
-        city_dict = { # Diccionario para convertir códigos de aeropuerto a nombres de ciudad
-            "CCS": "Caracas",
-            "AUA": "Aruba",
-            "CUR": "Curazao",
-            "BON": "Bonaire",
-            "SXM": "Sint Maarten",
-            "SDQ": "Santo Domingo",
-            "SBH": "San Bartolomé",
-            "POS": "Puerto España",
-            "BGI": "Barbados",
-            "PTP": "Pointe-à-Pitre",
-            "FDF": "Fort-de-France"
-        }
-
-        # Crear campos de entrada para seleccionar origen y destino
-        origins = list(self.graph.graph_dict.keys())
-        destinations = list(self.graph.graph_dict.keys())
-
-        city_names_origins = [f"{code} - {city_dict.get(code, code)}" for code in origins]
-        city_names_destinations = [f"{code} - {city_dict.get(code, code)}" for code in destinations]
+        self.graph.load_network("caminos.txt", "visa_requirements.txt") # Cargar rutas y requisitos de visa (desde el snapshot binario si está al día)
+        self.graph.prepare_reachability() # Índice para descartar al instante las consultas sin ruta
+
+        # Crear campos de entrada para seleccionar origen y destino; la lista de
+        # cada uno se llena desde el índice con lo que se va escribiendo
+        self.airports = self.graph.airport_index("visa_requirements.txt") # Búsqueda por código o ciudad
+        self.completions = {} # Por combobox: {etiqueta mostrada: id del aeropuerto}
 
         self.start_label = tk.Label(master, text="Lugar de Origen:")
         self.start_label.grid(row=1, column=3, padx=10, pady=10)
         self.start_var = tk.StringVar()
-        self.start_combobox = ttk.Combobox(master, textvariable=self.start_var, values=city_names_origins)
+        self.start_combobox = ttk.Combobox(master, textvariable=self.start_var)
         self.start_combobox.grid(row=1, column=4, padx=10, pady=10)
+        self.start_combobox.bind("<KeyRelease>", lambda event: self.update_completions(event.widget))
+        self.update_completions(self.start_combobox)
 
         self.end_label = tk.Label(master, text="Lugar de Destino:")
         self.end_label.grid(row=2, column=3, padx=10, pady=10)
         self.end_var = tk.StringVar()
-        self.end_combobox = ttk.Combobox(master, textvariable=self.end_var, values=city_names_destinations)
+        self.end_combobox = ttk.Combobox(master, textvariable=self.end_var)
         self.end_combobox.grid(row=2, column=4, padx=10, pady=10)
+        self.end_combobox.bind("<KeyRelease>", lambda event: self.update_completions(event.widget))
+        self.update_completions(self.end_combobox)
 
         self.visa_var = tk.BooleanVar()
         self.visa_checkbox = tk.Checkbutton(master, text="¿Posee Visa?", variable=self.visa_var)
@@ -213,19 +46,47 @@ class GUI:
         self.search_button_2 = tk.Button(master, text="Numero Mínimo de Escalas", command=self.search_flights_num)
         self.search_button_2.grid(row=2, column=5, padx=10, pady=5)
 
+        self.search_button_3 = tk.Button(master, text="Costo y Escalas", command=self.search_flights_pareto)
+        self.search_button_3.grid(row=4, column=5, padx=10, pady=5)
+
         # Etiqueta para mostrar los resultados de la búsqued
         self.result_label = tk.Label(master, text="")
         self.result_label.grid(row=4, column=3, columnspan=2, padx=10, pady=10)
 
-        # Configurar el gráfico de NetworkX en un canvas de matplotlib
-        self.fig = plt.figure(figsize=(7, 4))
-        self.canvas = FigureCanvasTkAgg(self.fig, master)
-        self.canvas.draw()
-        self.canvas.get_tk_widget().grid(row=0, column=0, columnspan=10)
+        # El canvas de matplotlib se crea al dibujar por primera vez
+        self.fig = None
+        self.canvas = None
+        self.route_map = None
 
         self.exit_button = tk.Button(master, text="Salir", command=self.exit_app)
         self.exit_button.grid(row=3, column=5, padx=10, pady=10)
 
+        # Las búsquedas y el cálculo del dibujo corren en un hilo aparte; mientras
+        # tanto se muestra la barra de progreso y se puede cancelar
+        self.worker = SearchWorker()
+        self.polling = False
+        self.progress = ttk.Progressbar(master, mode="indeterminate", length=200)
+        self.progress.grid(row=5, column=3, columnspan=2, padx=10, pady=5)
+        self.progress.grid_remove()
+        self.cancel_button = tk.Button(master, text="Cancelar", command=self.cancel_search)
+        self.cancel_button.grid(row=5, column=5, padx=10, pady=5)
+        self.cancel_button.grid_remove()
+
+    def update_completions(self, combobox):
+        # Mostrar los aeropuertos que coinciden con lo escrito hasta ahora (si
+        # se acaba de elegir una etiqueta de la lista, se deja como está)
+        completions = self.completions.get(combobox, {})
+        if combobox.get() not in completions:
+            completions = self.completions[combobox] = self.airports.completions(combobox.get(), MAX_COMPLETIONS)
+            combobox["values"] = list(completions)
+
+    def selected_airport(self, combobox):
+        # Código del aeropuerto elegido de la lista o escrito como código o ciudad, o None
+        node = self.completions.get(combobox, {}).get(combobox.get())
+        if node is None:
+            node = self.airports.resolve(combobox.get())
+        return None if node is None else self.airports.codes[node]
+
     def search_flights(self):
         # Método para buscar vuelos basado en el costo mínimo
         # Validar que se haya seleccionado un origen y destino
@@ -233,8 +94,11 @@ class GUI:
             messagebox.showwarning("Advertencia", "Debe llenar todos los campos")
             return
         
-        start_node = self.start_var.get().split(" - ")[0]
-        end_node = self.end_var.get().split(" - ")[0]
+        start_node = self.selected_airport(self.start_combobox)
+        end_node = self.selected_airport(self.end_combobox)
+        if start_node is None or end_node is None:
+            messagebox.showwarning("Advertencia", "Seleccione un aeropuerto de la lista")
+            return
         has_visa = self.visa_var.get()
 
         # Validar que el origen y el destino no sean iguales
@@ -242,49 +106,28 @@ class GUI:
             messagebox.showwarning("Advertencia", "Seleccione un destino distinto al origen")
             return
 
-        path, total_distance, num_scales = self.graph.dijkstra(start_node, end_node, has_visa)
+        def show(result):
+            path, total_distance, num_scales = result
 
-        # Mostrar el resultado en la etiqueta correspondiente
-        if isinstance(path, str):
-            self.result_label.configure(text=path)
-        else:
-            self.result_label.configure(text=f"Desde {start_node} hasta {end_node}: {' -> '.join(path)}\nLa distancia total es: {total_distance}")
-        
-        # Visualizar el grafo resaltando la ruta encontrada
-        self.visualize_graph(path)
+            # Mostrar el resultado en la etiqueta correspondiente
+            if isinstance(path, str):
+                self.result_label.configure(text=path)
+            else:
+                self.result_label.configure(text=f"Desde {start_node} hasta {end_node}: {' -> '.join(path)}\nLa distancia total es: {total_distance}")
+
+            # Visualizar el grafo resaltando la ruta encontrada
+            self.visualize_graph(path)
+
+        self.run_search(lambda: self.graph.dijkstra(start_node, end_node, has_visa), show)
 
     #Funcion para mostrar el grafo
     def show_graph(self):
-        archivo = open("caminos.txt", "r")
-        added_edges = set()
-
-        for linea in archivo:
-            origen, destino, peso = linea.strip().split(',')
-            peso = float(peso)
-            if (origen, destino) not in added_edges and (destino, origen) not in added_edges:
-                self.graph.add_edge(origen, destino, peso)
-                added_edges.add((origen, destino))
-        
-        archivo.close()
-        
-        G = nx.Graph()
-        for node, neighbors in self.graph.graph_dict.items():
-            for neighbor, weight in neighbors:
-                G.add_edge(node, neighbor, weight=weight)
-
-        pos = nx.spring_layout(G, k=0.05, scale=0.5)
-        edges = G.edges()
-        weights = [G[u][v]['weight'] for u, v in edges]
-        min_edge_size = 1
-        max_edge_size = 3
-        edge_sizes = [min_edge_size + (max_edge_size - min_edge_size) * (w - min(weights)) / (max(weights) - min(weights)) for w in weights]
-
-        # Dibujar nodos con tamaño ajustado y etiquetas más pequeñas
-        nx.draw(G, pos, with_labels=True, node_color='lightblue', edge_color='black', width=edge_sizes, node_size=700, font_size=8)
-        
-        # Etiquetas de las aristas con fuente más pequeña
-        edge_labels = dict([((u, v,), f"{d['weight']:0.1f}") for u, v, d in G.edges(data=True)])
-        nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels, font_size=8)
+        # Las posiciones de la red se calculan en el fondo; luego se dibuja
+        def show(result):
+            self.result_label.configure(text="")
+            self.route_map.show()
+
+        self.run_search(lambda: None, show, "Dibujando la red...")
 
     def search_flights_num(self):
         # Método para buscar vuelos basado en el número mínimo de escalas
@@ -293,8 +136,11 @@ class GUI:
             messagebox.showwarning("Advertencia", "Debe llenar todos los campos")
             return
         
-        start_node = self.start_var.get().split(" - ")[0]
-        end_node = self.end_var.get().split(" - ")[0]
+        start_node = self.selected_airport(self.start_combobox)
+        end_node = self.selected_airport(self.end_combobox)
+        if start_node is None or end_node is None:
+            messagebox.showwarning("Advertencia", "Seleccione un aeropuerto de la lista")
+            return
         has_visa = self.visa_var.get()
 
         # Validar que el origen y el destino no sean iguales
@@ -302,48 +148,132 @@ class GUI:
             messagebox.showwarning("Advertencia", "Seleccione un destino distinto al origen")
             return
 
-        path, num_scales = self.graph.dijkstra_min_scales(start_node, end_node, has_visa)
+        def show(result):
+            path, num_scales = result
+            if isinstance(path, str):
+                self.result_label.configure(text=path)
+            else:
+                self.result_label.configure(text=f"Desde {start_node} hasta {end_node}: {' -> '.join(path)}\nEl número total de escalas es: {num_scales}")
 
-        if isinstance(path, str):
-            self.result_label.configure(text=path)
-        else:
-            self.result_label.configure(text=f"Desde {start_node} hasta {end_node}: {' -> '.join(path)}\nEl número total de escalas es: {num_scales}")
-        
-        self.visualize_graph(path)
+            self.visualize_graph(path)
+
+        self.run_search(lambda: self.graph.dijkstra_min_scales(start_node, end_node, has_visa), show)
+
+    def search_flights_pareto(self):
+        # Método para buscar de una vez todas las rutas que no son peores en
+        # costo y en escalas a la vez (de la más barata a la de menos escalas)
+        if not self.start_var.get() or not self.end_var.get():
+            messagebox.showwarning("Advertencia", "Debe llenar todos los campos")
+            return
+
+        start_node = self.selected_airport(self.start_combobox)
+        end_node = self.selected_airport(self.end_combobox)
+        if start_node is None or end_node is None:
+            messagebox.showwarning("Advertencia", "Seleccione un aeropuerto de la lista")
+            return
+        has_visa = self.visa_var.get()
+
+        if start_node == end_node:
+            messagebox.showwarning("Advertencia", "Seleccione un destino distinto al origen")
+            return
+
+        def show(routes):
+            if isinstance(routes, str):
+                self.result_label.configure(text=routes)
+                self.visualize_graph(routes)
+                return
+            lines = [f"{' -> '.join(path)}: costo {cost}, {num_scales} escalas" for path, cost, num_scales in routes]
+            self.result_label.configure(text=f"Desde {start_node} hasta {end_node}:\n" + "\n".join(lines))
+
+            # Resaltar la más barata
+            self.visualize_graph(routes[0][0])
+
+        self.run_search(lambda: self.graph.pareto_routes(start_node, end_node, has_visa), show)
+
+    def run_search(self, search, show, message="Buscando..."):
+        # Ejecutar la búsqueda y la parte pesada del dibujo en el hilo de fondo.
+        # Una búsqueda nueva cancela la que sigue corriendo; el resultado vuelve
+        # al bucle de Tk por poll_search() y `show` lo muestra.
+        self.ensure_canvas()
+        route_map = self.route_map
+
+        def task():
+            return search(), route_map.prepare()
+
+        def done(result, error):
+            if error is not None:
+                self.result_label.configure(text="")
+                messagebox.showerror("Error", f"La búsqueda falló: {error}")
+                return
+            value, update = result
+            route_map.apply(update)
+            show(value)
+
+        self.worker.submit(task, done)
+        self.result_label.configure(text=message)
+        self.progress.grid()
+        self.cancel_button.grid()
+        self.progress.start(15)
+        if not self.polling:
+            self.polling = True
+            self.master.after(POLL_MS, self.poll_search)
+
+    def poll_search(self):
+        # Entregar el resultado si ya llegó; seguir revisando mientras haya trabajo
+        self.polling = False
+        if self.worker.poll():
+            self.polling = True
+            self.master.after(POLL_MS, self.poll_search)
+            return
+        self.progress.stop()
+        self.progress.grid_remove()
+        self.cancel_button.grid_remove()
+
+    def cancel_search(self):
+        self.worker.cancel()
+        self.result_label.configure(text="Búsqueda cancelada")
 
     def visualize_graph(self, path):
-        # Método para mostrar el grafo con la ruta resaltada
-        G = nx.Graph()
-        for node, neighbors in self.graph.graph_dict.items():
-            for neighbor, weight in neighbors:
-                G.add_edge(node, neighbor, weight=weight)
-
-        pos = nx.spring_layout(G)
-        plt.clf()
-        
-        # Dibujar nodos con tamaño ajustado y etiquetas más pequeñas
-        nx.draw(G, pos, with_labels=True, node_color='lightblue', edge_color='black', width=1, node_size=700, font_size=8)
-        
-        if isinstance(path, list):
-            nx.draw_networkx_edges(G, pos, edgelist=list(zip(path[:-1], path[1:])), edge_color='r', width=2)
-        
-        # Etiquetas de las aristas con fuente más pequeña
-        edge_labels = dict([(edge, G[edge[0]][edge[1]]['weight']) for edge in G.edges()])
-        nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels, font_size=8)
-        
-        self.canvas.draw()
+        # Método para mostrar el grafo con la ruta resaltada: el fondo ya está
+        # dibujado y solo se repinta la ruta encima
+        self.ensure_canvas()
+        self.route_map.highlight(path)
+
+    def ensure_canvas(self):
+        # Importar matplotlib solo cuando se dibuja por primera vez
+        if self.canvas is None:
+            import matplotlib
+            matplotlib.use("TkAgg")
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            import matplotlib.pyplot as plt
+
+            # Configurar el gráfico de NetworkX en un canvas de matplotlib
+            self.fig = plt.figure(figsize=(7, 4))
+            self.canvas = FigureCanvasTkAgg(self.fig, self.master)
+            self.canvas.draw()
+            self.canvas.get_tk_widget().grid(row=0, column=0, columnspan=10)
+
+            # Grafo de networkx y posiciones se calculan una vez y se guardan en disco
+            from route_map import RouteMap
+            self.route_map = RouteMap(self.graph, self.fig, self.canvas, layout_file="caminos.layout.npz")
 
     def exit_app(self):
+        self.worker.close()
         self.master.destroy()
         self.master.quit()
 
 
-# Crear la ventana principal de la aplicación
-root = tk.Tk()
-gui = GUI(root)
+def main():
+    # Crear la ventana principal de la aplicación
+    root = tk.Tk()
+    gui = GUI(root)
+
+    # Mostrar el grafo inicial en la interfaz
+    gui.show_graph()
+
+    # Iniciar el bucle principal de la interfaz gráfica
+    root.mainloop()
 
-# Mostrar el grafo inicial en la interfaz
-gui.show_graph()
 
-# Iniciar el bucle principal de la interfaz gráfica
-root.mainloop()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+import hashlib
+import os
+
+import numpy as np
+from matplotlib.collections import LineCollection
+
+# Mapa de rutas sobre una figura de matplotlib, compartido por proyecto.py y
+# proyecto_dirigido.py. La red se dibuja una sola vez como fondo; cada búsqueda
+# solo repinta la ruta resaltada encima con blitting. Las posiciones se
+# conservan hasta que cambia la topología, y opcionalmente se guardan en disco.
+#
+# Nivel de detalle: todas las aristas van en un único LineCollection y solo se
+# dibuja lo que cae dentro de la vista. Si hay demasiados aeropuertos o aristas
+# visibles se muestran los de mayor grado, y las etiquetas de pesos solo aparecen para
+# la ruta resaltada y sus vecinos, salvo en vistas pequeñas. La rueda del
+# mouse acerca y aleja.
+DEFAULT_STYLE = {
+    "node_color": "lightblue",
+    "edge_color": "black",
+    "min_edge_width": 1,
+    "max_edge_width": 3,
+    "node_size": 700,
+    "font_size": 8,
+    "label_format": "{:0.1f}",
+    "path_color": "r",
+    "path_width": 2,
+    "layout_k": 0.05,
+    "layout_scale": 0.5,
+    "max_nodes": 400,         # aeropuertos dibujados como máximo (los de mayor grado)
+    "max_edges": 15000,       # aristas dibujadas como máximo (entre aeropuertos de mayor grado)
+    "max_node_labels": 80,    # nombres de aeropuerto solo si se dibujan a lo sumo tantos
+    "max_edge_labels": 60,    # pesos de todas las aristas visibles solo por debajo de esto
+    "max_route_labels": 16,   # pesos alrededor de la ruta resaltada
+    "width_levels": 5,        # grosores distintos cuando las aristas se agrupan
+    "zoom_step": 1.25,
+}
+
+LABEL_BOX = dict(boxstyle="round", ec=(1.0, 1.0, 1.0), fc=(1.0, 1.0, 1.0))
+
+
+class RouteMap:
+    def __init__(self, graph, figure, canvas, layout_file=None, style=None):
+        self.graph = graph
+        self.figure = figure
+        self.canvas = canvas
+        self.layout_file = layout_file
+        self.style = {**DEFAULT_STYLE, **(style or {})}
+        self.ax = None
+        self.background = None
+        self.overlay = None
+        self.overlay_labels = []
+        self.path = None
+        self._frozen = None  # CSR para el que valen las posiciones y aristas
+        self._version = None  # Versión del grafo de los precios dibujados
+        canvas.mpl_connect("draw_event", self._on_draw)
+        canvas.mpl_connect("scroll_event", self._on_scroll)
+
+    def refresh(self):
+        # Rehacer aristas y posiciones solo si cambió la topología
+        return self.apply(self.prepare())
+
+    def prepare(self):
+        # Parte pesada de refresh() (posiciones y geometría) sin tocar la figura
+        # ni el mapa, para poder calcularla en un hilo de fondo. Devuelve None
+        # si nada cambió, o los atributos nuevos para apply() en el hilo de Tk.
+        graph = self.graph
+        with graph.lock:
+            frozen = graph.freeze()
+            version = graph.version
+            if frozen is self._frozen and version == self._version:
+                return None
+            edges, edge_weights = undirected_edges(frozen)
+        if frozen is self._frozen:
+            # Mismo CSR con precios cambiados en el lugar: posiciones intactas
+            if np.array_equal(edge_weights, self.edge_weights):
+                return {"_version": version}
+            return {"_version": version, "edge_weights": edge_weights}
+        codes = list(frozen.codes)
+        signature = topology_signature(codes, edges)
+        positions = load_layout(self.layout_file, signature)
+        if positions is None:
+            positions = self.compute_layout(codes, edges, edge_weights)
+            if self.layout_file:
+                save_layout(self.layout_file, signature, positions)
+        xy = np.array([positions[code] for code in codes], dtype=float).reshape(-1, 2)
+
+        # Geometría de las aristas y aristas incidentes por aeropuerto
+        ends = xy[edges]
+        endpoints = edges.ravel()
+        incident_ptr = np.zeros(len(codes) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(endpoints, minlength=len(codes)), out=incident_ptr[1:])
+        return {"_frozen": frozen, "_version": version, "codes": codes, "edges": edges,
+                "edge_weights": edge_weights, "xy": xy, "index": {code: i for i, code in enumerate(codes)},
+                "segments": ends, "edge_min": ends.min(axis=1), "edge_max": ends.max(axis=1),
+                "incident": np.argsort(endpoints, kind='stable') // 2, "incident_ptr": incident_ptr,
+                "degree": np.diff(incident_ptr)}
+
+    def apply(self, update):
+        # Adoptar lo calculado por prepare(); True si hay que redibujar el fondo
+        if update is None:
+            return False
+        vars(self).update(update)
+        if "edge_weights" not in update:
+            return False
+        self.set_edge_widths()
+        self.ax = None
+        return True
+
+    def set_edge_widths(self):
+        low, high = self.edge_weights.min(initial=0), self.edge_weights.max(initial=0)
+        min_width, max_width = self.style["min_edge_width"], self.style["max_edge_width"]
+        span = (high - low) if high > low else 1.0
+        self.edge_widths = min_width + (max_width - min_width) * (self.edge_weights - low) / span
+
+    def compute_layout(self, codes, edges, edge_weights):
+        import networkx as nx
+
+        G = nx.Graph()
+        G.add_nodes_from(codes)
+        G.add_weighted_edges_from((codes[u], codes[v], w) for (u, v), w in zip(edges.tolist(), edge_weights.tolist()))
+        return nx.spring_layout(G, k=self.style["layout_k"], scale=self.style["layout_scale"])
+
+    def show(self):
+        # Dibujar la red completa sin ruta resaltada, con la vista inicial
+        self.refresh()
+        self.ax = None
+        self.path = None
+        self.draw_background()
+
+    def highlight(self, path):
+        # Resaltar `path` (lista de códigos; cualquier otra cosa borra el resaltado)
+        if self.refresh() or self.ax is None:
+            self.draw_background()
+        self.path = path if isinstance(path, list) else None
+        self.update_overlay()
+        if self.background is None:
+            self.canvas.draw()
+            return
+        self.blit()
+
+    def blit(self):
+        self.canvas.restore_region(self.background)
+        self.draw_overlay()
+        self.canvas.blit(self.figure.bbox)
+
+    def draw_background(self):
+        # Fondo para la vista actual (o la red completa si es el primer dibujo)
+        if self.ax is None:
+            self.figure.clf()
+            self.ax = self.figure.add_subplot()
+            self.ax.set_axis_off()
+            self.ax.set_xlim(*self.extent(0))
+            self.ax.set_ylim(*self.extent(1))
+        ax = self.ax
+        for artist in list(ax.collections) + list(ax.texts):
+            artist.remove()
+        style = self.style
+        (xmin, xmax), (ymin, ymax) = ax.get_xlim(), ax.get_ylim()
+
+        # Aristas que cruzan la vista; alejado, solo las de aeropuertos con más conexiones
+        visible = np.flatnonzero((self.edge_max[:, 0] >= xmin) & (self.edge_min[:, 0] <= xmax) &
+                                 (self.edge_max[:, 1] >= ymin) & (self.edge_min[:, 1] <= ymax))
+        if len(visible) > style["max_edges"]:
+            importance = self.degree[self.edges[visible]].sum(axis=1)
+            visible = visible[np.argpartition(-importance, style["max_edges"])[:style["max_edges"]]]
+        segments, widths = self.edge_paths(visible)
+        ax.add_collection(LineCollection(segments, colors=style["edge_color"], linewidths=widths, zorder=1),
+                          autolim=False)
+
+        # Aeropuertos dentro de la vista; si son demasiados, solo los de mayor grado
+        inside = np.flatnonzero((self.xy[:, 0] >= xmin) & (self.xy[:, 0] <= xmax) &
+                                (self.xy[:, 1] >= ymin) & (self.xy[:, 1] <= ymax))
+        if len(inside) > style["max_nodes"]:
+            keep = np.argpartition(-self.degree[inside], style["max_nodes"])[:style["max_nodes"]]
+            inside = inside[keep]
+        ax.scatter(self.xy[inside, 0], self.xy[inside, 1], s=style["node_size"], c=style["node_color"],
+                   zorder=2)
+        if len(inside) <= style["max_node_labels"]:
+            for node in inside.tolist():
+                ax.text(*self.xy[node], self.codes[node], fontsize=style["font_size"],
+                        ha="center", va="center", zorder=3, clip_on=True)
+
+        self.labelled_edges = set()
+        if len(visible) <= style["max_edge_labels"]:
+            self.labelled_edges = set(visible.tolist())
+            for edge in visible.tolist():
+                self.edge_label(edge, animated=False)
+
+        self.overlay = LineCollection([], colors=style["path_color"], linewidths=style["path_width"],
+                                      animated=True, zorder=4)
+        ax.add_collection(self.overlay, autolim=False)
+        self.overlay_labels = []
+        self.update_overlay()
+        self.background = None
+        self.canvas.draw()
+
+    def edge_paths(self, edges):
+        # Segmentos para el LineCollection de aristas. Con muchas aristas se agrupan
+        # por grosor en unas pocas polilíneas cortadas con NaN: matplotlib crea un
+        # Path por segmento y eso domina el tiempo de dibujo.
+        if len(edges) <= 1000:
+            return self.segments[edges], self.edge_widths[edges]
+        levels = self.style["width_levels"]
+        low, high = self.edge_widths.min(), self.edge_widths.max()
+        level = np.rint((self.edge_widths[edges] - low) / ((high - low) or 1.0) * (levels - 1)).astype(int)
+        segments, widths = [], []
+        for value in range(levels):
+            chosen = edges[level == value]
+            if len(chosen):
+                polyline = np.full((len(chosen), 3, 2), np.nan)
+                polyline[:, :2] = self.segments[chosen]
+                segments.append(polyline.reshape(-1, 2))
+                widths.append(low + (high - low) * value / max(levels - 1, 1))
+        return segments, widths
+
+    def update_overlay(self):
+        # Segmentos de la ruta y pesos de la ruta y sus vecinos (artistas animados)
+        for label in self.overlay_labels:
+            label.remove()
+        self.overlay_labels = []
+        if self.path is None or any(code not in self.index for code in self.path):
+            self.overlay.set_segments([])
+            return
+        nodes = [self.index[code] for code in self.path]
+        self.overlay.set_segments(self.xy[np.array(nodes)][np.newaxis] if len(nodes) > 1 else [])
+
+        route = set()
+        for a, b in zip(nodes[:-1], nodes[1:]):
+            for edge in self.incident_edges(a).tolist():
+                if b in self.edges[edge]:
+                    route.add(edge)
+        neighborhood = [edge for node in nodes for edge in self.incident_edges(node).tolist()
+                        if edge not in route]
+        (xmin, xmax), (ymin, ymax) = self.ax.get_xlim(), self.ax.get_ylim()
+        candidates = []
+        for edge in list(route) + list(dict.fromkeys(neighborhood)):
+            x, y = self.segments[edge].mean(axis=0)
+            if edge not in self.labelled_edges and xmin <= x <= xmax and ymin <= y <= ymax:
+                candidates.append(edge)
+        for edge in candidates[:self.style["max_route_labels"]]:
+            self.overlay_labels.append(self.edge_label(edge, animated=True))
+
+    def draw_overlay(self):
+        self.figure.draw_artist(self.overlay)
+        for label in self.overlay_labels:
+            self.figure.draw_artist(label)
+
+    def incident_edges(self, node):
+        return self.incident[self.incident_ptr[node]:self.incident_ptr[node + 1]]
+
+    def edge_label(self, edge, animated):
+        (x0, y0), (x1, y1) = self.segments[edge]
+        return self.ax.text((x0 + x1) / 2, (y0 + y1) / 2, self.style["label_format"].format(self.edge_weights[edge]),
+                            fontsize=self.style["font_size"], ha="center", va="center", bbox=LABEL_BOX,
+                            zorder=5, clip_on=True, animated=animated)
+
+    def extent(self, axis):
+        # Límites de la red completa en un eje, con un margen
+        if len(self.xy) == 0:
+            return -1.0, 1.0
+        low, high = self.xy[:, axis].min(), self.xy[:, axis].max()
+        margin = 0.1 * (high - low) if high > low else 0.1
+        return low - margin, high + margin
+
+    def _on_draw(self, event):
+        # Tras cada dibujo completo (también al redimensionar) guardar el fondo
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        if self.overlay is not None:
+            self.draw_overlay()
+
+    def _on_scroll(self, event):
+        # Acercar o alejar alrededor del cursor y redibujar el nivel de detalle
+        if self.ax is None or event.inaxes is not self.ax:
+            return
+        factor = self.style["zoom_step"] ** (-event.step)
+        for get, set_, center in ((self.ax.get_xlim, self.ax.set_xlim, event.xdata),
+                                  (self.ax.get_ylim, self.ax.set_ylim, event.ydata)):
+            low, high = get()
+            set_(center - (center - low) * factor, center + (high - center) * factor)
+        self.draw_background()
+
+
+def undirected_edges(frozen):
+    # Aristas únicas sin dirección (u, v) con su peso; entre repetidas gana la última
+    sources = np.repeat(np.arange(frozen.num_nodes), np.diff(frozen.indptr))
+    targets = frozen.indices.astype(np.int64)
+    low, high = np.minimum(sources, targets), np.maximum(sources, targets)
+    keys = (low << 32) | high
+    _, last = np.unique(keys[::-1], return_index=True)
+    last = np.sort(len(keys) - 1 - last)
+    last = last[low[last] != high[last]]
+    return np.column_stack((low[last], high[last])), frozen.weights[last].astype(float)
+
+
+def topology_signature(codes, edges):
+    # Huella de nodos y aristas; las posiciones guardadas solo valen para ella
+    digest = hashlib.sha1()
+    for code in sorted(codes):
+        digest.update(code.encode('utf-8') + b"\n")
+    for edge in sorted(tuple(sorted((codes[u], codes[v]))) for u, v in edges.tolist()):
+        digest.update(",".join(edge).encode('utf-8') + b"\n")
+    return digest.hexdigest()
+
+
+def load_layout(filename, signature):
+    if not filename or not os.path.exists(filename):
+        return None
+    with np.load(filename) as saved:
+        if str(saved["signature"]) != signature:
+            return None
+        return dict(zip(saved["codes"].tolist(), saved["positions"]))
+
+
+def save_layout(filename, signature, positions):
+    codes = list(positions)
+    np.savez(filename, signature=signature, codes=np.array(codes, dtype=str),
+             positions=np.array([positions[code] for code in codes]).reshape(-1, 2))
@@ -0,0 +1,10 @@
+# Núcleo de búsqueda de rutas de MetroTravel.
+# No importa tkinter, matplotlib ni networkx: se puede usar sin pantalla.
+from .airports import AirportIndex
+from .cache import QueryCache
+from .csr import CSRGraph
+from .graph import Graph, DirectedGraph
+from .instrumentation import Profiler, QueryStats
+from .loaders import read_routes, read_visa_requirements
+from .timetable import Timetable, format_time
+from .worker import SearchWorker
@@ -0,0 +1,184 @@
+import unicodedata
+
+import numpy as np
+
+from .ingest import _gather
+
+# Índice de búsqueda de aeropuertos por código y nombre de ciudad, para
+# autocompletar en las interfaces. Los textos se normalizan (minúsculas, sin
+# acentos) y se guardan en un solo búfer de bytes; sobre él hay tres arreglos
+# ordenados de claves de ancho fijo (códigos, nombres completos y nombres
+# desde cada palabra, para que "juan" encuentre "San Juan") que se buscan por
+# prefijo con searchsorted, y un índice de n-gramas de hasta tres bytes
+# (n-grama -> aeropuertos, en forma CSR) para buscar en cualquier parte del
+# texto. Cada resultado es el id del aeropuerto en el grafo (el de
+# freeze().ids), no un texto que haya que volver a separar.
+KEY_BYTES = 24  # Las claves se truncan; las búsquedas más largas se verifican contra el búfer
+NGRAM = 3  # Largo máximo de los n-gramas indexados
+CHECK_BATCH = 256  # Primera tanda de candidatos en las búsquedas en medio del texto
+SEPARATOR = 0
+
+
+def normalize(text):
+    # "Pointe-à-Pitre" -> "pointe-a-pitre"
+    if text.isascii():
+        return text.strip().lower()
+    decomposed = unicodedata.normalize("NFKD", text.strip().casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def _sorted_keys(buf, starts, ends, owners):
+    # Claves (bytes de ancho fijo) desde cada inicio hasta el fin de su texto, ordenadas
+    keys = _gather(buf, starts, np.minimum(ends - starts, KEY_BYTES), KEY_BYTES)
+    order = np.argsort(keys, kind='stable')
+    return keys[order], owners[order], starts[order]
+
+
+class AirportIndex:
+    def __init__(self, codes, names=None):
+        # codes: códigos por id de nodo; names: {código: ciudad} (por ejemplo
+        # la columna de ciudades de visa_requirements.txt)
+        names = names or {}
+        self.codes = list(codes)
+        self.names = [names.get(code) or code for code in self.codes]
+        texts = [normalize(code).encode('utf-8') for code in self.codes]
+        texts += [normalize(name).encode('utf-8') for name in self.names]
+        # Búfer: el código normalizado de cada aeropuerto, luego los nombres,
+        # separados por ceros; owners dice a qué aeropuerto pertenece cada texto
+        lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+        self.text_starts = np.zeros(len(texts), dtype=np.int64)
+        np.cumsum(lengths[:-1] + 1, out=self.text_starts[1:])
+        self.text_ends = self.text_starts + lengths
+        self.buffer = b"\0".join(texts)
+        buf = np.frombuffer(self.buffer, dtype=np.uint8)
+        num_airports = len(self.codes)
+        owners = np.tile(np.arange(num_airports, dtype=np.int64), 2)
+
+        code_range, name_range = slice(0, num_airports), slice(num_airports, 2 * num_airports)
+        self.code_keys = _sorted_keys(buf, self.text_starts[code_range], self.text_ends[code_range],
+                                      owners[code_range])
+        self.name_keys = _sorted_keys(buf, self.text_starts[name_range], self.text_ends[name_range],
+                                      owners[name_range])
+        # Palabras que no son la primera del nombre: posiciones tras un espacio,
+        # guion o paréntesis dentro de los nombres
+        text_of = np.repeat(np.arange(len(texts)), lengths + 1)[:len(buf)]
+        in_names = text_of >= num_airports
+        breaks = np.isin(buf, np.frombuffer(b" -(/", dtype=np.uint8))
+        word_starts = np.flatnonzero(breaks[:-1] & in_names[:-1] & ~breaks[1:] & (buf[1:] != SEPARATOR)) + 1
+        self.word_keys = _sorted_keys(buf, word_starts, self.text_ends[text_of[word_starts]],
+                                      owners[text_of[word_starts]])
+        self._ngrams(buf, text_of, owners)
+
+    def _ngrams(self, buf, text_of, owners):
+        # N-grama (uno a tres bytes como un entero, con el largo en el byte
+        # alto) -> aeropuertos que lo contienen
+        wide = buf.astype(np.int64)
+        keys = []
+        for n in range(1, min(NGRAM, len(buf)) + 1):
+            grams = np.full(len(buf) - n + 1, n << 24, dtype=np.int64)
+            valid = np.ones(len(grams), dtype=bool)
+            for i in range(n):
+                grams |= wide[i:len(buf) - n + 1 + i] << (8 * (n - 1 - i))
+                valid &= buf[i:len(buf) - n + 1 + i] != SEPARATOR
+            keys.append((grams[valid] << 32) | owners[text_of[:len(grams)][valid]])
+        pairs = np.sort(np.concatenate(keys)) if keys else np.zeros(0, dtype=np.int64)
+        pairs = pairs[np.diff(pairs, prepend=-1) != 0]  # Un aeropuerto por n-grama
+        grams, self.gram_owners = pairs >> 32, pairs & 0xFFFFFFFF
+        first = np.flatnonzero(np.diff(grams, prepend=-1))  # Ya ordenados: donde cambia el n-grama
+        self.gram_keys = grams[first]
+        self.gram_indptr = np.append(first, len(grams))
+
+    def _postings(self, gram):
+        position = int(np.searchsorted(self.gram_keys, gram))
+        if position == len(self.gram_keys) or self.gram_keys[position] != gram:
+            return self.gram_owners[:0]
+        return self.gram_owners[self.gram_indptr[position]:self.gram_indptr[position + 1]]
+
+    def __len__(self):
+        return len(self.codes)
+
+    def label(self, node):
+        # Texto para mostrar: "CCS - Caracas"
+        return f"{self.codes[node]} - {self.names[node]}"
+
+    def _prefix(self, keys, query, limit, found):
+        # Agregar a `found` (dict ordenado) los aeropuertos cuyas claves empiezan por `query`
+        keys, owners, starts = keys
+        probe = query[:KEY_BYTES]
+        low = int(np.searchsorted(keys, probe, side='left'))
+        high = int(np.searchsorted(keys, probe + b"\xff", side='left'))
+        for position in range(low, high):
+            if len(found) >= limit:
+                return
+            owner = int(owners[position])
+            if owner in found:
+                continue
+            if len(query) > KEY_BYTES and not self.buffer.startswith(query, int(starts[position])):
+                continue
+            found[owner] = None
+
+    def _substring(self, query, limit, found):
+        # Aeropuertos con `query` en cualquier parte del código o del nombre.
+        # Candidatos: la lista más corta de entre las de sus n-gramas, por
+        # tandas (de CHECK_BATCH, y cada vez cuatro veces más grandes); cada
+        # tanda se cruza con las demás listas y se verifica en el búfer, hasta
+        # juntar `limit`.
+        n = min(NGRAM, len(query))
+        lists = sorted((self._postings((n << 24) | int.from_bytes(query[i:i + n], 'big'))
+                        for i in range(len(query) - n + 1)), key=len)
+        if len(lists[0]) == 0:
+            return
+        buffer, starts, ends, num_airports = self.buffer, self.text_starts, self.text_ends, len(self.codes)
+        exact = len(query) <= NGRAM  # El n-grama es toda la búsqueda: no hace falta verificar
+        batch, size = 0, CHECK_BATCH
+        while batch < len(lists[0]):
+            candidates = lists[0][batch:batch + size]
+            batch, size = batch + size, size * 4
+            for postings in lists[1:]:
+                positions = np.minimum(np.searchsorted(postings, candidates), len(postings) - 1)
+                candidates = candidates[postings[positions] == candidates]
+            for owner in candidates.tolist():
+                if len(found) >= limit:
+                    return
+                if owner in found:
+                    continue
+                if (exact or buffer.find(query, int(starts[owner]), int(ends[owner])) >= 0
+                        or buffer.find(query, int(starts[num_airports + owner]), int(ends[num_airports + owner])) >= 0):
+                    found[owner] = None
+
+    def search(self, text, limit=20):
+        # Hasta `limit` ids de aeropuerto para lo que se lleva escrito, sin
+        # distinguir mayúsculas ni acentos: primero los códigos que empiezan
+        # así (el exacto primero), luego los nombres, luego las palabras del
+        # nombre y al final los que lo contienen en cualquier parte
+        query = normalize(text).encode('utf-8')
+        if not query or not self.codes:
+            return list(range(min(limit, len(self.codes))))
+        found = {}
+        for keys in (self.code_keys, self.name_keys, self.word_keys):
+            self._prefix(keys, query, limit, found)
+        if len(found) < limit:
+            self._substring(query, limit, found)
+        return list(found)
+
+    def completions(self, text, limit=20):
+        # {etiqueta: id} para llenar un combobox
+        return {self.label(node): node for node in self.search(text, limit)}
+
+    def resolve(self, text):
+        # Id del aeropuerto escrito como código o como nombre exacto (sin
+        # distinguir mayúsculas ni acentos), o None si no hay uno solo
+        query = normalize(text).encode('utf-8')
+        if not query or not self.codes:
+            return None
+        for keys in (self.code_keys, self.name_keys):
+            found = {}
+            self._prefix(keys, query, 2, found)
+            exact = [node for node in found if self._text(node, keys is self.name_keys) == query]
+            if len(exact) == 1:
+                return exact[0]
+        return None
+
+    def _text(self, node, name):
+        text = node + len(self.codes) * name
+        return self.buffer[self.text_starts[text]:self.text_ends[text]]
@@ -0,0 +1,187 @@
+import json
+import multiprocessing
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .csr import Workspace
+from .engine import INF, dijkstra, extract_path, path_cost
+from .landmarks import view_signature
+from .snapshot import load_views, write_views
+
+# Tabla precalculada de todas las rutas más baratas, para redes chicas y
+# medianas: un árbol de caminos mínimos por origen y por vista de visa. Por
+# cada (visa, origen, destino) se guardan el costo (float32), las escalas
+# de esa ruta (int16, -1 si no hay ruta) y el predecesor del destino
+# (int32), así que cualquier ruta se reconstruye en O(largo de la ruta).
+#
+# Archivo mapeable en memoria, con el mismo esquema que snapshot.py:
+#   MAGIC | versión (uint16) | largo del encabezado (uint32) | encabezado JSON
+#   | arreglos alineados a 64 bytes (distances, hops, parents)
+# Los procesos del pool escriben sus filas directamente sobre el archivo
+# mapeado (memoria compartida respaldada por el archivo) y leen las vistas
+# del grafo de un archivo de vistas (snapshot.write_views), también mapeado,
+# sin copiarlas.
+MAGIC = b"MTAPSP"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+_PREFIX = struct.Struct("<6sHI")
+ROWS_PER_TASK = 32
+
+_worker_state = None
+
+
+def _layout(num_nodes):
+    shape = (2, num_nodes, num_nodes)
+    layout = {}
+    offset = 0
+    for name, dtype in (("distances", "<f4"), ("hops", "<i2"), ("parents", "<i4")):
+        layout[name] = [offset, dtype, shape]
+        offset += -(-int(np.prod(shape)) * np.dtype(dtype).itemsize // ALIGNMENT) * ALIGNMENT
+    return layout, offset
+
+
+def _map(filename, header, mode):
+    buffer = np.memmap(filename, dtype=np.uint8, mode=mode)
+    arrays = {}
+    for name, (offset, dtype, shape) in header["arrays"].items():
+        dtype = np.dtype(dtype)
+        start = header["data_start"] + offset
+        arrays[name] = buffer[start:start + int(np.prod(shape)) * dtype.itemsize].view(dtype).reshape(shape)
+    return arrays
+
+
+def read_header(filename):
+    # Encabezado de la tabla, o None si el archivo no existe o es de otro formato
+    try:
+        with open(filename, 'rb') as file:
+            magic, version, length = _PREFIX.unpack(file.read(_PREFIX.size))
+            if magic != MAGIC or version != FORMAT_VERSION:
+                return None
+            header = json.loads(file.read(length))
+    except (OSError, struct.error, ValueError):
+        return None
+    header["data_start"] = -(-(_PREFIX.size + length) // ALIGNMENT) * ALIGNMENT
+    return header
+
+
+def tree_rows(view, source, workspace=None):
+    # Fila de la tabla para un origen: costos, escalas y predecesores
+    ws = dijkstra(view, source, workspace=workspace)
+    distances = np.array(ws.distances, dtype=np.float64)
+    parents = np.array(ws.parents, dtype=np.int32)
+    # Escalas por saltos de punteros: cada ronda duplica el tramo sumado
+    hops = (parents >= 0).astype(np.int32)
+    pointer = parents.copy()
+    active = np.flatnonzero(pointer >= 0)
+    while len(active):
+        hops[active] += hops[pointer[active]]
+        pointer[active] = pointer[pointer[active]]
+        active = active[pointer[active] >= 0]
+    hops[distances == INF] = -1
+    return distances.astype(np.float32), hops.astype(np.int16), parents
+
+
+def _init_worker(views_file, filename, header):
+    # Los procesos arrancan con "spawn", como en batch.py: la construcción
+    # puede correr en un hilo de fondo (Graph.prepare_route_table) y con
+    # "fork" el hijo podría heredar el candado del grafo tomado
+    _start(load_views(views_file), filename, header)
+
+
+def _start(views, filename, header):
+    # Arreglos de trabajo propios: la construcción puede correr en un hilo de
+    # fondo mientras otras consultas usan los de las vistas (Graph.route_table)
+    global _worker_state
+    _worker_state = (views, _map(filename, header, 'r+'), [Workspace(view.num_nodes) for view in views])
+
+
+def _fill(task):
+    has_visa, start, stop = task
+    views, arrays, workspaces = _worker_state
+    for source in range(start, stop):
+        row = tree_rows(views[has_visa], source, workspaces[has_visa].reset())
+        for name, values in zip(("distances", "hops", "parents"), row):
+            arrays[name][has_visa, source] = values
+    return stop - start
+
+
+class RouteTable:
+    def __init__(self, header, arrays):
+        self.header = header
+        self.codes = header["codes"]
+        self.signatures = header["signatures"]  # Huellas de las vistas (sin visa, con visa)
+        self.distances = arrays["distances"]
+        self.hops = arrays["hops"]
+        self.parents = arrays["parents"]
+
+    @classmethod
+    def build(cls, views, filename, workers=None, progress=None):
+        # Un árbol por (visa, origen), repartidos en un pool de procesos.
+        # Se escribe en un temporal y se renombra al terminar.
+        num_nodes = views[0].num_nodes
+        layout, size = _layout(num_nodes)
+        header = {"codes": list(views[0].codes), "signatures": [view_signature(view) for view in views],
+                  "arrays": layout}
+        encoded = json.dumps(header).encode('utf-8')
+        header["data_start"] = -(-(_PREFIX.size + len(encoded)) // ALIGNMENT) * ALIGNMENT
+        partial = filename + ".tmp"
+        with open(partial, 'wb') as file:
+            file.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, len(encoded)))
+            file.write(encoded)
+            file.truncate(header["data_start"] + size)
+
+        tasks = [(has_visa, start, min(start + ROWS_PER_TASK, num_nodes))
+                 for has_visa in (0, 1) for start in range(0, num_nodes, ROWS_PER_TASK)]
+        done = 0
+        if workers is not None and workers > 1:
+            views_file = filename + ".views"
+            write_views(views_file, views)
+            try:
+                with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                                         initializer=_init_worker, initargs=(views_file, partial, header)) as pool:
+                    for rows in pool.map(_fill, tasks):
+                        done += rows
+                        if progress is not None:
+                            progress(done, 2 * num_nodes)
+            finally:
+                os.remove(views_file)
+        else:
+            _start(views, partial, header)
+            for task in tasks:
+                done += _fill(task)
+                if progress is not None:
+                    progress(done, 2 * num_nodes)
+        global _worker_state
+        _worker_state = None
+        os.replace(partial, filename)
+        return cls.load(filename)
+
+    @classmethod
+    def load(cls, filename):
+        header = read_header(filename)
+        if header is None:
+            return None
+        return cls(header, _map(filename, header, 'r'))
+
+    def matches(self, views):
+        return self.signatures == [view_signature(view) for view in views]
+
+    def route(self, has_visa, source, target):
+        # (costo aproximado en float32, ruta de ids) o (inf, None)
+        if self.hops[has_visa, source, target] < 0:
+            return INF, None
+        return float(self.distances[has_visa, source, target]), extract_path(self.parents[has_visa, source], source,
+                                                                             target)
+
+    def exact_route(self, view, has_visa, source, target):
+        # Igual que route() pero con el costo recalculado en float64 sobre la vista
+        _, path = self.route(has_visa, source, target)
+        if path is None:
+            return INF, None
+        return path_cost(view, path), path
+
+    def nbytes(self):
+        return self.distances.nbytes + self.hops.nbytes + self.parents.nbytes
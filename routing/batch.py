@@ -0,0 +1,116 @@
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+import tempfile
+
+from .engine import INF, dijkstra, extract_path
+from .snapshot import load_views, write_views
+
+NO_ROUTE = "No hay ruta disponible"
+
+# Vistas del grafo mapeadas por cada proceso del pool (ver _init_worker)
+_worker_views = None
+
+
+def _init_worker(views_file):
+    # Los procesos arrancan con "spawn" como en service.py: "fork" no existe
+    # en Windows y, desde la interfaz con hilos de fondo, el hijo podría
+    # heredar el candado del grafo tomado. Cada uno mapea una vez el archivo
+    # de vistas (snapshot.write_views) en lugar de recibir una copia: los
+    # arreglos de aristas se leen de las mismas páginas en todos los procesos.
+    global _worker_views
+    _worker_views = load_views(views_file)
+
+
+def tree_answers(view, source, targets, unit_weights):
+    # Un árbol de caminos mínimos desde `source` y la respuesta para cada destino
+    ws = dijkstra(view, source, unit_weights=unit_weights)
+    answers = []
+    for target in targets:
+        if ws.distances[target] == INF:
+            answers.append((INF, None))
+        else:
+            answers.append((ws.distances[target], extract_path(ws.parents, source, target)))
+    return answers
+
+
+def _worker_group(args):
+    has_visa, source, targets, unit_weights = args
+    return tree_answers(_worker_views[has_visa], source, targets, unit_weights)
+
+
+def _locked_answers(graph, views, jobs):
+    # En este proceso: cada árbol usa los arreglos de trabajo de la vista,
+    # compartidos con las demás consultas al grafo, así que toma su candado
+    for has_visa, source, targets, unit_weights in jobs:
+        with graph.lock:
+            answers = tree_answers(views[has_visa], source, targets, unit_weights)
+        yield answers
+
+
+def route_many(graph, queries, unit_weights=False, workers=None):
+    # Responder muchas consultas (origen, destino, has_visa) con un solo árbol
+    # por cada par (origen, visa) distinto. Los resultados tienen la misma
+    # forma que Graph.dijkstra (o dijkstra_min_scales con unit_weights) y se
+    # entregan en el orden de entrada a medida que sus grupos terminan.
+    queries = list(queries)
+    results = [None] * len(queries)
+    groups = {}
+    with graph.lock:
+        frozen = graph.freeze()
+        views = (graph.view(False), graph.view(True))
+        for i, (start_node, end_node, has_visa) in enumerate(queries):
+            message = graph.visa_rejection(start_node, end_node, has_visa)
+            source = frozen.ids.get(start_node)
+            target = frozen.ids.get(end_node)
+            if message:
+                results[i] = message
+            elif source is None or target is None:
+                results[i] = NO_ROUTE
+            else:
+                members = groups.setdefault((bool(has_visa), source), ([], []))
+                members[0].append(i)
+                members[1].append(target)
+
+    jobs = [(has_visa, source, targets, unit_weights)
+            for (has_visa, source), (_, targets) in groups.items()]
+    pool = views_file = None
+    if workers is not None and workers > 1 and len(jobs) > 1:
+        handle, views_file = tempfile.mkstemp(suffix=".views")
+        os.close(handle)
+        write_views(views_file, views)
+        pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=_init_worker, initargs=(views_file,))
+        answers = pool.map(_worker_group, jobs, chunksize=max(1, len(jobs) // (workers * 4)))
+    else:
+        answers = _locked_answers(graph, views, jobs)
+
+    try:
+        next_index = 0
+        for (indices, _), group_answers in zip(groups.values(), answers):
+            for i, (cost, path) in zip(indices, group_answers):
+                results[i] = (cost, path)
+            # Entregar el prefijo de resultados que ya está completo
+            while next_index < len(results) and results[next_index] is not None:
+                yield _format(frozen, results[next_index], unit_weights)
+                results[next_index] = None
+                next_index += 1
+        while next_index < len(results):
+            yield _format(frozen, results[next_index], unit_weights)
+            next_index += 1
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        if views_file is not None:
+            os.remove(views_file)
+
+
+def _format(frozen, result, unit_weights):
+    # Convertir al formato de Graph.dijkstra / dijkstra_min_scales
+    if isinstance(result, str):
+        return (result, INF) if unit_weights else (result, INF, INF)
+    cost, path = result
+    if path is None:
+        return (NO_ROUTE, INF) if unit_weights else (NO_ROUTE, INF, INF)
+    path = [frozen.codes[node] for node in path]
+    return (path, cost) if unit_weights else (path, cost, len(path) - 1)
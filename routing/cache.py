@@ -0,0 +1,119 @@
+from collections import OrderedDict
+
+import numpy as np
+
+
+class LRU:
+    # Diccionario acotado por número de entradas; la menos usada sale primero
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class QueryCache:
+    # Memoización de consultas frente a Graph.dijkstra y dijkstra_min_scales.
+    # Guarda respuestas completas por (origen, destino, visa, criterio) y
+    # árboles de caminos mínimos por (origen, visa, criterio): el árbol se
+    # calcula la segunda vez que se consulta un mismo origen, y desde ahí
+    # cualquier destino se responde recorriendo los padres. Cuando cambia la
+    # versión del grafo se descarta todo, salvo que los únicos cambios hayan
+    # sido tramos anotados con note_change(): entonces los árboles se reparan
+    # (routing/dynamic.py). Las respuestas se acotan por número de entradas y
+    # los árboles por bytes (12 B por aeropuerto cada uno).
+    def __init__(self, max_entries=1024, max_tree_bytes=64 * 2**20):
+        self.results = LRU(max_entries)
+        self.trees = LRU(0)
+        self.max_tree_bytes = max_tree_bytes
+        self.origins = LRU(max_entries)
+        self.version = None
+        self.changes = {}  # versión -> tramos (origen, destino) cambiados en ella
+        self.hits = 0
+        self.misses = 0
+        self.tree_hits = 0
+
+    def sync(self, version, repair=None):
+        # Vaciar el caché si el grafo cambió desde la última consulta, o reparar
+        # los árboles con repair(clave, árbol, tramos) -> árbol si todos los
+        # cambios intermedios fueron de tramos
+        if version == self.version:
+            return
+        steps = range(self.version + 1, version + 1) if self.version is not None else ()
+        if repair is not None and steps and all(step in self.changes for step in steps):
+            legs = set().union(*(self.changes[step] for step in steps))
+            for key, tree in list(self.trees.entries.items()):
+                self.trees.entries[key] = repair(key, tree, legs)
+            self.results.clear()
+            self.changes.clear()
+            self.version = version
+        else:
+            self.clear()
+            self.version = version
+
+    def note_change(self, version, legs):
+        # Tramos que cambiaron al pasar a `version` (sin tocar visas ni vistas)
+        if self.version is not None:
+            self.changes[version] = legs
+
+    def get(self, key):
+        result = self.results.get(key)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def put(self, key, result):
+        self.results.put(key, result)
+
+    def tree(self, key):
+        tree = self.trees.get(key)
+        if tree is not None:
+            self.tree_hits += 1
+        return tree
+
+    def wants_tree(self, key):
+        # Primera consulta desde un origen: búsqueda punto a punto; la segunda construye el árbol
+        if key in self.origins:
+            return self.max_tree_bytes > 0
+        self.origins.put(key, True)
+        return False
+
+    def put_tree(self, key, workspace):
+        # Copias compactas: el Workspace se reutiliza en la siguiente consulta
+        distances = np.array(workspace.distances, dtype=np.float64)
+        parents = np.array(workspace.parents, dtype=np.int32)
+        self.trees.max_entries = self.max_tree_bytes // (distances.nbytes + parents.nbytes)
+        self.trees.put(key, (distances, parents))
+        return distances, parents
+
+    def clear(self):
+        self.results.clear()
+        self.trees.clear()
+        self.origins.clear()
+        self.changes.clear()
+        self.version = None
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "tree_hits": self.tree_hits,
+                "entries": len(self.results), "trees": len(self.trees)}
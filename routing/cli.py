@@ -0,0 +1,176 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .graph import DirectedGraph, Graph
+from .instrumentation import Histogram
+from .service import CRITERIA, answer, parse_flag
+
+# Consultas por lotes sin interfaz: lee (origen, destino, visa, criterio) de
+# un CSV o de JSON lines, desde un archivo o la entrada estándar, y escribe una
+# respuesta JSON por línea en el mismo orden, con el formato de /route en
+# service.py. Se lee y se escribe por bloques de --chunk consultas, con a lo
+# sumo dos bloques en vuelo por proceso, así que la memoria no crece con el
+# archivo (aparte del caché de consultas de cada grafo, que QueryCache acota).
+# Con --workers N los bloques se reparten entre N procesos que mapean el mismo
+# snapshot binario (cada uno carga el grafo una sola vez). Al final se imprime
+# un resumen en stderr.
+#
+#   python -m routing.cli consultas.csv -o respuestas.jsonl --workers 4
+#   cat consultas.jsonl | python -m routing.cli --directed > respuestas.jsonl
+#
+# CSV: origen,destino[,visa[,criterio]], con encabezado opcional.
+# JSON lines: {"origin": ..., "destination": ..., "visa": ..., "criterion": "cost" | "stops"}
+NO_ROUTE = "No hay ruta disponible"
+INVALID = f"Se requieren origin, destination y criterion en {'/'.join(CRITERIA)}"
+
+
+def parse_query(line, default_criterion="cost"):
+    # (origen, destino, visa, criterio), None para encabezados y líneas vacías,
+    # o el mensaje de error si la línea no es una consulta válida
+    text = line.strip()
+    if not text:
+        return None
+    if text.startswith("{"):
+        try:
+            params = json.loads(text)
+        except ValueError as error:
+            return f"JSON inválido: {error}"
+        origin, destination = params.get("origin"), params.get("destination")
+        has_visa, criterion = params.get("visa", False), params.get("criterion", default_criterion)
+    else:
+        fields = [field.strip() for field in next(csv.reader([text], skipinitialspace=True))]
+        if fields[0].lower() in ("origin", "origen"):
+            return None
+        fields += [""] * (4 - len(fields))
+        origin, destination, has_visa, criterion = fields[:4]
+        criterion = criterion or default_criterion
+    named = isinstance(origin, str) and isinstance(destination, str) and origin and destination
+    if not named or criterion not in CRITERIA:
+        return INVALID
+    return origin, destination, parse_flag(has_visa), criterion
+
+
+def answer_chunk(snapshot_file, directed, queries):
+    # Responder un bloque (se ejecuta en el pool). Devuelve las líneas JSON
+    # ya unidas y (criterio, milisegundos, resultado) de cada consulta.
+    lines, timings = [], []
+    for number, query in queries:
+        if isinstance(query, str):
+            result = {"line": number, "error": query}
+            timings.append((None, None, "invalid"))
+        else:
+            result = answer(snapshot_file, directed, *query)
+            error = result.get("error")
+            outcome = "found" if error is None else "no_route" if error == NO_ROUTE else "visa"
+            timings.append((query[3], result["elapsed_ms"], outcome))
+        lines.append(json.dumps(result, ensure_ascii=False))
+    return "\n".join(lines) + "\n", timings
+
+
+def read_chunks(file, chunk, default_criterion):
+    # Bloques de (número de línea, consulta o mensaje de error)
+    block = []
+    for number, line in enumerate(file, 1):
+        query = parse_query(line, default_criterion)
+        if query is not None:
+            block.append((number, query))
+            if len(block) == chunk:
+                yield block
+                block = []
+    if block:
+        yield block
+
+
+class Summary:
+    # Conteos y latencias por consulta en histogramas (memoria constante)
+    def __init__(self, load_s=0.0):
+        self.load_s = load_s  # Carga del grafo (y compilación del snapshot si hacía falta)
+        self.outcomes = dict.fromkeys(("found", "no_route", "visa", "invalid"), 0)
+        self.latency = {criterion: Histogram(1000) for criterion in CRITERIA}  # ms -> µs
+        self.started = time.perf_counter()
+
+    def add(self, timings):
+        for criterion, elapsed_ms, outcome in timings:
+            self.outcomes[outcome] += 1
+            if criterion is not None:
+                self.latency[criterion].add(elapsed_ms)
+
+    def report(self, workers):
+        elapsed = time.perf_counter() - self.started
+        total = sum(self.outcomes.values())
+        lines = [f"{total} consultas en {elapsed:.2f} s: {total / elapsed if elapsed else 0:.0f} consultas/s "
+                 f"con {workers} proceso{'s' if workers != 1 else ''} (grafo cargado en {self.load_s:.2f} s)",
+                 f"  con ruta {self.outcomes['found']}, sin ruta {self.outcomes['no_route']}, "
+                 f"rechazadas por visa {self.outcomes['visa']}, inválidas {self.outcomes['invalid']}"]
+        for criterion, histogram in self.latency.items():
+            if histogram.count:
+                lines.append(f"  {criterion:<5} latencia por consulta (µs): p50 <= {histogram.percentile(0.5)}  "
+                             f"p90 <= {histogram.percentile(0.9)}  p99 <= {histogram.percentile(0.99)}  "
+                             f"media {histogram.total / histogram.count:.0f}  máx {histogram.max:.0f}")
+        return "\n".join(lines)
+
+
+def run(queries, output, routes_file, visa_file, directed=False, workers=1, chunk=1000, default_criterion="cost"):
+    # Procesar todas las consultas de `queries` (archivo de texto abierto) y
+    # escribir las respuestas en `output`; devuelve el Summary
+    graph_cls = DirectedGraph if directed else Graph
+    t0 = time.perf_counter()
+    graph_cls().load_network(routes_file, visa_file)  # Compila el snapshot si hace falta
+    snapshot_file = graph_cls.snapshot_path(routes_file)
+    summary = Summary(time.perf_counter() - t0)
+    if workers <= 1:
+        for block in read_chunks(queries, chunk, default_criterion):
+            text, timings = answer_chunk(snapshot_file, directed, block)
+            output.write(text)
+            summary.add(timings)
+        return summary
+
+    # "spawn" como en service.py: cada trabajador mapea el snapshot una vez
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        pending = deque()
+        for block in read_chunks(queries, chunk, default_criterion):
+            if len(pending) >= 2 * workers:
+                text, timings = pending.popleft().result()
+                output.write(text)
+                summary.add(timings)
+            pending.append(pool.submit(answer_chunk, snapshot_file, directed, block))
+        while pending:
+            text, timings = pending.popleft().result()
+            output.write(text)
+            summary.add(timings)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Consultas de rutas por lotes (CSV o JSON lines)")
+    parser.add_argument("queries", nargs="?", default="-", help="archivo de consultas, o - para stdin")
+    parser.add_argument("-o", "--output", default="-", help="archivo de respuestas JSON lines, o - para stdout")
+    parser.add_argument("--routes", default="caminos.txt")
+    parser.add_argument("--visa", default="visa_requirements.txt")
+    parser.add_argument("--directed", action="store_true", help="grafo dirigido (proyecto_dirigido.py)")
+    parser.add_argument("--workers", type=int, default=1, help="procesos (1: en este proceso)")
+    parser.add_argument("--chunk", type=int, default=1000, help="consultas por bloque")
+    parser.add_argument("--criterion", choices=CRITERIA, default="cost", help="para las consultas que no lo dicen")
+    args = parser.parse_args(argv)
+
+    queries = sys.stdin if args.queries == "-" else open(args.queries, 'r', encoding='utf-8')
+    output = sys.stdout if args.output == "-" else open(args.output, 'w', encoding='utf-8')
+    try:
+        summary = run(queries, output, args.routes, args.visa, args.directed, args.workers, args.chunk,
+                      args.criterion)
+    finally:
+        for file in (queries, output):
+            if file not in (sys.stdin, sys.stdout):
+                file.close()
+    sys.stdout.flush()
+    print(summary.report(args.workers), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
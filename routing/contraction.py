@@ -0,0 +1,310 @@
+import heapq
+
+import numpy as np
+
+from .csr import INF, CSRGraph
+
+# Jerarquía de contracción (Contraction Hierarchies) sobre una vista CSR.
+# Preproceso: los aeropuertos se contraen uno a uno, de menos a más
+# importante; al quitar v, cada ruta u -> v -> x que no tenga un camino
+# alternativo igual de barato ("testigo") se conserva como atajo u -> x.
+# Consulta: Dijkstra bidireccional que solo sube de rango (hacia adelante
+# por `up`, hacia atrás por `down`), con espacios de búsqueda de unos
+# cientos de nodos; los atajos se expanden después para obtener la ruta.
+# Si el grafo restante se vuelve denso (redes aleatorias, núcleo de hubs), la
+# contracción se detiene y ese núcleo se busca como un grafo común.
+# Los nodos más altos (los hubs) forman casi una clique; en vez de recorrerla
+# en cada consulta se guarda la tabla de distancias entre ellos: la ruta
+# ascendente-descendente entre dos nodos de ese conjunto no sale de él, así
+# que las búsquedas se detienen al entrar y se unen con la tabla.
+
+WITNESS_SETTLE_LIMIT = 64  # Nodos asentados por búsqueda de testigos al contraer
+ESTIMATE_SETTLE_LIMIT = 16  # Idem al estimar la prioridad, que se recalcula seguido
+ESTIMATE_PAIRS = 64  # Con más pares entrada x salida se supone que todos son atajos
+CORE_DEGREE = 64  # Se deja de contraer cuando el grafo restante es así de denso
+TABLE_SIZE = 512  # Nodos más altos con tabla de distancias completa entre ellos
+
+
+def _witness_distances(out_edges, source, skip, targets, limit, settle_limit):
+    # Dijkstra local desde `source` sin pasar por `skip`, hasta `limit` o
+    # hasta haber asentado todos los `targets` (o `settle_limit` nodos)
+    distances = {source: 0}
+    pending = set(targets)
+    pq = [(0, source)]
+    settled = 0
+    while pq and pending and settled < settle_limit:
+        current_distance, current_node = heapq.heappop(pq)
+        if current_distance > distances[current_node]:
+            continue
+        if current_distance > limit:
+            break
+        settled += 1
+        pending.discard(current_node)
+        for neighbor, weight in out_edges[current_node].items():
+            if neighbor == skip:
+                continue
+            distance = current_distance + weight
+            if distance < distances.get(neighbor, INF):
+                distances[neighbor] = distance
+                heapq.heappush(pq, (distance, neighbor))
+    return distances
+
+
+class ContractionHierarchy:
+    def __init__(self, up, down, middle, rank, core_size=0):
+        self.up = up          # Aristas u -> x con rank[x] > rank[u]
+        self.down = down      # Aristas u -> x con rank[u] > rank[x], guardadas como x -> u
+        self.middle = middle  # Atajo (u, x) -> nodo contraído que reemplaza
+        self.rank = rank
+        self.core_size = core_size  # Nodos más altos, que quedaron sin contraer
+        self.build_table()
+
+    @classmethod
+    def build(cls, csr, unit_weights=False):
+        num_nodes = csr.num_nodes
+        indptr, indices, weights = csr.indptr.tolist(), csr.indices.tolist(), csr.weights.tolist()
+        out_edges = [{} for _ in range(num_nodes)]
+        in_edges = [{} for _ in range(num_nodes)]
+        for u in range(num_nodes):
+            for k in range(indptr[u], indptr[u + 1]):
+                x = indices[k]
+                weight = 1 if unit_weights else weights[k]
+                if x != u and weight < out_edges[u].get(x, INF):
+                    out_edges[u][x] = weight
+                    in_edges[x][u] = weight
+
+        # Orden por diferencia de aristas: atajos que haría falta agregar menos
+        # aristas que se quitan, más vecinos ya contraídos y profundidad, para
+        # repartir las contracciones por todo el grafo. Se recalcula al sacar
+        # cada nodo del montículo y para los vecinos del último contraído.
+        contracted_neighbors = [0] * num_nodes
+        depth = [0] * num_nodes
+
+        def shortcuts(v, settle_limit=WITNESS_SETTLE_LIMIT):
+            # Atajos (u, x, peso) necesarios si se contrae v ahora
+            needed = []
+            outgoing = out_edges[v]
+            for u, weight_in in in_edges[v].items():
+                targets = {x: weight_in + weight_out for x, weight_out in outgoing.items() if x != u}
+                if not targets:
+                    continue
+                witness = _witness_distances(out_edges, u, v, targets, max(targets.values()), settle_limit)
+                needed.extend((u, x, weight) for x, weight in targets.items() if witness.get(x, INF) > weight)
+            return needed
+
+        def priority(v):
+            num_in, num_out = len(in_edges[v]), len(out_edges[v])
+            if num_in * num_out > ESTIMATE_PAIRS:
+                added = num_in * num_out
+            else:
+                added = len(shortcuts(v, ESTIMATE_SETTLE_LIMIT))
+            return 2 * (added - num_in - num_out) + contracted_neighbors[v] + depth[v]
+
+        queue = [(priority(v), v) for v in range(num_nodes)]
+        heapq.heapify(queue)
+        remaining_nodes = num_nodes
+        remaining_edges = sum(len(edges) for edges in out_edges)
+        contracted = bytearray(num_nodes)
+        rank = np.zeros(num_nodes, dtype=np.int32)
+        middle = {}
+        up_edges = ([], [], [])
+        down_edges = ([], [], [])
+        next_rank = 0
+
+        while queue:
+            _, v = heapq.heappop(queue)
+            if contracted[v]:
+                continue
+            current = priority(v)
+            if queue and current > queue[0][0]:
+                heapq.heappush(queue, (current, v))
+                continue
+
+            if remaining_edges > CORE_DEGREE * remaining_nodes:
+                break
+
+            for u, x, weight in shortcuts(v):
+                if weight < out_edges[u].get(x, INF):
+                    remaining_edges += x not in out_edges[u]
+                    out_edges[u][x] = weight
+                    in_edges[x][u] = weight
+                    middle[(u, x)] = v
+
+            contracted[v] = 1
+            rank[v] = next_rank
+            next_rank += 1
+            incoming, outgoing = in_edges[v], out_edges[v]
+            for x, weight in outgoing.items():
+                up_edges[0].append(v)
+                up_edges[1].append(x)
+                up_edges[2].append(weight)
+                del in_edges[x][v]
+            for u, weight in incoming.items():
+                down_edges[0].append(v)
+                down_edges[1].append(u)
+                down_edges[2].append(weight)
+                del out_edges[u][v]
+            remaining_nodes -= 1
+            remaining_edges -= len(incoming) + len(outgoing)
+            for neighbor in set(incoming) | set(outgoing):
+                contracted_neighbors[neighbor] += 1
+                depth[neighbor] = max(depth[neighbor], depth[v] + 1)
+                heapq.heappush(queue, (priority(neighbor), neighbor))
+            in_edges[v] = {}
+            out_edges[v] = {}
+
+        # Núcleo sin contraer: sus aristas quedan en ambos sentidos de búsqueda
+        for v in range(num_nodes):
+            if not contracted[v]:
+                rank[v] = next_rank
+                next_rank += 1
+                for x, weight in out_edges[v].items():
+                    up_edges[0].append(v)
+                    up_edges[1].append(x)
+                    up_edges[2].append(weight)
+                for u, weight in in_edges[v].items():
+                    down_edges[0].append(v)
+                    down_edges[1].append(u)
+                    down_edges[2].append(weight)
+
+        up = CSRGraph.from_edges(csr.codes, *up_edges, ids=csr.ids)
+        down = CSRGraph.from_edges(csr.codes, *down_edges, ids=csr.ids)
+        return cls(up, down, middle, rank, remaining_nodes)
+
+    def build_table(self):
+        # Floyd-Warshall vectorizado sobre las aristas entre los TABLE_SIZE
+        # nodos más altos; `table_parents[i, j]` es el penúltimo nodo de i a j
+        num_nodes = len(self.rank)
+        if self.core_size > TABLE_SIZE:
+            size = 0  # Núcleo demasiado grande: consultas sin tabla
+        else:
+            size = min(TABLE_SIZE, num_nodes)
+        self.table_nodes = np.argsort(self.rank)[num_nodes - size:]
+        index = np.full(num_nodes, -1, dtype=np.int64)
+        index[self.table_nodes] = np.arange(size)
+        self.table_index = index.tolist()
+
+        table = np.full((size, size), INF)
+        for graph, forward in ((self.up, True), (self.down, False)):
+            edge_sources = np.repeat(np.arange(num_nodes), np.diff(graph.indptr))
+            rows, columns = index[edge_sources], index[graph.indices]
+            inside = (rows >= 0) & (columns >= 0)
+            rows, columns = (rows[inside], columns[inside]) if forward else (columns[inside], rows[inside])
+            np.minimum.at(table, (rows, columns), graph.weights[inside])
+        np.fill_diagonal(table, 0)
+        parents = np.where(table < INF, np.arange(size, dtype=np.int32)[:, None], np.int32(-1))
+        for k in range(size):
+            through = table[:, k, None] + table[None, k, :]
+            better = through < table
+            table = np.where(better, through, table)
+            parents = np.where(better, parents[k][None, :], parents)
+        self.table = table
+        self.table_parents = parents
+
+    @property
+    def has_table(self):
+        # Sin tabla (núcleo enorme, p. ej. redes aleatorias) la consulta no
+        # le gana a Dijkstra y Graph.search no usa la jerarquía
+        return len(self.table_nodes) > 0
+
+    @property
+    def num_shortcuts(self):
+        return len(self.middle)
+
+    def nbytes(self):
+        # Arreglos CSR más una estimación del diccionario de atajos
+        return (self.up.nbytes() + self.down.nbytes() + self.rank.nbytes + self.table.nbytes
+                + self.table_parents.nbytes + len(self.middle) * 200)
+
+    def query(self, source, target):
+        # Devuelve (costo, ruta de ids con los atajos expandidos) o (inf, None)
+        if source == target:
+            return 0, [source]
+        graphs = (self.up, self.down)
+        distances = ({source: 0}, {target: 0})
+        parents = ({source: -1}, {target: -1})
+        queues = ([(0, source)], [(0, target)])
+        best = INF
+        meeting = -1
+        table_index = self.table_index
+        entries = ([], [])  # Nodos de la tabla alcanzados por cada lado
+
+        while queues[0] or queues[1]:
+            # Avanzar el lado cuyo mínimo es menor; cada lado se detiene
+            # cuando su mínimo ya no puede mejorar la mejor ruta
+            if not queues[1] or (queues[0] and queues[0][0][0] <= queues[1][0][0]):
+                side = 0
+            else:
+                side = 1
+            current_distance, current_node = heapq.heappop(queues[side])
+            if current_distance >= best:
+                queues[side].clear()
+                continue
+            own, other = distances[side], distances[1 - side]
+            if current_distance > own[current_node]:
+                continue
+            if current_node in other and current_distance + other[current_node] < best:
+                best = current_distance + other[current_node]
+                meeting = current_node
+            if table_index[current_node] >= 0:
+                entries[side].append(current_node)
+                continue
+
+            graph = graphs[side]
+            start, stop = graph.indptr[current_node], graph.indptr[current_node + 1]
+            for neighbor, weight in zip(graph.indices[start:stop].tolist(), graph.weights[start:stop].tolist()):
+                distance = current_distance + weight
+                if distance < own.get(neighbor, INF):
+                    own[neighbor] = distance
+                    parents[side][neighbor] = current_node
+                    heapq.heappush(queues[side], (distance, neighbor))
+
+        # Mejor combinación entrada -> tabla -> salida, si mejora al encuentro directo
+        middle_path = []
+        if entries[0] and entries[1]:
+            rows = [table_index[node] for node in entries[0]]
+            columns = [table_index[node] for node in entries[1]]
+            totals = (np.array([distances[0][node] for node in entries[0]])[:, None]
+                      + self.table[np.ix_(rows, columns)]
+                      + np.array([distances[1][node] for node in entries[1]])[None, :])
+            i, j = np.unravel_index(np.argmin(totals), totals.shape)
+            if totals[i, j] < best:
+                best = float(totals[i, j])
+                meeting = entries[1][j]
+                position = columns[j]
+                while position != rows[i]:
+                    position = int(self.table_parents[rows[i], position])
+                    middle_path.append(int(self.table_nodes[position]))
+                middle_path.reverse()
+
+        if meeting == -1:
+            return INF, None
+
+        # Encadenar las dos mitades (y el tramo de la tabla) y expandir los atajos
+        path = []
+        node = middle_path[0] if middle_path else meeting
+        while node != -1:
+            path.append(node)
+            node = parents[0][node]
+        path.reverse()
+        path.extend(middle_path[1:])
+        if middle_path:
+            path.append(meeting)
+        node = parents[1][meeting]
+        while node != -1:
+            path.append(node)
+            node = parents[1][node]
+        return best, self.unpack(path)
+
+    def unpack(self, path):
+        result = [path[0]]
+        stack = [(u, x) for u, x in zip(path[::-1][1:], path[::-1])]
+        while stack:
+            u, x = stack.pop()
+            v = self.middle.get((u, x))
+            if v is None:
+                result.append(x)
+            else:
+                stack.append((v, x))
+                stack.append((u, v))
+        return result
@@ -0,0 +1,163 @@
+import numpy as np
+
+INF = float('inf')
+
+
+class Workspace:
+    # Arreglos de trabajo de una búsqueda. Se reutilizan entre consultas:
+    # reset() solo limpia las posiciones que tocó la consulta anterior.
+    def __init__(self, num_nodes):
+        self.distances = [INF] * num_nodes
+        self.parents = [-1] * num_nodes
+        self.settled = bytearray(num_nodes)
+        self.touched = []
+
+    def reset(self):
+        num_nodes = len(self.distances)
+        if len(self.touched) > num_nodes // 8:
+            # Si la consulta anterior recorrió gran parte del grafo, rellenar es más rápido
+            self.__init__(num_nodes)
+            return self
+        distances, parents, settled = self.distances, self.parents, self.settled
+        for node in self.touched:
+            distances[node] = INF
+            parents[node] = -1
+            settled[node] = 0
+        self.touched = []
+        return self
+
+
+class HopWorkspace:
+    # Arreglos de la búsqueda en anchura por escalas, uno por lado. En vez de
+    # limpiarlos, cada consulta usa un sello nuevo: un nodo está visitado por
+    # un lado si seen[lado, nodo] es el sello de la consulta actual.
+    def __init__(self, num_nodes):
+        self.seen = np.zeros((2, num_nodes), dtype=np.int32)
+        self.parents = np.full((2, num_nodes), -1, dtype=np.int32)
+        self.stamp = 0
+
+    def next_stamp(self):
+        self.stamp += 1
+        if self.stamp == np.iinfo(np.int32).max:
+            self.seen[:] = 0
+            self.stamp = 1
+        return self.stamp
+
+
+class CSRGraph:
+    # Grafo inmutable en formato CSR: los códigos de aeropuerto se internan
+    # a enteros (int32) y las aristas salientes del nodo i son
+    # indices[indptr[i]:indptr[i + 1]] con sus pesos en weights.
+    def __init__(self, codes, indptr, indices, weights, directed=True, ids=None):
+        self.codes = codes
+        self.ids = ids if ids is not None else {code: i for i, code in enumerate(codes)}
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.directed = directed
+        self._transpose = None
+        self._workspaces = None
+        self._hop_workspace = None
+
+    @property
+    def num_nodes(self):
+        return len(self.codes)
+
+    @property
+    def num_edges(self):
+        return len(self.indices)
+
+    @classmethod
+    def from_edges(cls, codes, sources, targets, weights, directed=True, ids=None):
+        # Construir el CSR a partir de arreglos paralelos de aristas (ids enteros)
+        num_nodes = len(codes)
+        sources = np.asarray(sources, dtype=np.int32)
+        order = np.argsort(sources, kind='stable')
+        indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=num_nodes), out=indptr[1:])
+        indices = np.asarray(targets, dtype=np.int32)[order]
+        weights = np.asarray(weights, dtype=np.float64)[order]
+        return cls(codes, indptr, indices, weights, directed, ids)
+
+    @classmethod
+    def from_adjacency(cls, graph_dict, directed=True):
+        # Paso de congelado: {codigo: [(vecino, peso), ...]} -> CSR
+        codes = list(graph_dict)
+        ids = {code: i for i, code in enumerate(codes)}
+        num_nodes = len(codes)
+        indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.fromiter((len(graph_dict[code]) for code in codes), dtype=np.int64, count=num_nodes),
+                  out=indptr[1:])
+        num_edges = int(indptr[-1])
+        indices = np.fromiter((ids[neighbor] for code in codes for neighbor, _ in graph_dict[code]),
+                              dtype=np.int32, count=num_edges)
+        weights = np.fromiter((weight for code in codes for _, weight in graph_dict[code]),
+                              dtype=np.float64, count=num_edges)
+        return cls(codes, indptr, indices, weights, directed, ids)
+
+    def to_adjacency(self):
+        # Operación inversa, para la interfaz gráfica y networkx
+        codes = list(self.codes)
+        indptr = self.indptr.tolist()
+        indices = self.indices.tolist()
+        weights = self.weights.tolist()
+        return {code: [(codes[indices[k]], weights[k]) for k in range(indptr[i], indptr[i + 1])]
+                for i, code in enumerate(codes)}
+
+    def neighbors(self, node):
+        start, stop = self.indptr[node], self.indptr[node + 1]
+        return self.indices[start:stop].tolist(), self.weights[start:stop].tolist()
+
+    def transpose(self):
+        # Aristas entrantes; en un grafo no dirigido coinciden con las salientes
+        if not self.directed:
+            return self
+        if self._transpose is None:
+            sources = np.repeat(np.arange(self.num_nodes, dtype=np.int32), np.diff(self.indptr))
+            self._transpose = CSRGraph.from_edges(self.codes, self.indices, sources, self.weights,
+                                                  ids=self.ids)
+            self._transpose._transpose = self
+        return self._transpose
+
+    def without_targets(self, mask):
+        # Vista con las aristas que llegan a nodos marcados en `mask` eliminadas.
+        # Conserva los mismos ids; el resultado es dirigido aunque el original no lo sea.
+        keep = ~mask[self.indices]
+        kept_before = np.zeros(self.num_edges + 1, dtype=np.int64)
+        np.cumsum(keep, out=kept_before[1:])
+        return CSRGraph(self.codes, kept_before[self.indptr], self.indices[keep], self.weights[keep],
+                        directed=True, ids=self.ids)
+
+    def set_weight(self, u, v, weight):
+        # Cambiar en el lugar el peso de las aristas u -> v (también en el
+        # transpuesto, si ya se construyó). Devuelve los pesos anteriores.
+        previous = self._assign(u, v, weight)
+        if self._transpose is not None and self._transpose is not self:
+            self._transpose._assign(v, u, weight)
+        return previous
+
+    def _assign(self, u, v, weight):
+        start, stop = self.indptr[u], self.indptr[u + 1]
+        positions = start + np.flatnonzero(self.indices[start:stop] == v)
+        previous = self.weights[positions].tolist()
+        if len(positions):
+            if not self.weights.flags.writeable:
+                self.weights = np.array(self.weights)  # Arreglo de un snapshot mapeado
+            self.weights[positions] = weight
+        return previous
+
+    def workspace(self, slot=0):
+        # Arreglos de trabajo reutilizables (uno por lado de la búsqueda bidireccional)
+        if self._workspaces is None:
+            self._workspaces = {}
+        if slot not in self._workspaces:
+            self._workspaces[slot] = Workspace(self.num_nodes)
+        return self._workspaces[slot].reset()
+
+    def hop_workspace(self):
+        if self._hop_workspace is None:
+            self._hop_workspace = HopWorkspace(self.num_nodes)
+        return self._hop_workspace
+
+    def nbytes(self):
+        return self.indptr.nbytes + self.indices.nbytes + self.weights.nbytes
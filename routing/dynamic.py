@@ -0,0 +1,89 @@
+import heapq
+
+import numpy as np
+
+from .csr import INF
+
+# Reparación incremental de árboles de caminos mínimos (al estilo de
+# Ramalingam y Reps) tras cambiar un lote de aristas u -> v:
+#  1. Las aristas del árbol que quedaron más caras (o desaparecieron) invalidan
+#     el subárbol que cuelga de ellas; esos nodos se vuelven a sembrar desde sus
+#     vecinos entrantes fuera del subárbol.
+#  2. Las aristas que quedaron más baratas (o nuevas) siembran su destino.
+#  3. Un único Dijkstra desde las semillas propaga las mejoras.
+# Solo se recorren los nodos cuya distancia o padre pueden haber cambiado.
+
+
+def edge_weight(csr, u, v, unit_weights=False):
+    # Peso efectivo de u -> v (el mínimo entre tramos paralelos); inf si no existe
+    start, stop = csr.indptr[u], csr.indptr[u + 1]
+    found = csr.indices[start:stop] == v
+    if not found.any():
+        return INF
+    return 1 if unit_weights else float(csr.weights[start:stop][found].min())
+
+
+def _subtree(parents, roots):
+    # Nodos que cuelgan de `roots` en el árbol (incluidas las raíces)
+    order = np.argsort(parents, kind='stable')
+    sorted_parents = parents[order]
+    nodes = list(roots)
+    seen = set(nodes)
+    for node in nodes:
+        first, last = np.searchsorted(sorted_parents, (node, node + 1))
+        for child in order[first:last].tolist():
+            if child not in seen:
+                seen.add(child)
+                nodes.append(child)
+    return nodes
+
+
+def repair_tree(csr, distances, parents, changed, unit_weights=False):
+    # Reparar en el lugar el árbol (distancias y padres por id) tras cambiar
+    # las aristas `changed` [(u, v), ...] de `csr`. Devuelve los nodos tocados.
+    weights = {(u, v): edge_weight(csr, u, v, unit_weights) for u, v in changed}
+
+    broken = [v for (u, v), weight in weights.items()
+              if parents[v] == u and distances[u] + weight > distances[v]]
+    pq = []
+    affected = _subtree(parents, broken) if broken else []
+    if affected:
+        distances[affected] = INF
+        parents[affected] = -1
+        reverse = csr.transpose()
+        for node in affected:
+            start, stop = reverse.indptr[node], reverse.indptr[node + 1]
+            neighbors = reverse.indices[start:stop]
+            if not len(neighbors):
+                continue
+            candidates = distances[neighbors] + (1.0 if unit_weights else reverse.weights[start:stop])
+            best = int(np.argmin(candidates))
+            if candidates[best] < INF:
+                distances[node] = candidates[best]
+                parents[node] = neighbors[best]
+                heapq.heappush(pq, (float(candidates[best]), node))
+
+    for (u, v), weight in weights.items():
+        distance = distances[u] + weight
+        if distance < distances[v]:
+            distances[v] = distance
+            parents[v] = u
+            heapq.heappush(pq, (float(distance), v))
+
+    indptr, indices, edge_weights = csr.indptr, csr.indices, csr.weights
+    touched = len(affected)
+    while pq:
+        current_distance, current_node = heapq.heappop(pq)
+        if current_distance > distances[current_node]:
+            continue
+        touched += 1
+        start, stop = indptr[current_node], indptr[current_node + 1]
+        neighbors = indices[start:stop]
+        candidates = current_distance + (np.ones(stop - start) if unit_weights else edge_weights[start:stop])
+        improved = candidates < distances[neighbors]
+        for neighbor, distance in zip(neighbors[improved].tolist(), candidates[improved].tolist()):
+            if distance < distances[neighbor]:  # Tramos paralelos: quedarse con el más barato
+                distances[neighbor] = distance
+                parents[neighbor] = current_node
+                heapq.heappush(pq, (distance, neighbor))
+    return touched
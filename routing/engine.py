@@ -0,0 +1,420 @@
+import heapq
+import threading
+from contextlib import contextmanager
+from itertools import repeat
+
+import numpy as np
+
+from .csr import INF
+from .instrumentation import current_stats
+
+# Cancelación cooperativa: un hilo marca con cancellation(evento) las
+# búsquedas que hace; los motores leen el evento una vez al empezar y, si
+# hay uno, lo revisan al asentar cada nodo (o en cada nivel/ronda) y
+# terminan con SearchCancelled en cuanto se activa. Sin evento el costo es
+# una comparación con None por nodo asentado.
+_cancel_state = threading.local()
+
+
+class SearchCancelled(Exception):
+    pass
+
+
+@contextmanager
+def cancellation(event):
+    previous = getattr(_cancel_state, "event", None)
+    _cancel_state.event = event
+    try:
+        yield
+    finally:
+        _cancel_state.event = previous
+
+
+def cancel_event():
+    # Evento de cancelación del hilo actual, o None
+    return getattr(_cancel_state, "event", None)
+
+
+def _report_settled(stats, csr, ws, target=-1):
+    # Instrumentación (instrumentation.py): nodos asentados, que revisaron sus
+    # aristas salvo el destino, con el que la búsqueda corta
+    settled = ws.settled
+    nodes = [node for node in ws.touched if settled[node]]
+    stats.settled += len(nodes)
+    stats.scan(csr, [node for node in nodes if node != target])
+
+
+def dijkstra(csr, source, target=-1, unit_weights=False, workspace=None):
+    # Dijkstra con montículo binario sobre un CSRGraph (ids enteros). Las
+    # restricciones de visa ya vienen aplicadas en la vista que se recibe.
+    # Si se da `target`, la búsqueda se detiene en cuanto ese nodo queda
+    # asentado. Devuelve el Workspace con distancias y padres.
+    ws = workspace if workspace is not None else csr.workspace()
+    distances, parents, settled, touched = ws.distances, ws.parents, ws.settled, ws.touched
+    indptr, indices, weights = csr.indptr, csr.indices, csr.weights
+    cancel = cancel_event()
+    stats = current_stats()
+    push, pop = (heapq.heappush, heapq.heappop) if stats is None else stats.heap_ops()
+
+    distances[source] = 0
+    touched.append(source)
+    pq = [(0, source)]
+
+    while pq:
+        current_distance, current_node = pop(pq)
+        if settled[current_node]:
+            continue
+        settled[current_node] = 1
+        if current_node == target:
+            break
+        if cancel is not None and cancel.is_set():
+            raise SearchCancelled
+
+        start, stop = indptr[current_node], indptr[current_node + 1]
+        steps = repeat(1) if unit_weights else weights[start:stop].tolist()
+        for neighbor, weight in zip(indices[start:stop].tolist(), steps):
+            if settled[neighbor]:
+                continue
+            distance = current_distance + weight
+            if distance < distances[neighbor]:
+                if distances[neighbor] == INF:
+                    touched.append(neighbor)
+                distances[neighbor] = distance
+                parents[neighbor] = current_node
+                push(pq, (distance, neighbor))
+
+    if stats is not None:
+        stats.pushes += 1  # La semilla entra al montículo sin push()
+        _report_settled(stats, csr, ws, target)
+    return ws
+
+
+def astar(csr, source, target, potential, unit_weights=False, workspace=None):
+    # A* hacia `target` con cotas inferiores `potential` (lista por id; inf si
+    # el nodo no puede llegar al destino). Con cotas consistentes, como las de
+    # los landmarks, cada nodo se asienta una sola vez y las distancias
+    # asentadas son exactas. Devuelve el Workspace, como dijkstra().
+    ws = workspace if workspace is not None else csr.workspace()
+    distances, parents, settled, touched = ws.distances, ws.parents, ws.settled, ws.touched
+    indptr, indices, weights = csr.indptr, csr.indices, csr.weights
+    cancel = cancel_event()
+    stats = current_stats()
+    push, pop = (heapq.heappush, heapq.heappop) if stats is None else stats.heap_ops()
+    if potential[source] == INF:
+        return ws
+
+    distances[source] = 0
+    touched.append(source)
+    pq = [(potential[source], source)]
+
+    while pq:
+        _, current_node = pop(pq)
+        if settled[current_node]:
+            continue
+        settled[current_node] = 1
+        if current_node == target:
+            break
+        if cancel is not None and cancel.is_set():
+            raise SearchCancelled
+
+        current_distance = distances[current_node]
+        start, stop = indptr[current_node], indptr[current_node + 1]
+        steps = repeat(1) if unit_weights else weights[start:stop].tolist()
+        for neighbor, weight in zip(indices[start:stop].tolist(), steps):
+            if settled[neighbor]:
+                continue
+            remaining = potential[neighbor]
+            if remaining == INF:
+                continue
+            distance = current_distance + weight
+            if distance < distances[neighbor]:
+                if distances[neighbor] == INF:
+                    touched.append(neighbor)
+                distances[neighbor] = distance
+                parents[neighbor] = current_node
+                push(pq, (distance + remaining, neighbor))
+
+    if stats is not None:
+        stats.pushes += 1
+        _report_settled(stats, csr, ws, target)
+    return ws
+
+
+def settled_count(ws):
+    # Nodos asentados por la última búsqueda hecha con este Workspace
+    settled = ws.settled
+    return sum(settled[node] for node in ws.touched)
+
+
+def extract_path(parents, source, target):
+    # Recorrer los padres desde el destino; None si el destino no fue alcanzado
+    path = [target]
+    node = target
+    while node != source:
+        node = parents[node]
+        if node == -1:
+            return None
+        path.append(node)
+    path.reverse()
+    return path
+
+
+def path_cost(csr, path):
+    # Costo de una ruta sumado de izquierda a derecha, como lo hace dijkstra();
+    # con aristas paralelas se usa la más barata
+    cost = 0
+    for node, next_node in zip(path, path[1:]):
+        neighbors, weights = csr.neighbors(node)
+        cost += min(w for neighbor, w in zip(neighbors, weights) if neighbor == next_node)
+    return cost
+
+
+def shortest_path(csr, source, target, unit_weights=False):
+    # Consulta punto a punto con parada temprana: devuelve (distancia, ruta de ids)
+    ws = dijkstra(csr, source, target, unit_weights)
+    stats = current_stats()
+    if stats is not None:
+        stats.phase("path")
+    if ws.distances[target] == INF:
+        return INF, None
+    return ws.distances[target], extract_path(ws.parents, source, target)
+
+
+def bidirectional_shortest_path(csr, source, target, unit_weights=False):
+    # Dijkstra bidireccional: una búsqueda desde el origen sobre el CSR y otra
+    # desde el destino sobre su transpuesto (el mismo CSR si es no dirigido).
+    # Con la vista sin visa, la búsqueda hacia atrás puede entrar a un nodo
+    # que requiere visa, pero este no tiene aristas entrantes en la vista y
+    # solo puede encontrarse con la búsqueda hacia adelante en el origen.
+    # Termina cuando la suma de los mínimos de ambos montículos no puede
+    # mejorar la mejor ruta encontrada.
+    if source == target:
+        return 0, [source]
+
+    graphs = (csr, csr.transpose())
+    spaces = (csr.workspace(0), csr.workspace(1))
+    queues = ([(0, source)], [(0, target)])
+    for ws, root in zip(spaces, (source, target)):
+        ws.distances[root] = 0
+        ws.touched.append(root)
+    best = INF
+    meeting = -1
+    cancel = cancel_event()
+    stats = current_stats()
+    push, pop = (heapq.heappush, heapq.heappop) if stats is None else stats.heap_ops()
+
+    while queues[0] and queues[1]:
+        if queues[0][0][0] + queues[1][0][0] >= best:
+            break
+        # Avanzar el lado con la frontera más pequeña
+        side = 0 if len(queues[0]) <= len(queues[1]) else 1
+        ws = spaces[side]
+        current_distance, current_node = pop(queues[side])
+        if ws.settled[current_node]:
+            continue
+        ws.settled[current_node] = 1
+        if cancel is not None and cancel.is_set():
+            raise SearchCancelled
+
+        distances, parents, settled, touched = ws.distances, ws.parents, ws.settled, ws.touched
+        other_distances = spaces[1 - side].distances
+        graph, queue = graphs[side], queues[side]
+        start, stop = graph.indptr[current_node], graph.indptr[current_node + 1]
+        steps = repeat(1) if unit_weights else graph.weights[start:stop].tolist()
+        for neighbor, weight in zip(graph.indices[start:stop].tolist(), steps):
+            if settled[neighbor]:
+                continue
+            distance = current_distance + weight
+            if distance < distances[neighbor]:
+                if distances[neighbor] == INF:
+                    touched.append(neighbor)
+                distances[neighbor] = distance
+                parents[neighbor] = current_node
+                push(queue, (distance, neighbor))
+                if distance + other_distances[neighbor] < best:
+                    best = distance + other_distances[neighbor]
+                    meeting = neighbor
+
+    if stats is not None:
+        stats.pushes += 2
+        for graph, ws in zip(graphs, spaces):
+            _report_settled(stats, graph, ws)
+        stats.phase("path")
+    if meeting == -1:
+        return INF, None
+
+    path = extract_path(spaces[0].parents, source, meeting)
+    node = meeting
+    while node != target:
+        node = spaces[1].parents[node]
+        path.append(node)
+    return best, path
+
+
+def _out_edges(indptr, nodes):
+    # Posiciones en `indices`/`weights` de todas las aristas que salen de `nodes`
+    starts = indptr[nodes]
+    counts = indptr[nodes + 1] - starts
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return np.arange(len(offsets)) + offsets, np.repeat(np.arange(len(nodes)), counts)
+
+
+def min_stops_path(csr, source, target, cheapest=False):
+    # Mínimo de escalas con BFS bidireccional por fronteras: cada paso expande
+    # de una vez el nivel completo del lado con menos aristas salientes (hacia
+    # atrás sobre el transpuesto). El primer nivel que toca lo visitado por el
+    # otro lado da el mínimo. Con `cheapest`, entre todas las rutas con ese
+    # mínimo de escalas se elige la más barata. Devuelve (escalas, ruta de ids).
+    if source == target:
+        return 0, [source]
+    graphs = (csr, csr.transpose())
+    ws = csr.hop_workspace()
+    stamp = ws.next_stamp()
+    seen, parents = ws.seen, ws.parents
+    frontiers = [np.array([source]), np.array([target])]
+    layers = ([frontiers[0]], [frontiers[1]])
+    for side, root in ((0, source), (1, target)):
+        seen[side, root] = stamp
+        parents[side, root] = -1
+
+    cancel = cancel_event()
+    stats = current_stats()
+    if stats is not None:
+        stats.settled += 2
+    while len(frontiers[0]) and len(frontiers[1]):
+        if cancel is not None and cancel.is_set():
+            raise SearchCancelled
+        sizes = [int((graph.indptr[frontier + 1] - graph.indptr[frontier]).sum())
+                 for graph, frontier in zip(graphs, frontiers)]
+        side = 0 if sizes[0] <= sizes[1] else 1
+        graph, frontier = graphs[side], frontiers[side]
+        if stats is not None:
+            stats.scan(graph, frontier)
+        positions, owners = _out_edges(graph.indptr, frontier)
+        heads = graph.indices[positions]
+        fresh = seen[side, heads] != stamp
+        heads, first = np.unique(heads[fresh], return_index=True)
+        tails = frontier[owners[fresh][first]]
+        seen[side, heads] = stamp
+        parents[side, heads] = tails
+        frontiers[side] = heads
+        layers[side].append(heads)
+        if stats is not None:
+            stats.settled += len(heads)
+
+        meeting = heads[seen[1 - side, heads] == stamp]
+        if len(meeting):
+            stops = len(layers[0]) + len(layers[1]) - 2
+            if cheapest:
+                return stops, _cheapest_layered_path(graphs, layers)
+            if stats is not None:
+                stats.phase("path")
+            node = int(meeting[0])
+            path = [node]
+            while path[-1] != source:
+                path.append(int(parents[0, path[-1]]))
+            path.reverse()
+            while path[-1] != target:
+                path.append(int(parents[1, path[-1]]))
+            return stops, path
+    return INF, None
+
+
+def _cheapest_layered_path(graphs, layers):
+    # Programación dinámica por niveles sobre las capas de ambos BFS: costo
+    # mínimo a cada nodo de la capa i usando solo aristas desde la capa i-1.
+    # Las capas finales de los dos lados se cruzan en los nodos de encuentro.
+    best = []
+    for graph, side_layers in zip(graphs, layers):
+        costs = [np.zeros(1)]
+        choices = [np.zeros(1, dtype=np.int64)]
+        for previous, layer in zip(side_layers, side_layers[1:]):
+            positions, owners = _out_edges(graph.indptr, previous)
+            heads = graph.indices[positions]
+            slot = np.searchsorted(layer, heads)
+            inside = (slot < len(layer)) & (layer[np.minimum(slot, len(layer) - 1)] == heads)
+            candidates = costs[-1][owners[inside]] + graph.weights[positions[inside]]
+            slot, owners = slot[inside], owners[inside]
+            order = np.lexsort((candidates, slot))
+            first = np.r_[True, slot[order][1:] != slot[order][:-1]]
+            cost = np.full(len(layer), INF)
+            choice = np.zeros(len(layer), dtype=np.int64)
+            cost[slot[order][first]] = candidates[order][first]
+            choice[slot[order][first]] = owners[order][first]
+            costs.append(cost)
+            choices.append(choice)
+        best.append((costs, choices))
+
+    forward_layer, backward_layer = layers[0][-1], layers[1][-1]
+    slot = np.searchsorted(backward_layer, forward_layer)
+    shared = (slot < len(backward_layer)) & (backward_layer[np.minimum(slot, len(backward_layer) - 1)]
+                                             == forward_layer)
+    totals = np.where(shared, best[0][0][-1] + best[1][0][-1][np.minimum(slot, len(backward_layer) - 1)], INF)
+    meeting = int(np.argmin(totals))
+
+    halves = []
+    for (costs, choices), side_layers, index in zip(best, layers, (meeting, int(slot[meeting]))):
+        half = []
+        for level in range(len(side_layers) - 1, -1, -1):
+            half.append(int(side_layers[level][index]))
+            index = choices[level][index]
+        halves.append(half)
+    return halves[0][::-1] + halves[1][1:]
+
+
+def pareto_paths(csr, source, target, max_stops=None):
+    # Frente de Pareto en (costo, escalas) en una sola búsqueda por rondas: la
+    # ronda k relaja de una vez las aristas de los nodos que mejoraron en la
+    # ronda k-1, así que distances[v] es el costo mínimo con a lo sumo k tramos.
+    # Cada vez que mejora el destino hay una ruta no dominada. Una etiqueta que
+    # ya cuesta lo mismo o más que la mejor llegada al destino no puede dar una
+    # ruta nueva (tendría más escalas y no sería más barata), y se poda.
+    # Devuelve [(costo, escalas, ruta de ids)] de la más barata a la más corta.
+    indptr = np.asarray(csr.indptr)
+    indices = np.asarray(csr.indices)
+    weights = np.asarray(csr.weights)
+    limit = max_stops if max_stops is not None else csr.num_nodes - 1
+    distances = np.full(csr.num_nodes, INF)
+    distances[source] = 0
+    frontier = np.array([source], dtype=np.int64)
+    rounds = []  # Por ronda: (nodos mejorados ordenados, su predecesor)
+    front = []
+    cancel = cancel_event()
+
+    for stops in range(1, limit + 1):
+        if cancel is not None and cancel.is_set():
+            raise SearchCancelled
+        edges, owner = _out_edges(indptr, frontier)
+        costs = distances[frontier][owner] + weights[edges]
+        heads = indices[edges]
+        useful = (costs < distances[heads]) & (costs < distances[target])
+        costs, heads, tails = costs[useful], heads[useful], frontier[owner[useful]]
+        if len(heads) == 0:
+            break
+
+        # Quedarse con el candidato más barato de cada nodo
+        order = np.lexsort((costs, heads))
+        heads, costs, tails = heads[order], costs[order], tails[order]
+        first = np.insert(heads[1:] != heads[:-1], 0, True)
+        heads, costs, tails = heads[first], costs[first], tails[first]
+        best = distances[target]
+        distances[heads] = costs
+        rounds.append((heads, tails))
+        if distances[target] < best:
+            front.append((float(distances[target]), stops))
+        frontier = heads[heads != target]
+
+    routes = []
+    for cost, stops in reversed(front):
+        # Recorrer las rondas hacia atrás: el predecesor de un nodo es el de su
+        # última mejora en una ronda <= la actual
+        path = [target]
+        node = target
+        for heads, tails in reversed(rounds[:stops]):
+            position = np.searchsorted(heads, node)
+            if position < len(heads) and heads[position] == node:
+                node = int(tails[position])
+                path.append(node)
+        path.reverse()
+        routes.append((cost, stops, path))
+    return routes
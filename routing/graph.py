@@ -0,0 +1,752 @@
+import threading
+from functools import wraps
+from itertools import islice
+
+import numpy as np
+
+from .airports import AirportIndex
+from .allpairs import RouteTable
+from .batch import route_many
+from .cache import QueryCache
+from .contraction import ContractionHierarchy
+from .csr import CSRGraph
+from .dynamic import edge_weight, repair_tree
+from .engine import (INF, astar, bidirectional_shortest_path, dijkstra, extract_path, min_stops_path, pareto_paths,
+                     path_cost, shortest_path)
+from .ingest import load_route_table
+from .instrumentation import QueryStats, measuring
+from .kshortest import yen_paths
+from .landmarks import LandmarkTable, load_tables, save_tables, view_signature
+from .loaders import read_visa_requirements
+from .reachability import ReachabilityIndex
+from .snapshot import fingerprint, is_current, load_snapshot, read_header, write_snapshot
+from .timetable import MIN_CONNECTION, NEVER, Timetable, departure_profile, earliest_arrival
+
+
+def synchronized(method):
+    # Un hilo a la vez por grafo: las consultas también escriben (caché,
+    # vistas y preprocesos perezosos, arreglos de trabajo de los CSR), así que
+    # se serializan con los cambios. Es reentrante: un método puede llamar a otro.
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+    return locked
+
+
+class Graph:
+    # Grafo no dirigido de vuelos (proyecto.py). Se puede usar desde varios
+    # hilos (ver synchronized); para consultas en paralelo hace falta un grafo
+    # por hilo o proceso, como en service.py.
+    directed = False
+    check_origin_visa = True
+    duplicates = "first"  # Política para tramos repetidos en load_routes (ver ingest.py)
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.graph_dict = {}
+        self.visa_requirements = {}
+        self.num_scales = {}
+        self.version = 0  # Aumenta con cada cambio de aristas o visas
+        self.cache = QueryCache()
+        self._snapshot = None
+        self._frozen = None
+        self._visa_views = None
+        self._hierarchies = {}
+        self.use_hierarchies = False  # Ver prepare_hierarchies()
+        self._landmarks = {}
+        self.use_landmarks = False  # Ver prepare_landmarks()
+        self.landmark_count = 8
+        self.landmark_strategy = "avoid"
+        self._reachability = {}
+        self._reachability_ids = None
+        self.use_reachability = False  # Ver prepare_reachability()
+        self._route_table = None
+        self.use_route_table = False  # Ver prepare_route_table()
+        self.route_table_file = None
+        self.route_table_workers = None
+        self._route_table_lock = threading.Lock()  # Una construcción de la tabla a la vez
+        self.observers = []  # Ver add_observer()
+        self.timetable = None  # Ver load_timetable()
+        self._timetable_views = None
+
+    # Tras load_routes o un snapshot, graph_dict y visa_requirements se
+    # construyen desde los arreglos CSR solo cuando alguien los usa.
+    @property
+    def graph_dict(self):
+        if self._graph_dict is None:
+            self._graph_dict = self._frozen.to_adjacency()
+        return self._graph_dict
+
+    @graph_dict.setter
+    def graph_dict(self, value):
+        self._graph_dict = value
+
+    @property
+    def visa_requirements(self):
+        if self._visa_requirements is None:
+            self._visa_requirements = self._snapshot.visa_requirements()
+        return self._visa_requirements
+
+    @visa_requirements.setter
+    def visa_requirements(self, value):
+        self._visa_requirements = value
+
+    def airports(self):
+        # Códigos de todos los aeropuertos, sin materializar graph_dict
+        return list(self.freeze().codes)
+
+    def airport_index(self, visa_file):
+        # Índice para buscar aeropuertos por código o ciudad (la segunda columna
+        # del archivo de visas); sus ids son los de freeze()
+        names = {code: city for code, city, _ in read_visa_requirements(visa_file)}
+        return AirportIndex(self.freeze().codes, names)
+
+    @synchronized
+    def add_edge(self, origin, destination, weight):
+        if self._graph_dict is None:
+            self.thaw()
+        graph_dict = self._graph_dict
+        if origin not in graph_dict:
+            graph_dict[origin] = []
+        if destination not in graph_dict:
+            graph_dict[destination] = []
+        graph_dict[origin].append((destination, weight))
+        graph_dict[destination].append((origin, weight))  # Agregar la arista en ambas direcciones
+        self.version += 1
+        self._frozen = None
+        self.cache.note_change(self.version, {(origin, destination), (destination, origin)})
+        self.reachability_edge(origin, destination)
+
+    def legs(self, origin, destination):
+        # Sentidos en que existe un tramo: ambos en el grafo no dirigido
+        if self.directed:
+            return [(origin, destination)]
+        return [(origin, destination), (destination, origin)]
+
+    def has_edge(self, origin, destination):
+        if self._frozen is None:
+            return any(node == destination for node, _ in self.graph_dict.get(origin, ()))
+        ids = self._frozen.ids
+        return (origin in ids and destination in ids
+                and edge_weight(self._frozen, ids[origin], ids[destination]) < INF)
+
+    @synchronized
+    def update_edge_weight(self, origin, destination, weight):
+        # Nuevo precio para un tramo existente (y sus vuelos repetidos). Se
+        # cambia en el lugar en graph_dict y en los arreglos CSR de las vistas,
+        # sin reconstruir nada; los árboles del caché se reparan en la próxima
+        # consulta. Las jerarquías de costo se descartan (hasta el próximo
+        # prepare_hierarchies()); las tablas de landmarks siguen siendo cotas
+        # válidas salvo que el precio baje.
+        if not self.has_edge(origin, destination):
+            raise ValueError(f"No existe el tramo {origin} -> {destination}")
+        legs = self.legs(origin, destination)
+        if self._graph_dict is not None:
+            for a, b in legs:
+                self._graph_dict[a] = [(node, weight if node == b else old) for node, old in self._graph_dict[a]]
+        decreased = True
+        if self._frozen is not None:
+            decreased = False
+            ids = self._frozen.ids
+            views = {id(view): view for view in (self._frozen,) + (self._visa_views or ())}
+            for a, b in legs:
+                for view in views.values():
+                    decreased |= any(weight < old for old in view.set_weight(ids[a], ids[b], weight))
+        self.version += 1
+        self.cache.note_change(self.version, set(legs))
+        self._route_table = None  # Las vistas siguen siendo las mismas, pero la tabla ya no vale
+        for has_visa in (False, True):
+            self._hierarchies.pop((has_visa, False), None)
+            if decreased:
+                self._landmarks.pop((has_visa, False), None)
+
+    @synchronized
+    def remove_edge(self, origin, destination):
+        # Quitar un tramo (y sus vuelos repetidos). Los arreglos CSR se rehacen
+        # la próxima vez que se usen, con los mismos ids, y los árboles del
+        # caché se reparan en vez de descartarse.
+        if not self.has_edge(origin, destination):
+            raise ValueError(f"No existe el tramo {origin} -> {destination}")
+        if self._graph_dict is None:
+            self.thaw()
+        legs = self.legs(origin, destination)
+        for a, b in legs:
+            self._graph_dict[a] = [(node, weight) for node, weight in self._graph_dict[a] if node != b]
+        self.version += 1
+        self._frozen = None
+        self._reachability = {}  # Quitar tramos puede separar componentes
+        self.cache.note_change(self.version, set(legs))
+
+    @synchronized
+    def load_routes(self, filename, duplicates=None, progress=None):
+        # Lectura por bloques (routing/ingest.py). Los tramos repetidos del archivo
+        # se resuelven según `duplicates`; las líneas mal formadas se descartan y
+        # se cuentan en las estadísticas que se devuelven.
+        codes, ids, sources, targets, weights, stats = load_route_table(
+            filename, not self.directed, duplicates or self.duplicates, progress)
+        if self.graph_dict_is_empty():
+            # Grafo vacío: construir el CSR directamente, sin pasar por graph_dict
+            if not self.directed:
+                sources, targets = (np.column_stack((sources, targets)).ravel(),
+                                    np.column_stack((targets, sources)).ravel())
+                weights = np.repeat(weights, 2)
+            self._frozen = CSRGraph.from_edges(codes, sources, targets, weights, self.directed, ids)
+            self._graph_dict = None
+            self._visa_views = None
+            self._reachability = {}
+            self.version += 1
+        else:
+            for origin, destination, weight in zip(sources.tolist(), targets.tolist(), weights.tolist()):
+                self.add_edge(codes[origin], codes[destination], weight)
+        return stats
+
+    def graph_dict_is_empty(self):
+        if self._graph_dict is None:
+            return self._frozen.num_nodes == 0
+        return not self._graph_dict
+
+    @synchronized
+    def load_visa_requirements(self, filename):
+        if self._visa_requirements is None:
+            self.thaw()
+        for airport_code, _, visa_required in read_visa_requirements(filename):
+            self.visa_requirements[airport_code] = visa_required
+        self.version += 1
+        self._visa_views = None
+        self._timetable_views = None
+        self._reachability = {}
+
+    @synchronized
+    def set_visa_requirement(self, airport_code, visa_required):
+        if self._visa_requirements is None:
+            self.thaw()
+        self.visa_requirements[airport_code] = visa_required
+        self.version += 1
+        self._visa_views = None
+        self._timetable_views = None
+        self._reachability = {}
+
+    @synchronized
+    def load_network(self, routes_file, visa_file, snapshot_file=None):
+        # Reemplazar el grafo por el snapshot binario de routes_file + visa_file.
+        # Si falta o los archivos fuente cambiaron, se recompila antes de mapearlo.
+        if snapshot_file is None:
+            snapshot_file = self.snapshot_path(routes_file)
+        sources = {"routes": routes_file, "visa": visa_file}
+        header = read_header(snapshot_file)
+        if not is_current(header, sources) or header["directed"] != self.directed:
+            self.compile_snapshot(routes_file, visa_file, snapshot_file)
+            header = read_header(snapshot_file)
+        self.use_snapshot(load_snapshot(snapshot_file, header))
+
+    @classmethod
+    def snapshot_path(cls, routes_file):
+        # Snapshot por omisión de load_network, junto al archivo de rutas
+        return f"{routes_file}.{'directed' if cls.directed else 'undirected'}.snap"
+
+    def compile_snapshot(self, routes_file, visa_file, snapshot_file):
+        # Paso de compilación: leer los .txt una vez y escribir el snapshot
+        sources = {"routes": fingerprint(routes_file), "visa": fingerprint(visa_file)}
+        compiled = type(self)()
+        compiled.load_routes(routes_file)
+        compiled.load_visa_requirements(visa_file)
+        write_snapshot(snapshot_file, compiled.freeze(), compiled.visa_requirements, sources)
+
+    @synchronized
+    def use_snapshot(self, snapshot):
+        self._snapshot = snapshot
+        self._graph_dict = None
+        self._visa_requirements = None
+        self._frozen = snapshot.csr
+        self._visa_views = None
+        self._timetable_views = None
+        self._reachability = {}
+        self.version += 1
+
+    @synchronized
+    def thaw(self):
+        # Pasar a los diccionarios antes de modificar un grafo cargado en arreglos
+        if self._graph_dict is None:
+            self._graph_dict = self._frozen.to_adjacency()
+        if self._visa_requirements is None:
+            self._visa_requirements = self._snapshot.visa_requirements()
+        self._snapshot = None
+
+    def requires_visa(self, node):
+        if self._visa_requirements is None:
+            return self._snapshot.requires_visa(node)
+        return self.visa_requirements.get(node, "") == "Requiere Visa"
+
+    @synchronized
+    def freeze(self):
+        # Convertir graph_dict en la forma CSR inmutable; se rehace tras add_edge
+        if self._frozen is None:
+            self._frozen = CSRGraph.from_adjacency(self.graph_dict, self.directed)
+            self._visa_views = None
+        return self._frozen
+
+    def visa_mask(self):
+        # Arreglo booleano por id: True si el aeropuerto requiere visa
+        if self._visa_requirements is None:
+            return self._snapshot.visa_mask()
+        frozen = self.freeze()
+        mask = np.zeros(frozen.num_nodes, dtype=bool)
+        for node, visa_required in self.visa_requirements.items():
+            if visa_required == "Requiere Visa" and node in frozen.ids:
+                mask[frozen.ids[node]] = True
+        return mask
+
+    @synchronized
+    def view(self, has_visa):
+        # Vista de adyacencia para la consulta: la completa con visa, y sin visa
+        # una con las aristas hacia aeropuertos que requieren visa ya podadas.
+        # Ambas se reconstruyen cuando cambian las aristas o las visas.
+        frozen = self.freeze()
+        if self._visa_views is None:
+            self._visa_views = (frozen.without_targets(self.visa_mask()), frozen)
+        return self._visa_views[bool(has_visa)]
+
+    @synchronized
+    def prepare_hierarchies(self):
+        # Preproceso opcional: una jerarquía de contracción por vista de visa y
+        # criterio (costo o escalas). Desde aquí search() las usa; si el grafo
+        # cambia, las que quedan viejas no se rehacen dentro de una consulta
+        # (puede tardar minutos): search() usa la búsqueda bidireccional o ALT
+        # hasta que se vuelva a llamar a prepare_hierarchies().
+        self.use_hierarchies = True
+        for has_visa in (False, True):
+            for unit_weights in (False, True):
+                self.hierarchy(has_visa, unit_weights)
+
+    @synchronized
+    def hierarchy(self, has_visa, unit_weights=False):
+        view = self.view(has_visa)
+        key = (bool(has_visa), unit_weights)
+        built = self._hierarchies.get(key)
+        if built is None or built[0] is not view:
+            built = (view, ContractionHierarchy.build(view, unit_weights))
+            self._hierarchies[key] = built
+        return built[1]
+
+    def current_hierarchy(self, has_visa, unit_weights=False):
+        # La jerarquía ya construida para la vista actual, o None si falta o quedó vieja
+        built = self._hierarchies.get((bool(has_visa), unit_weights))
+        if built is None or built[0] is not self.view(has_visa):
+            return None
+        return built[1]
+
+    @synchronized
+    def prepare_landmarks(self, count=8, strategy="avoid", filename=None):
+        # Preproceso opcional para A* con landmarks (ALT), por vista de visa y
+        # criterio. Con `filename` (.npz) las tablas que corresponden a las
+        # vistas actuales se leen de ahí; las que faltan se calculan y se guardan.
+        self.use_landmarks = True
+        self.landmark_count = count
+        self.landmark_strategy = strategy
+        saved = load_tables(filename)
+        tables = {}
+        for has_visa in (False, True):
+            for unit_weights in (False, True):
+                name = f"{'visa' if has_visa else 'sin-visa'}-{'escalas' if unit_weights else 'costo'}"
+                view = self.view(has_visa)
+                table = saved.get(name)
+                if table is not None and table.signature == view_signature(view):
+                    self._landmarks[(has_visa, unit_weights)] = (view, table)
+                tables[name] = self.landmark_table(has_visa, unit_weights)
+        if filename and any(tables[name] is not saved.get(name) for name in tables):
+            save_tables(filename, tables)
+
+    @synchronized
+    def landmark_table(self, has_visa, unit_weights=False):
+        view = self.view(has_visa)
+        key = (bool(has_visa), unit_weights)
+        built = self._landmarks.get(key)
+        if built is None or built[0] is not view:
+            built = (view, LandmarkTable.build(view, self.landmark_count, self.landmark_strategy, unit_weights))
+            self._landmarks[key] = built
+        return built[1]
+
+    @synchronized
+    def prepare_reachability(self):
+        # Índice de alcanzabilidad por vista de visa (reachability.py): las
+        # consultas sin ruta se descartan sin buscar. Agregar tramos lo
+        # mantiene; quitar tramos o cambiar visas lo rehace la próxima vez.
+        self.use_reachability = True
+        for has_visa in (False, True):
+            self.reachability(has_visa)
+
+    @synchronized
+    def reachability(self, has_visa):
+        index = self._reachability.get(bool(has_visa))
+        if index is None or index.stale:
+            if not self._reachability:
+                frozen = self.freeze()
+                self._reachability_ids = {code: node for node, code in enumerate(frozen.codes)}
+            index = self._reachability[bool(has_visa)] = ReachabilityIndex.build(self.view(has_visa))
+        return index
+
+    def reachability_edge(self, origin, destination):
+        # Llevar un tramo nuevo a los índices ya construidos. Los ids coinciden
+        # con los del próximo freeze(): los aeropuertos nuevos van al final.
+        if not self._reachability:
+            return
+        ids = self._reachability_ids
+        for code in (origin, destination):
+            if code not in ids:
+                ids[code] = len(ids)
+        for has_visa, index in self._reachability.items():
+            for a, b in self.legs(origin, destination):
+                if has_visa or not self.requires_visa(b):  # La vista sin visa no tiene aristas hacia esos aeropuertos
+                    index.add_edge(ids[a], ids[b])
+
+    def prepare_route_table(self, filename, workers=None, background=False):
+        # Preproceso opcional para redes chicas y medianas: todas las rutas más
+        # baratas de ambas vistas en un archivo mapeable (allpairs.py). Si
+        # `filename` corresponde a las vistas actuales se usa tal cual; si no,
+        # se reconstruye con `workers` procesos. Con `background` se construye
+        # en un hilo aparte (que se devuelve) y se usa cuando termina.
+        with self.lock:
+            self.use_route_table = True
+            self.route_table_file = filename
+            self.route_table_workers = workers
+        if background:
+            thread = threading.Thread(target=self.route_table, daemon=True)
+            thread.start()
+            return thread
+        return self.route_table()
+
+    def route_table(self):
+        # Cargar o reconstruir la tabla de las vistas actuales y dejarla en
+        # uso. El cálculo (minutos en redes de miles de aeropuertos) se hace
+        # sin el candado del grafo, así que las consultas siguen con los
+        # motores de búsqueda; si el grafo cambió mientras tanto, la tabla
+        # nueva se descarta y se devuelve None.
+        with self._route_table_lock:
+            with self.lock:
+                table = self.current_route_table()
+                if table is not None:
+                    return table
+                views, version = (self.view(False), self.view(True)), self.version
+            table = RouteTable.load(self.route_table_file)
+            if table is None or not table.matches(views):
+                table = RouteTable.build(views, self.route_table_file, self.route_table_workers)
+            with self.lock:
+                if self.version != version:
+                    return None
+                self._route_table = (views, table)
+            return table
+
+    def current_route_table(self):
+        # La tabla construida para las vistas actuales, o None. Tras un cambio
+        # en el grafo queda vieja hasta el próximo prepare_route_table().
+        built = self._route_table
+        if built is None or built[0][0] is not self.view(False) or built[0][1] is not self.view(True):
+            return None
+        return built[1]
+
+    @synchronized
+    def load_timetable(self, filename, connections_file=None, min_connection=MIN_CONNECTION, progress=None):
+        # Horario opcional (timetable.py) para earliest_arrival() y
+        # departure_profile(): vuelos con hora de salida y llegada, aparte de
+        # los tramos de caminos.txt. Las visas son las del grafo.
+        self.timetable = Timetable.load(filename, connections_file, min_connection, progress)
+        self._timetable_views = None
+        return self.timetable.stats
+
+    @synchronized
+    def timetable_view(self, has_visa):
+        # Como view(): sin visa, el horario sin los vuelos que llegan a
+        # aeropuertos que la requieren
+        if self.timetable is None:
+            raise ValueError("No hay un horario cargado (load_timetable)")
+        if self._timetable_views is None:
+            codes = self.timetable.codes
+            mask = np.fromiter((self.requires_visa(code) for code in codes), dtype=bool, count=len(codes))
+            self._timetable_views = (self.timetable.without_arrivals(mask), self.timetable)
+        return self._timetable_views[bool(has_visa)]
+
+    def add_observer(self, observer):
+        # observer(QueryStats) se llama tras cada búsqueda con sus contadores y
+        # tiempos por fase (por ejemplo instrumentation.Profiler). Sin
+        # observadores las búsquedas no miden nada.
+        self.observers.append(observer)
+        return observer
+
+    def remove_observer(self, observer):
+        self.observers.remove(observer)
+
+    def visa_rejection(self, start_node, end_node, has_visa):
+        if not has_visa:
+            if self.check_origin_visa and self.requires_visa(start_node):
+                return "El origen requiere visa."
+            if self.requires_visa(end_node):
+                return "El destino requiere visa."
+        return None
+
+    @synchronized
+    def search(self, start_node, end_node, has_visa, unit_weights=False, bidirectional=False, cheapest=False):
+        # Motor común: devuelve (costo, ruta) o (inf, None) si no hay ruta.
+        # Con `cheapest` (solo escalas), la más barata entre las de menos escalas.
+        # Con observadores registrados la consulta se mide (instrumentation.py).
+        if not self.observers:
+            return self._search(start_node, end_node, has_visa, unit_weights, bidirectional, cheapest)
+        stats = QueryStats(start_node, end_node, has_visa, "stops" if unit_weights else "cost")
+        with measuring(stats):
+            result = self._search(start_node, end_node, has_visa, unit_weights, bidirectional, cheapest, stats)
+        stats.stop()
+        stats.found = result[1] is not None
+        if not has_visa and stats.scans:
+            stats.count_visa_skips(self.view(False), self.view(True))
+        for observer in list(self.observers):
+            observer(stats)
+        return result
+
+    def _search(self, start_node, end_node, has_visa, unit_weights, bidirectional, cheapest, stats=None):
+        frozen = self.freeze()
+        source = frozen.ids.get(start_node)
+        target = frozen.ids.get(end_node)
+        if source is None or target is None:
+            return INF, None
+
+        if self.use_reachability and self.reachability(has_visa).reachable(source, target) is False:
+            if stats is not None:
+                stats.engine = "reachability"
+            return INF, None
+
+        view = self.view(has_visa)
+        if stats is not None:
+            stats.phase("search")
+        table = self.current_route_table() if self.use_route_table and not unit_weights else None
+        if unit_weights and cheapest:
+            # Ni las jerarquías ni los árboles guardados conocen este desempate
+            engine = "bfs-cheapest"
+            cost, path = min_stops_path(view, source, target, cheapest=True)
+        elif table is not None:
+            engine = "route-table"
+            cost, path = table.exact_route(view, int(bool(has_visa)), source, target)
+        else:
+            hierarchy = self.current_hierarchy(has_visa, unit_weights) if self.use_hierarchies else None
+            if hierarchy is not None and hierarchy.has_table:
+                engine = "hierarchy"
+                _, path = hierarchy.query(source, target)
+                cost = None if path is None else len(path) - 1 if unit_weights else path_cost(view, path)
+            elif self.use_landmarks:
+                engine = "landmarks"
+                ws = astar(view, source, target, self.landmark_table(has_visa, unit_weights).potential(target),
+                           unit_weights)
+                if stats is not None:
+                    stats.phase("path")
+                cost = ws.distances[target]
+                path = None if cost == INF else extract_path(ws.parents, source, target)
+            else:
+                # Sin jerarquía al día (o sin pedirla): punto a punto, bidireccional si se había pedido jerarquía
+                engine, cost, path = self._tree_or_engine_search(view, source, target, has_visa, unit_weights,
+                                                                 bidirectional or self.use_hierarchies, stats)
+        if stats is not None:
+            stats.engine = engine
+            stats.phase("path")
+        if path is None:
+            return INF, None
+        return cost, [frozen.codes[node] for node in path]
+
+    def _tree_or_engine_search(self, view, source, target, has_visa, unit_weights, bidirectional, stats):
+        # Árbol del caché si lo hay (o si toca construirlo); si no, búsqueda punto a punto
+        tree_key = (source, bool(has_visa), unit_weights)
+        tree = self.cache.tree(tree_key)
+        engine = "tree"
+        if tree is None and self.cache.wants_tree(tree_key):
+            # Segunda consulta desde este origen: guardar el árbol completo
+            engine = "tree-build"
+            tree = self.cache.put_tree(tree_key, dijkstra(view, source, unit_weights=unit_weights))
+        if tree is not None:
+            if stats is not None:
+                stats.phase("path")
+            distances, parents = tree
+            if distances[target] == INF:
+                return engine, INF, None
+            path = extract_path(parents, source, target)
+            cost = int(distances[target]) if unit_weights else float(distances[target])
+            return engine, cost, path
+
+        if unit_weights:
+            engine = "bfs"
+            cost, path = min_stops_path(view, source, target)  # BFS: ya es bidireccional
+        elif bidirectional:
+            engine = "bidirectional"
+            cost, path = bidirectional_shortest_path(view, source, target, unit_weights)
+        else:
+            engine = "dijkstra"
+            cost, path = shortest_path(view, source, target, unit_weights)
+        return engine, cost, path
+
+    @synchronized
+    def cached_search(self, start_node, end_node, has_visa, unit_weights=False, bidirectional=False, cheapest=False):
+        # search() con memoización por (origen, destino, visa, criterio)
+        self.cache.sync(self.version, self.repair_cached_tree)
+        key = (start_node, end_node, bool(has_visa), unit_weights, cheapest)
+        result = self.cache.get(key)
+        if result is None:
+            result = self.search(start_node, end_node, has_visa, unit_weights, bidirectional, cheapest)
+            self.cache.put(key, result)
+        cost, path = result
+        return cost, (list(path) if path is not None else None)
+
+    def repair_cached_tree(self, key, tree, legs):
+        # Ajustar un árbol del caché a los tramos que cambiaron (QueryCache.sync)
+        source, has_visa, unit_weights = key
+        view = self.view(has_visa)
+        distances, parents = tree
+        missing = view.num_nodes - len(distances)
+        if missing:  # Aeropuertos nuevos de add_edge: ids al final, aún sin alcanzar
+            distances = np.concatenate((distances, np.full(missing, INF)))
+            parents = np.concatenate((parents, np.full(missing, -1, dtype=np.int32)))
+        ids = view.ids
+        repair_tree(view, distances, parents, [(ids[a], ids[b]) for a, b in legs if a in ids and b in ids],
+                    unit_weights)
+        return distances, parents
+
+    @synchronized
+    def dijkstra(self, start_node, end_node, has_visa, bidirectional=False):
+        message = self.visa_rejection(start_node, end_node, has_visa)
+        if message:
+            return message, INF, INF
+
+        total_distance, path = self.cached_search(start_node, end_node, has_visa, bidirectional=bidirectional)
+        if path is None:
+            return "No hay ruta disponible", INF, INF
+
+        self.num_scales = {node: i for i, node in enumerate(path)}
+        return path, total_distance, self.num_scales[end_node]
+
+    @synchronized
+    def dijkstra_min_scales(self, start_node, end_node, has_visa, bidirectional=False, cheapest=False):
+        # Con `cheapest`, entre las rutas con menos escalas se devuelve la más barata
+        message = self.visa_rejection(start_node, end_node, has_visa)
+        if message:
+            return message, INF
+
+        num_scales, path = self.cached_search(start_node, end_node, has_visa, unit_weights=True,
+                                              bidirectional=bidirectional, cheapest=cheapest)
+        if path is None:
+            return "No hay ruta disponible", INF
+        return path, num_scales
+
+    @synchronized
+    def pareto_routes(self, start_node, end_node, has_visa, max_stops=None):
+        # Todas las rutas no dominadas en (costo, escalas) en una sola búsqueda:
+        # lista de (ruta, costo, escalas) de la más barata a la de menos escalas
+        message = self.visa_rejection(start_node, end_node, has_visa)
+        if message:
+            return message
+
+        frozen = self.freeze()
+        source = frozen.ids.get(start_node)
+        target = frozen.ids.get(end_node)
+        if source is None or target is None:
+            return "No hay ruta disponible"
+        if source == target:
+            return [([start_node], 0, 0)]  # Como dijkstra(): la ruta de un solo aeropuerto
+        front = pareto_paths(self.view(has_visa), source, target, max_stops)
+        if not front:
+            return "No hay ruta disponible"
+        return [([frozen.codes[node] for node in path], cost, stops) for cost, stops, path in front]
+
+    def iter_routes(self, start_node, end_node, has_visa):
+        # Rutas sin ciclos de la más barata a la más cara, como (ruta, costo,
+        # escalas); se calculan a medida que se piden, así que se puede cortar
+        # en la primera que sirva. No genera nada si la visa lo impide. Cada
+        # paso toma el candado (las búsquedas de desvío usan los arreglos de
+        # trabajo de la vista), pero no se retiene entre una ruta y la otra.
+        with self.lock:
+            if self.visa_rejection(start_node, end_node, has_visa):
+                return
+            frozen = self.freeze()
+            source = frozen.ids.get(start_node)
+            target = frozen.ids.get(end_node)
+            if source is None or target is None:
+                return
+            routes = yen_paths(self.view(has_visa), source, target)
+        while True:
+            with self.lock:
+                route = next(routes, None)
+            if route is None:
+                return
+            cost, path = route
+            yield [frozen.codes[node] for node in path], cost, len(path) - 1
+
+    @synchronized
+    def k_shortest_paths(self, start_node, end_node, k, has_visa):
+        # Las k rutas alternativas más baratas (o el mensaje si no hay ninguna)
+        message = self.visa_rejection(start_node, end_node, has_visa)
+        if message:
+            return message
+        routes = list(islice(self.iter_routes(start_node, end_node, has_visa), k))
+        return routes or "No hay ruta disponible"
+
+    @synchronized
+    def earliest_arrival(self, start_node, end_node, has_visa, departure=0):
+        # Con el horario: los vuelos que llegan antes a end_node saliendo de
+        # start_node desde `departure` (minutos desde la medianoche). Devuelve
+        # (vuelos, llegada, cantidad de vuelos), con cada vuelo como
+        # (origen, destino, salida, llegada, precio), o el mensaje
+        message = self.visa_rejection(start_node, end_node, has_visa)
+        if message:
+            return message, INF, INF
+
+        timetable = self.timetable_view(has_visa)
+        source = timetable.ids.get(start_node)
+        target = timetable.ids.get(end_node)
+        if source is None or target is None:
+            return "No hay ruta disponible", INF, INF
+        arrival, legs = earliest_arrival(timetable, source, target, departure)
+        if legs is None:
+            return "No hay ruta disponible", INF, INF
+        return timetable.flights(legs), arrival, len(legs)
+
+    @synchronized
+    def departure_profile(self, start_node, end_node, has_visa, earliest=0, latest=None):
+        # Con el horario: para cada salida entre `earliest` y `latest` que
+        # llega antes que todas las posteriores, (vuelos, salida, llegada)
+        message = self.visa_rejection(start_node, end_node, has_visa)
+        if message:
+            return message
+
+        timetable = self.timetable_view(has_visa)
+        source = timetable.ids.get(start_node)
+        target = timetable.ids.get(end_node)
+        if source is None or target is None or source == target:
+            return "No hay ruta disponible"
+        front = departure_profile(timetable, source, target, earliest, NEVER if latest is None else latest)
+        if not front:
+            return "No hay ruta disponible"
+        return [(timetable.flights(legs), departure, arrival) for departure, arrival, legs in front]
+
+    def dijkstra_many(self, queries, workers=None):
+        # Lote de consultas (origen, destino, has_visa); genera resultados como dijkstra()
+        return route_many(self, queries, workers=workers)
+
+    def dijkstra_min_scales_many(self, queries, workers=None):
+        return route_many(self, queries, unit_weights=True, workers=workers)
+
+
+class DirectedGraph(Graph):
+    # Grafo dirigido de vuelos (proyecto_dirigido.py); solo se valida la visa del destino
+    directed = True
+    check_origin_visa = False
+    duplicates = "keep"
+
+    @synchronized
+    def add_edge(self, origin, destination, weight):
+        if self._graph_dict is None:
+            self.thaw()
+        graph_dict = self._graph_dict
+        if origin not in graph_dict:
+            graph_dict[origin] = []
+        if destination not in graph_dict:
+            graph_dict[destination] = []
+        graph_dict[origin].append((destination, weight))
+        self.version += 1
+        self._frozen = None
+        self.cache.note_change(self.version, {(origin, destination)})
+        self.reachability_edge(origin, destination)
@@ -0,0 +1,247 @@
+import os
+import time
+
+import numpy as np
+
+# Lectura por bloques de archivos de rutas grandes (formato de caminos.txt).
+# Cada bloque se analiza con operaciones vectorizadas sobre los bytes, los
+# códigos se internan a ids enteros a medida que aparecen y los tramos
+# repetidos se resuelven con claves int64 empaquetadas (origen << 32 | destino).
+
+NEWLINE, COMMA, CR = ord('\n'), ord(','), ord('\r')
+MAX_FIELD = 64  # Campos más largos se consideran líneas mal formadas
+
+# Qué hacer con un tramo repetido: quedarse con el primero, el último, el
+# más barato, o conservarlos todos como aristas paralelas.
+DUPLICATE_POLICIES = ("first", "last", "min", "keep")
+
+
+class LoadStats:
+    # Progreso de una carga; se pasa al callback `progress` después de cada bloque
+    def __init__(self, total_bytes):
+        self.total_bytes = total_bytes
+        self.bytes_read = 0
+        self.lines = 0
+        self.skipped = 0
+        self.duplicates = 0
+        self.edges = 0
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def throughput(self):
+        # Líneas por segundo
+        return self.lines / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self):
+        percent = 100 * self.bytes_read / self.total_bytes if self.total_bytes else 100.0
+        return (f"{percent:5.1f}%  {self.lines} líneas  {self.edges} aristas  "
+                f"{self.duplicates} repetidas  {self.skipped} descartadas  "
+                f"{self.throughput / 1e6:.2f} M líneas/s")
+
+
+def _gather(buf, starts, lengths, width):
+    # Copiar campos de largo variable a un arreglo de bytes de ancho fijo
+    if len(starts) == 0:
+        return np.zeros(0, dtype=f"S{max(width, 1)}")
+    offsets = np.arange(width)
+    index = np.minimum(starts[:, None] + offsets, len(buf) - 1)
+    fields = np.where(offsets < lengths[:, None], buf[index], 0).astype(np.uint8)
+    return fields.view(f"S{width}").ravel()
+
+
+def _to_float(fields):
+    # Conversión vectorizada; si el bloque tiene un peso inválido, se marca como NaN
+    try:
+        return fields.astype(np.float64)
+    except ValueError:
+        values = np.empty(len(fields), dtype=np.float64)
+        for i, field in enumerate(fields.tolist()):
+            try:
+                values[i] = float(field)
+            except ValueError:
+                values[i] = np.nan
+        return values
+
+
+def split_fields(buf, num_fields):
+    # Ubicar los campos de las líneas de un bloque que termina en salto de
+    # línea. Devuelve los inicios y largos de cada campo (uno por fila) de las
+    # líneas con exactamente `num_fields` campos no vacíos de hasta MAX_FIELD
+    # bytes, y la cantidad de líneas no vacías.
+    ends = np.flatnonzero(buf == NEWLINE)
+    starts = np.empty_like(ends)
+    starts[0:1] = 0
+    starts[1:] = ends[:-1] + 1
+    ends = ends - (buf[np.maximum(ends - 1, 0)] == CR) * (ends > starts)
+    nonblank = ends > starts
+    starts, ends = starts[nonblank], ends[nonblank]
+
+    commas = np.flatnonzero(buf == COMMA)
+    first = np.searchsorted(commas, starts)
+    valid = np.searchsorted(commas, ends) - first == num_fields - 1
+    starts, ends, first = starts[valid], ends[valid], first[valid]
+    bounds = np.stack([starts - 1] + [commas[first + k] for k in range(num_fields - 1)] + [ends])
+
+    lengths = bounds[1:] - bounds[:-1] - 1
+    fits = (lengths > 0).all(axis=0) & (lengths <= MAX_FIELD).all(axis=0)
+    return bounds[:-1, fits] + 1, lengths[:, fits], int(nonblank.sum())
+
+
+def field(buf, starts, lengths):
+    # Los valores de un campo como arreglo de bytes de ancho fijo
+    return _gather(buf, starts, lengths, int(lengths.max(initial=1)))
+
+
+def parse_route_chunk(block):
+    # Analizar un bloque que termina en salto de línea. Devuelve los arreglos
+    # (origenes, destinos, pesos), la cantidad de líneas no vacías y la de descartadas.
+    buf = np.frombuffer(block, dtype=np.uint8)
+    starts, lengths, num_lines = split_fields(buf, 3)
+    origins = field(buf, starts[0], lengths[0])
+    destinations = field(buf, starts[1], lengths[1])
+    weights = _to_float(field(buf, starts[2], lengths[2]))
+    parsed = ~np.isnan(weights)
+
+    num_parsed = int(parsed.sum())
+    return origins[parsed], destinations[parsed], weights[parsed], num_lines, num_lines - num_parsed
+
+
+def read_route_chunks(filename, chunk_bytes=1 << 24):
+    # Leer el archivo en bloques que siempre terminan en un salto de línea completo
+    with open(filename, 'rb') as file:
+        pending = b""
+        while True:
+            data = file.read(chunk_bytes)
+            if not data:
+                break
+            data = pending + data
+            cut = data.rfind(b"\n") + 1
+            pending = data[cut:]
+            if cut:
+                yield data[:cut], len(data) - len(pending)
+        if pending:
+            yield pending + b"\n", len(pending)
+
+
+def _dedupe(keys, weights, policy):
+    # Índices (en orden de archivo) de las aristas que sobreviven a la política
+    if policy == "keep" or len(keys) == 0:
+        return np.arange(len(keys))
+    if policy == "min":
+        order = np.lexsort((weights, keys))
+    else:
+        order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    if policy == "last":
+        boundary = np.append(sorted_keys[1:] != sorted_keys[:-1], True)
+    else:
+        boundary = np.insert(sorted_keys[1:] != sorted_keys[:-1], 0, True)
+    return np.sort(order[boundary])
+
+
+class RouteTable:
+    # Tabla de aristas con códigos internados, armada bloque a bloque
+    def __init__(self, undirected, duplicates="first"):
+        if duplicates not in DUPLICATE_POLICIES:
+            raise ValueError(f"Política de duplicados desconocida: {duplicates}")
+        self.undirected = undirected
+        self.duplicates = duplicates
+        self.codes = []
+        self.ids = {}
+        self.known_keys = np.zeros(0, dtype=np.uint64)
+        self.known_ids = np.zeros(0, dtype=np.int64)
+        self.sources = []
+        self.targets = []
+        self.weights = []
+
+    def intern(self, origins, destinations):
+        # Asignar ids en orden de primera aparición (origen antes que destino).
+        # Los códigos de hasta 8 bytes se comparan como enteros uint64; solo
+        # los códigos nuevos pasan por Python para decodificarlos.
+        both = np.column_stack((origins, destinations)).ravel()
+        packed = both.dtype.itemsize <= 8
+        keys = both.astype("S8").view(np.uint64) if packed else both
+        unique, first_seen, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        if packed:
+            unique_ids = self.lookup(unique)
+        else:
+            unique_ids = np.array([self.ids.get(code.decode('utf-8'), -1) for code in unique.tolist()],
+                                  dtype=np.int64)
+
+        new = np.flatnonzero(unique_ids < 0)
+        new = new[np.argsort(first_seen[new], kind='stable')]
+        raw = unique[new].view("S8") if packed else unique[new]
+        for code in raw.tolist():
+            code = code.decode('utf-8')
+            self.ids[code] = len(self.codes)
+            self.codes.append(code)
+        unique_ids[new] = np.arange(len(self.codes) - len(new), len(self.codes))
+        self.remember(raw, unique_ids[new])
+
+        pairs = unique_ids[inverse.ravel()].reshape(-1, 2)
+        return pairs[:, 0], pairs[:, 1]
+
+    def lookup(self, keys):
+        # Ids de códigos empaquetados ya vistos, -1 para los nuevos
+        ids = np.full(len(keys), -1, dtype=np.int64)
+        if len(self.known_keys):
+            position = np.minimum(np.searchsorted(self.known_keys, keys), len(self.known_keys) - 1)
+            found = self.known_keys[position] == keys
+            ids[found] = self.known_ids[position[found]]
+        return ids
+
+    def remember(self, codes, ids):
+        # Agregar los códigos nuevos de hasta 8 bytes a la tabla ordenada de búsqueda
+        short = np.char.str_len(codes) <= 8 if codes.dtype.itemsize > 8 else np.ones(len(codes), dtype=bool)
+        keys = codes[short].astype("S8").view(np.uint64)
+        known_keys = np.concatenate((self.known_keys, keys))
+        order = np.argsort(known_keys, kind='stable')
+        self.known_keys = known_keys[order]
+        self.known_ids = np.concatenate((self.known_ids, ids[short]))[order]
+
+    def keys(self, sources, targets):
+        if self.undirected:
+            sources, targets = np.minimum(sources, targets), np.maximum(sources, targets)
+        return (sources.astype(np.int64) << 32) | targets
+
+    def add_chunk(self, origins, destinations, weights):
+        # Internar el bloque y quitar sus repetidos; devuelve cuántos se descartaron
+        sources, targets = self.intern(origins, destinations)
+        keep = _dedupe(self.keys(sources, targets), weights, self.duplicates)
+        self.sources.append(sources[keep].astype(np.int32))
+        self.targets.append(targets[keep].astype(np.int32))
+        self.weights.append(weights[keep])
+        return len(sources) - len(keep)
+
+    def finish(self):
+        # Unir los bloques y resolver los repetidos entre bloques
+        sources = np.concatenate(self.sources) if self.sources else np.zeros(0, dtype=np.int32)
+        targets = np.concatenate(self.targets) if self.targets else np.zeros(0, dtype=np.int32)
+        weights = np.concatenate(self.weights) if self.weights else np.zeros(0, dtype=np.float64)
+        self.sources, self.targets, self.weights = [], [], []
+        keep = _dedupe(self.keys(sources, targets), weights, self.duplicates)
+        return sources[keep], targets[keep], weights[keep], len(sources) - len(keep)
+
+
+def load_route_table(filename, undirected, duplicates="first", progress=None, chunk_bytes=1 << 24):
+    # Leer un archivo de rutas completo. Devuelve (codes, ids, sources,
+    # targets, weights, stats) con una arista por tramo del archivo.
+    stats = LoadStats(os.path.getsize(filename))
+    table = RouteTable(undirected, duplicates)
+    for block, consumed in read_route_chunks(filename, chunk_bytes):
+        origins, destinations, weights, num_lines, skipped = parse_route_chunk(block)
+        stats.duplicates += table.add_chunk(origins, destinations, weights)
+        stats.bytes_read += consumed
+        stats.lines += num_lines
+        stats.skipped += skipped
+        stats.edges = sum(len(part) for part in table.sources)
+        if progress is not None:
+            progress(stats)
+    sources, targets, weights, duplicates_between = table.finish()
+    stats.duplicates += duplicates_between
+    stats.edges = len(sources)
+    return table.codes, table.ids, sources, targets, weights, stats
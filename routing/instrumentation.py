@@ -0,0 +1,187 @@
+import heapq
+import json
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+import numpy as np
+
+# Instrumentación opcional por consulta. Con observadores registrados en el
+# grafo (Graph.add_observer), cada llamada a search() arma un QueryStats y lo
+# deja activo para el hilo mientras dura: los motores lo leen una vez al
+# empezar y, solo si existe, cuentan montículo (envolviendo heappush/heappop)
+# y nodos recorridos; las aristas relajadas y las que poda la visa se calculan
+# al final con numpy a partir de los nodos recorridos. Sin observadores no se
+# crea nada y los bucles son los mismos de siempre.
+#
+# Cuenta lo que llega a search(): las respuestas del caché de resultados
+# (cached_search) no son búsquedas y no se reportan.
+COUNTERS = ("settled", "relaxed", "pushes", "pops", "visa_skipped")
+PHASES = ("setup", "search", "path")
+
+_state = threading.local()
+
+
+@contextmanager
+def measuring(stats):
+    # Dentro del bloque, los motores de este hilo cuentan en `stats`
+    previous = getattr(_state, "stats", None)
+    _state.stats = stats
+    try:
+        yield stats
+    finally:
+        _state.stats = previous
+
+
+def current_stats():
+    # QueryStats activo en este hilo, o None
+    return getattr(_state, "stats", None)
+
+
+class QueryStats:
+    def __init__(self, start, end, has_visa, criterion):
+        self.start = start
+        self.end = end
+        self.has_visa = bool(has_visa)
+        self.criterion = criterion
+        self.engine = None        # Motor que respondió (ver Graph._search)
+        self.found = False
+        self.settled = 0          # Nodos asentados (o visitados por el BFS)
+        self.relaxed = 0          # Aristas revisadas desde los nodos recorridos
+        self.pushes = 0
+        self.pops = 0
+        self.visa_skipped = 0     # Aristas hacia aeropuertos con visa que la vista podó
+        self.times = dict.fromkeys(PHASES, 0.0)  # Segundos por fase
+        self.scans = []           # (csr, nodos cuyas aristas se recorrieron)
+        self._phase = "setup"
+        self._since = time.perf_counter()
+
+    def phase(self, name):
+        # Cerrar la fase actual y empezar `name`
+        now = time.perf_counter()
+        self.times[self._phase] += now - self._since
+        self._phase, self._since = name, now
+
+    def stop(self):
+        self.phase(self._phase)
+
+    def heap_ops(self):
+        # heappush/heappop que cuentan, para los motores con montículo
+        def push(heap, item):
+            self.pushes += 1
+            heapq.heappush(heap, item)
+
+        def pop(heap):
+            self.pops += 1
+            return heapq.heappop(heap)
+        return push, pop
+
+    def scan(self, csr, nodes):
+        # Los motores reportan los nodos cuyas aristas salientes revisaron
+        nodes = np.asarray(nodes, dtype=np.int64)
+        self.relaxed += int((csr.indptr[nodes + 1] - csr.indptr[nodes]).sum())
+        self.scans.append((csr, nodes))
+
+    def count_visa_skips(self, view, full):
+        # Aristas que la vista sin visa le quitó a los nodos recorridos: grado
+        # en la red completa menos grado en la vista (hacia atrás, sobre los
+        # transpuestos)
+        for csr, nodes in self.scans:
+            if csr is view:
+                original = full
+            elif csr.directed and csr.transpose() is view:
+                original = full.transpose()
+            else:
+                continue
+            if original is not csr:
+                self.visa_skipped += int((original.indptr[nodes + 1] - original.indptr[nodes]).sum()
+                                         - (csr.indptr[nodes + 1] - csr.indptr[nodes]).sum())
+
+    def total(self):
+        return sum(self.times.values())
+
+    def to_dict(self):
+        record = {"start": self.start, "end": self.end, "has_visa": self.has_visa, "criterion": self.criterion,
+                  "engine": self.engine, "found": self.found}
+        record.update((name, getattr(self, name)) for name in COUNTERS)
+        record.update((f"{name}_ms", self.times[name] * 1000) for name in PHASES)
+        record["total_ms"] = self.total() * 1000
+        return record
+
+
+class Histogram:
+    # Histograma por potencias de 2: el balde k cuenta valores en [2^(k-1), 2^k)
+    # (el balde 0 cuenta los ceros). `scale` pasa el valor a la unidad que se
+    # quiere contar, por ejemplo segundos a microsegundos.
+    def __init__(self, scale=1):
+        self.scale = scale
+        self.buckets = Counter()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value):
+        value = value * self.scale
+        self.buckets[int(value).bit_length()] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, fraction):
+        # Cota superior del balde donde cae el percentil pedido
+        if not self.count:
+            return 0
+        rank = fraction * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return 0 if bucket == 0 else 2 ** bucket
+        return 2 ** max(self.buckets)
+
+    def to_dict(self):
+        return {"count": self.count, "mean": self.total / self.count if self.count else 0, "max": self.max,
+                "p50": self.percentile(0.5), "p99": self.percentile(0.99),
+                "buckets": {(0 if bucket == 0 else 2 ** bucket): n for bucket, n in sorted(self.buckets.items())}}
+
+
+class Profiler:
+    # Observador que agrega las consultas en histogramas (contadores y tiempos
+    # por fase en microsegundos, por criterio) y, opcionalmente, escribe cada
+    # una como una línea JSON en `jsonl` (ruta o archivo abierto)
+    def __init__(self, jsonl=None):
+        self.histograms = {}
+        self.engines = Counter()
+        self.queries = 0
+        self._owns_file = isinstance(jsonl, str)
+        self.file = open(jsonl, 'a', encoding='utf-8') if self._owns_file else jsonl
+
+    def __call__(self, stats):
+        self.queries += 1
+        self.engines[stats.engine] += 1
+        histograms = self.histograms.setdefault(stats.criterion, {})
+        for name in COUNTERS:
+            histograms.setdefault(name, Histogram()).add(getattr(stats, name))
+        for name in PHASES:
+            histograms.setdefault(f"{name}_us", Histogram(1e6)).add(stats.times[name])
+        histograms.setdefault("total_us", Histogram(1e6)).add(stats.total())
+        if self.file is not None:
+            self.file.write(json.dumps(stats.to_dict()) + "\n")
+
+    def summary(self):
+        return {"queries": self.queries, "engines": dict(self.engines),
+                "histograms": {criterion: {name: histogram.to_dict() for name, histogram in histograms.items()}
+                               for criterion, histograms in self.histograms.items()}}
+
+    def dump(self, filename):
+        # Resumen de los histogramas como JSON
+        with open(filename, 'w', encoding='utf-8') as file:
+            json.dump(self.summary(), file, indent=2)
+
+    def close(self):
+        if self.file is not None:
+            self.file.flush()
+            if self._owns_file:
+                self.file.close()
+            self.file = None
@@ -0,0 +1,93 @@
+import heapq
+
+from .csr import INF
+from .engine import dijkstra, path_cost
+
+# Rutas alternativas sin ciclos, de la más barata a la más cara (algoritmo de
+# Yen). Todas las búsquedas de desvío ("spur") reutilizan un único árbol de
+# caminos mínimos hacia el destino, calculado una vez sobre el grafo
+# transpuesto: sus distancias son una cota inferior exacta para A*, así que
+# mientras el camino del árbol no esté bloqueado la búsqueda va casi directa.
+
+
+def distances_to(csr, target):
+    # Distancia de cada nodo al destino (árbol inverso), como lista por id
+    return list(dijkstra(csr.transpose(), target).distances)
+
+
+def spur_search(csr, source, target, potential, blocked_nodes=(), blocked_edges=()):
+    # A* desde `source` sin pasar por `blocked_nodes` ni usar las aristas
+    # source -> `blocked_edges`. Devuelve la ruta de ids o None.
+    ws = csr.workspace()
+    distances, parents, settled, touched = ws.distances, ws.parents, ws.settled, ws.touched
+    indptr, indices, weights = csr.indptr, csr.indices, csr.weights
+
+    if potential[source] == INF:
+        return None
+    distances[source] = 0
+    touched.append(source)
+    pq = [(potential[source], source)]
+
+    while pq:
+        _, current_node = heapq.heappop(pq)
+        if settled[current_node]:
+            continue
+        settled[current_node] = 1
+        if current_node == target:
+            path = [target]
+            while path[-1] != source:
+                path.append(parents[path[-1]])
+            path.reverse()
+            return path
+
+        current_distance = distances[current_node]
+        start, stop = indptr[current_node], indptr[current_node + 1]
+        skip = blocked_edges if current_node == source else ()
+        for neighbor, weight in zip(indices[start:stop].tolist(), weights[start:stop].tolist()):
+            if settled[neighbor] or neighbor in blocked_nodes or neighbor in skip:
+                continue
+            remaining = potential[neighbor]
+            if remaining == INF:
+                continue
+            distance = current_distance + weight
+            if distance < distances[neighbor]:
+                if distances[neighbor] == INF:
+                    touched.append(neighbor)
+                distances[neighbor] = distance
+                parents[neighbor] = current_node
+                heapq.heappush(pq, (distance + remaining, neighbor))
+
+    return None
+
+
+def yen_paths(csr, source, target, potential=None):
+    # Generador perezoso de (costo, ruta de ids): cada ruta nueva solo se
+    # calcula cuando se pide la siguiente.
+    if potential is None:
+        potential = distances_to(csr, target)
+    first = spur_search(csr, source, target, potential)
+    if first is None:
+        return
+
+    candidates = [(path_cost(csr, first), first)]
+    seen = {tuple(first)}
+    next_hops = {}  # Prefijo de una ruta aceptada -> nodos que le siguieron
+    while candidates:
+        cost, path = heapq.heappop(candidates)
+        yield cost, path
+        for i in range(len(path) - 1):
+            next_hops.setdefault(tuple(path[:i + 1]), set()).add(path[i + 1])
+
+        # Un desvío por cada nodo de la ruta: misma raíz, pero sin repetir
+        # ninguna arista que ya usaron las rutas aceptadas con esa raíz
+        for i in range(len(path) - 1):
+            root = path[:i + 1]
+            spur = spur_search(csr, path[i], target, potential,
+                               blocked_nodes=set(root[:-1]), blocked_edges=next_hops[tuple(root)])
+            if spur is None:
+                continue
+            candidate = root[:-1] + spur
+            key = tuple(candidate)
+            if key not in seen:
+                seen.add(key)
+                heapq.heappush(candidates, (path_cost(csr, candidate), candidate))
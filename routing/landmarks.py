@@ -0,0 +1,234 @@
+from collections import OrderedDict
+import hashlib
+import os
+import random
+from operator import add
+
+import numpy as np
+
+from .csr import INF
+from .engine import dijkstra
+
+# Cotas inferiores ALT (A*, landmarks y desigualdad triangular). Para cada
+# landmark L se guardan d(L, v) y d(v, L) para todo v; entonces
+#   d(v, t) >= d(L, t) - d(L, v)   y   d(v, t) >= d(v, L) - d(t, L)
+# y el máximo sobre los landmarks es una cota consistente para A*. En una
+# vista no dirigida ambas tablas coinciden y se guarda una sola.
+
+STRATEGIES = ("farthest", "avoid")
+UNREACHABLE = 1e30  # inf en LandmarkTable.rows(); cabe en float32
+CACHED_TARGETS = 8  # Potenciales que se conservan por tabla, por destino
+
+
+def view_signature(csr):
+    # Huella de ids, aristas y pesos: una tabla solo vale para la misma vista
+    digest = hashlib.sha1()
+    digest.update(np.array(list(csr.codes), dtype=str).tobytes())
+    for array in (csr.indptr, csr.indices, csr.weights):
+        digest.update(np.ascontiguousarray(array).tobytes())
+    digest.update(b"directed" if csr.directed else b"undirected")
+    return digest.hexdigest()
+
+
+def _distances(csr, source, unit_weights):
+    ws = dijkstra(csr, source, unit_weights=unit_weights)
+    return np.array(ws.distances, dtype=np.float64), list(ws.parents)
+
+
+def _compact(array):
+    # float32 si todas las distancias se representan exactas (pesos enteros
+    # o con pocos decimales); si no, float64 para no romper las cotas
+    narrow = array.astype(np.float32)
+    return narrow if np.array_equal(narrow, array) else array
+
+
+class LandmarkPotential(dict):
+    # Cota de d(v, target) como potential[v] para engine.astar, calculada solo
+    # para los nodos que la búsqueda toca y memorizada: cada consulta cuesta
+    # O(L) por nodo alcanzado en lugar de O(L·N). Los nodos ya vistos se
+    # leen del diccionario sin pasar por __missing__.
+    def __init__(self, table, target):
+        super().__init__({target: 0.0})
+        self.rows = table.rows()
+        # Fila del destino con los signos opuestos: cota = max(offsets + fila de v)
+        row = self.rows[target].tolist()
+        half = len(row) // 2
+        self.offsets = [-value for value in row[:half]] + [-value for value in row[half:]]
+
+    def __missing__(self, node):
+        bound = max(map(add, self.offsets, self.rows[node].tolist()), default=0.0)
+        bound = INF if bound >= UNREACHABLE / 2 else max(bound, 0.0)
+        self[node] = bound
+        return bound
+
+
+class LandmarkTable:
+    def __init__(self, landmarks, forward, backward, signature):
+        self.landmarks = landmarks  # ids de los landmarks
+        self.forward = forward      # forward[i, v] = d(L_i, v)
+        self.backward = backward    # backward[i, v] = d(v, L_i); None si es igual a forward
+        self.signature = signature
+        self._rows = None
+        self._potentials = OrderedDict()  # destino -> LandmarkPotential, el más reciente al final
+
+    @classmethod
+    def build(cls, csr, count=8, strategy="avoid", unit_weights=False, seed=1):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Estrategia de landmarks desconocida: {strategy}")
+        rng = random.Random(seed)
+        reverse = csr.transpose() if csr.directed else None
+        landmarks, forward, backward = [], [], []
+
+        def add(landmark):
+            landmarks.append(landmark)
+            forward.append(_distances(csr, landmark, unit_weights)[0])
+            if reverse is not None:
+                backward.append(_distances(reverse, landmark, unit_weights)[0])
+
+        attempts = 4 * count  # "avoid" puede caer en un landmark ya elegido; se reintenta
+        while len(landmarks) < min(count, csr.num_nodes) and attempts:
+            attempts -= 1
+            if strategy == "farthest":
+                landmark = cls._farthest(csr, forward, backward, rng, unit_weights)
+            else:
+                landmark = cls._avoid(csr, landmarks, forward, backward, rng, unit_weights)
+            if landmark not in landmarks:
+                add(landmark)
+
+        return cls(np.array(landmarks, dtype=np.int32),
+                   _compact(np.array(forward).reshape(len(landmarks), csr.num_nodes)),
+                   _compact(np.array(backward).reshape(len(landmarks), csr.num_nodes)) if backward else None,
+                   view_signature(csr))
+
+    @staticmethod
+    def _farthest(csr, forward, backward, rng, unit_weights):
+        # El nodo más lejano a todos los landmarks elegidos; los nodos que
+        # ninguno alcanza (otra componente) van primero
+        if not forward:
+            start = rng.randrange(csr.num_nodes)
+            distances = _distances(csr, start, unit_weights)[0]
+            return int(np.argmax(np.where(distances < INF, distances, -1)))
+        nearest = np.min(forward, axis=0)
+        if backward:
+            nearest = np.minimum(nearest, np.min(backward, axis=0))
+        unreached = np.flatnonzero(nearest == INF)
+        if len(unreached):
+            return int(unreached[rng.randrange(len(unreached))])
+        return int(np.argmax(nearest))
+
+    @staticmethod
+    def _avoid(csr, landmarks, forward, backward, rng, unit_weights):
+        # Estrategia "avoid" (Goldberg y Werneck): árbol de caminos mínimos
+        # desde una raíz al azar; cada nodo pesa lo que le falta a la cota
+        # actual, d(r, v) - cota(r, v). Se baja desde la raíz por el subárbol
+        # más pesado que no contenga landmarks, y la hoja es el nuevo landmark.
+        root = rng.randrange(csr.num_nodes)
+        distances, parents = _distances(csr, root, unit_weights)
+        reached = distances < INF
+        bound = np.zeros(csr.num_nodes)
+        if forward:
+            table = LandmarkTable(landmarks, np.array(forward), np.array(backward) if backward else None, "")
+            bound = table.lower_bounds_from(root)
+        weight = np.zeros(csr.num_nodes)
+        weight[reached] = distances[reached] - np.minimum(bound[reached], distances[reached])
+
+        order = np.argsort(-np.where(reached, distances, -1), kind='stable')
+        order = order[reached[order]].tolist()
+        size = weight.tolist()
+        blocked = [False] * csr.num_nodes
+        for landmark in landmarks:
+            blocked[landmark] = True
+        children = [[] for _ in range(csr.num_nodes)]
+        for node in order:  # Hojas primero: cada subárbol se suma antes que su padre
+            parent = parents[node]
+            if parent == -1:
+                continue
+            children[parent].append(node)
+            if blocked[node]:
+                blocked[parent] = True
+            size[parent] += size[node]
+
+        node = root
+        while True:
+            candidates = [child for child in children[node] if not blocked[child]]
+            if not candidates:
+                return node
+            node = max(candidates, key=lambda child: size[child])
+
+    def arrays(self):
+        # Tablas en float64: las restas se hacen sin redondeo aunque se guarden en float32
+        forward = self.forward.astype(np.float64, copy=False)
+        backward = self.backward.astype(np.float64, copy=False) if self.backward is not None else forward
+        return forward, backward
+
+    def rows(self):
+        # Una fila por nodo, [-d(L_i, v)..., d(v, L_i)...], para leer las de un
+        # nodo de una vez; se arma la primera vez que se pide. inf pasa a ser
+        # UNREACHABLE: inf - inf (sin información) queda en 0 en lugar de NaN
+        if self._rows is None:
+            forward, backward = self.arrays()
+            rows = np.concatenate([-forward.T, backward.T], axis=1).astype(self.forward.dtype)
+            rows[rows == INF] = UNREACHABLE
+            rows[rows == -INF] = -UNREACHABLE
+            self._rows = rows
+        return self._rows
+
+    def potential(self, target):
+        # Cotas hacia `target` que se calculan a medida que A* las pide; las de
+        # los últimos destinos se conservan con lo que ya tenían calculado
+        potential = self._potentials.pop(target, None)
+        if potential is None:
+            potential = LandmarkPotential(self, target)
+            if len(self._potentials) >= CACHED_TARGETS:
+                self._potentials.popitem(last=False)
+        self._potentials[target] = potential
+        return potential
+
+    def lower_bounds(self, target):
+        # Cota de d(v, target) para todo v, como lista (inf: v no llega al destino).
+        # inf - inf da NaN (sin información), que fmax descarta.
+        forward, backward = self.arrays()
+        with np.errstate(invalid='ignore'):
+            bounds = np.fmax(forward[:, target, None] - forward, backward - backward[:, target, None])
+            bounds = np.fmax.reduce(bounds, axis=0, initial=0.0)
+        bounds[target] = 0.0
+        return bounds.tolist()
+
+    def lower_bounds_from(self, source):
+        # Cota de d(source, v) para todo v (la simétrica de lower_bounds)
+        forward, backward = self.arrays()
+        with np.errstate(invalid='ignore'):
+            bounds = np.fmax(forward - forward[:, source, None], backward[:, source, None] - backward)
+            return np.fmax.reduce(bounds, axis=0, initial=0.0)
+
+    def nbytes(self):
+        tables = self.forward.nbytes + (self.backward.nbytes if self.backward is not None else 0)
+        return tables + (self._rows.nbytes if self._rows is not None else 0)
+
+
+def save_tables(filename, tables):
+    # Un solo .npz con las tablas de cada vista: {nombre: LandmarkTable}
+    arrays = {}
+    for name, table in tables.items():
+        arrays[f"{name}.landmarks"] = table.landmarks
+        arrays[f"{name}.forward"] = table.forward
+        if table.backward is not None:
+            arrays[f"{name}.backward"] = table.backward
+        arrays[f"{name}.signature"] = np.array(table.signature)
+    partial = filename + ".tmp.npz"
+    np.savez(partial, **arrays)
+    os.replace(partial, filename)
+
+
+def load_tables(filename):
+    if not filename or not os.path.exists(filename):
+        return {}
+    tables = {}
+    with np.load(filename) as saved:
+        for key in saved.files:
+            name, field = key.rsplit(".", 1)
+            if field == "landmarks":
+                tables[name] = LandmarkTable(saved[key], saved[f"{name}.forward"],
+                                             saved[f"{name}.backward"] if f"{name}.backward" in saved.files else None,
+                                             str(saved[f"{name}.signature"]))
+    return tables
@@ -0,0 +1,17 @@
+def read_routes(filename):
+    # Generar tuplas (origen, destino, peso) a partir de un archivo como caminos.txt
+    with open(filename, 'r') as archivo:
+        for linea in archivo:
+            campos = linea.strip().split(',')
+            if len(campos) != 3:
+                continue  # Línea vacía o mal formada
+            origen, destino, peso = campos
+            yield origen, destino, float(peso)
+
+
+def read_visa_requirements(filename):
+    # Generar tuplas (codigo, ciudad, requisito) a partir de visa_requirements.txt
+    with open(filename, 'r') as file:
+        for line in file:
+            airport_code, city, visa_required = line.strip().split(',')
+            yield airport_code, city, visa_required.strip()
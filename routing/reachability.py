@@ -0,0 +1,168 @@
+import numpy as np
+
+# Índice de alcanzabilidad por vista, para descartar en O(1) las consultas
+# sin ruta antes de buscar. reachable(s, t) devuelve True (seguro hay ruta),
+# False (seguro no la hay) o None (no se sabe: hay que buscar).
+#  - Vista no dirigida: componentes conexas; la respuesta es siempre exacta
+#    y un tramo nuevo une dos componentes.
+#  - Vista dirigida: componentes fuertemente conexas (Tarjan) y, sobre el DAG
+#    de condensación, un orden topológico pi con el mayor pi alcanzable desde
+#    cada componente y el menor pi que la alcanza. Si a llega a b, entonces
+#    pi(a) < pi(b) <= max_reach(a) y min_reached(b) <= pi(a); si alguna falla
+#    no hay ruta. Los tramos agregados después se guardan aparte (`pending`)
+#    y solo se descarta una consulta si ninguna cadena de ellos la conecta.
+MAX_PENDING = 32  # Con más tramos pendientes el índice se reconstruye
+
+
+def _components(csr):
+    # Etiqueta de componente conexa por nodo: enganchar raíces a la etiqueta
+    # menor de cada arista y acortar punteros hasta que nada cambie
+    sources = np.repeat(np.arange(csr.num_nodes), np.diff(csr.indptr))
+    targets = csr.indices.astype(np.int64)
+    labels = np.arange(csr.num_nodes)
+    while True:
+        low, high = labels[sources], labels[targets]
+        differ = low != high
+        if not differ.any():
+            return labels
+        np.minimum.at(labels, np.maximum(low[differ], high[differ]), np.minimum(low[differ], high[differ]))
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+
+
+def _strong_components(csr):
+    # Tarjan iterativo: componente por nodo, numeradas en el orden en que
+    # Tarjan las cierra (los sumideros del DAG de condensación primero)
+    num_nodes = csr.num_nodes
+    indptr, indices = csr.indptr.tolist(), csr.indices.tolist()
+    index = [-1] * num_nodes
+    low = [0] * num_nodes
+    component = [-1] * num_nodes
+    stack = []
+    counter = 0
+    count = 0
+    for root in range(num_nodes):
+        if index[root] != -1:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        work = [(root, indptr[root])]
+        while work:
+            node, edge = work[-1]
+            if edge < indptr[node + 1]:
+                work[-1] = (node, edge + 1)
+                neighbor = indices[edge]
+                if index[neighbor] == -1:
+                    index[neighbor] = low[neighbor] = counter
+                    counter += 1
+                    stack.append(neighbor)
+                    work.append((neighbor, indptr[neighbor]))
+                elif component[neighbor] == -1 and index[neighbor] < low[node]:
+                    low[node] = index[neighbor]
+                continue
+            work.pop()
+            if work and low[node] < low[work[-1][0]]:
+                low[work[-1][0]] = low[node]
+            if low[node] == index[node]:
+                while True:
+                    member = stack.pop()
+                    component[member] = count
+                    if member == node:
+                        break
+                count += 1
+    return np.array(component, dtype=np.int64), count
+
+
+class ReachabilityIndex:
+    def __init__(self, directed, component, order=None, max_reach=None, min_reached=None):
+        self.directed = directed
+        self.component = component      # componente por nodo
+        self.order = order                # pi por componente (solo dirigido)
+        self.max_reach = max_reach
+        self.min_reached = min_reached
+        self.num_nodes = len(component)
+        self.pending = []                 # tramos (u, v) agregados después de construir
+        self.stale = False
+
+    @classmethod
+    def build(cls, csr):
+        if not csr.directed:
+            return cls(False, _components(csr))
+        component, count = _strong_components(csr)
+        order = count - 1 - np.arange(count)  # Tarjan cierra los sumideros primero
+        sources = np.repeat(np.arange(csr.num_nodes), np.diff(csr.indptr))
+        edges = np.unique(np.column_stack((component[sources], component[csr.indices])), axis=0)
+        edges = edges[edges[:, 0] != edges[:, 1]]
+
+        # Aristas del DAG de a -> b con b cerrada antes que a: en orden de
+        # cierre cada máximo ya está listo, y en el inverso cada mínimo
+        max_reach = order.tolist()
+        by_tail = edges[np.argsort(edges[:, 0], kind='stable')].tolist()
+        for a, b in by_tail:
+            if max_reach[b] > max_reach[a]:
+                max_reach[a] = max_reach[b]
+        min_reached = order.tolist()
+        by_head = edges[np.argsort(-edges[:, 1], kind='stable')].tolist()
+        for a, b in by_head:
+            if min_reached[a] < min_reached[b]:
+                min_reached[b] = min_reached[a]
+        return cls(True, component, order, np.array(max_reach), np.array(min_reached))
+
+    def _base(self, source, target):
+        # Respuesta solo con lo que había al construir (y las uniones no dirigidas)
+        if source == target:
+            return True
+        if source >= self.num_nodes or target >= self.num_nodes:
+            return False  # Aeropuerto nuevo: sus tramos están en `pending`
+        a, b = self.component[source], self.component[target]
+        if a == b:
+            return True
+        if not self.directed:
+            return False
+        pa, pb = self.order[a], self.order[b]
+        if pb <= pa or pb > self.max_reach[a] or self.min_reached[b] > pa:
+            return False
+        return None
+
+    def reachable(self, source, target):
+        base = self._base(source, target)
+        if base is not False or not self.pending:
+            return base
+        # ¿Alguna cadena de tramos nuevos que empiece al alcance de `source`
+        # y termine donde `target` sea alcanzable?
+        frontier = [i for i, (u, _) in enumerate(self.pending) if self._base(source, u) is not False]
+        seen = set(frontier)
+        while frontier:
+            _, v = self.pending[frontier.pop()]
+            if self._base(v, target) is not False:
+                return None
+            for j, (u, _) in enumerate(self.pending):
+                if j not in seen and self._base(v, u) is not False:
+                    seen.add(j)
+                    frontier.append(j)
+        return False
+
+    def add_edge(self, u, v):
+        # Mantener el índice al agregar la arista u -> v a la vista
+        if not self.directed:
+            size = max(u, v) + 1
+            if size > self.num_nodes:
+                self.component = np.concatenate((self.component, np.arange(self.num_nodes, size)))
+                self.num_nodes = size
+            a, b = self.component[u], self.component[v]
+            if a != b:
+                self.component[self.component == max(a, b)] = min(a, b)
+            return
+        if self._base(u, v) is True:
+            return  # Ya estaban en la misma componente: no cambia nada
+        self.pending.append((u, v))
+        if len(self.pending) > MAX_PENDING:
+            self.stale = True
+
+    def nbytes(self):
+        arrays = (self.component, self.order, self.max_reach, self.min_reached)
+        return sum(array.nbytes for array in arrays if array is not None)
@@ -0,0 +1,294 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import shutil
+import signal
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from .engine import INF
+from .graph import DirectedGraph, Graph
+from .snapshot import load_snapshot
+
+# Servicio local de rutas por HTTP/JSON. El bucle asyncio solo atiende las
+# conexiones; cada consulta corre en un pool de procesos (o hilos) sobre un
+# snapshot binario de solo lectura que cada trabajador mapea en memoria.
+# Recargar caminos.txt / visa_requirements.txt compila un snapshot nuevo en
+# otro archivo y lo publica de una vez: las consultas en curso terminan sobre
+# el anterior, que se borra cuando ya nadie lo usa.
+#
+#   GET  /route?origin=CCS&destination=AUA&visa=1&criterion=cost|stops
+#   POST /route   {"origin": ..., "destination": ..., "visa": ..., "criterion": ...}
+#   POST /reload  {"routes": "caminos.txt", "visa": "visa_requirements.txt"}
+#   GET  /status
+
+CRITERIA = ("cost", "stops")
+
+_local = threading.local()
+
+
+def _graph(snapshot_file, directed):
+    # Un Graph por hilo o proceso y por snapshot: los arreglos mapeados se
+    # comparten entre todos, los cachés de consultas no. Se conservan los dos
+    # últimos para las consultas que llegan tarde con el snapshot anterior.
+    graphs = getattr(_local, "graphs", None)
+    if graphs is None:
+        graphs = _local.graphs = {}
+    graph = graphs.get(snapshot_file)
+    if graph is None:
+        graph = DirectedGraph() if directed else Graph()
+        graph.use_snapshot(load_snapshot(snapshot_file))
+        if len(graphs) >= 2:
+            graphs.pop(next(iter(graphs)))
+        graphs[snapshot_file] = graph
+    return graph
+
+
+def answer(snapshot_file, directed, origin, destination, has_visa, criterion):
+    # Respuesta JSON de una consulta (se ejecuta en el pool)
+    t0 = time.perf_counter()
+    graph = _graph(snapshot_file, directed)
+    if criterion == "stops":
+        path, stops = graph.dijkstra_min_scales(origin, destination, has_visa)
+        cost = None
+    else:
+        path, cost, stops = graph.dijkstra(origin, destination, has_visa)
+    result = {"origin": origin, "destination": destination, "visa": bool(has_visa), "criterion": criterion}
+    if isinstance(path, str):
+        result["error"] = path
+    else:
+        result.update(path=path, stops=stops)
+        if cost is not None:
+            result["cost"] = cost if cost != INF else None
+    result["elapsed_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+    return result
+
+
+def compile_network(routes_file, visa_file, snapshot_file, directed):
+    graph = DirectedGraph() if directed else Graph()
+    graph.compile_snapshot(routes_file, visa_file, snapshot_file)
+    return snapshot_file
+
+
+class RoutingService:
+    def __init__(self, routes_file, visa_file, directed=False, workers=None, processes=True, snapshot_dir=None):
+        self.directed = directed
+        self.workers = workers or os.cpu_count()
+        self.own_dir = snapshot_dir is None
+        self.snapshot_dir = snapshot_dir or tempfile.mkdtemp(prefix="metrotravel-")
+        if processes:
+            # "spawn": los trabajadores no heredan hilos ni el bucle; leen el snapshot del disco
+            self.pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        else:
+            self.pool = ThreadPoolExecutor(self.workers)
+        self.compiler = ThreadPoolExecutor(1)
+        self.reload_lock = None
+        self.generation = 0  # Snapshots publicados
+        self.compiled = 0
+        self.snapshot_file = None
+        self.sources = None
+        self.in_flight = {}  # snapshot -> consultas en curso
+        self.retired = set()  # snapshots reemplazados que aún tienen consultas en curso
+        self.served = 0
+        self.connections = {}  # tarea -> writer de cada conexión abierta
+        self.started = time.time()
+        self.publish(compile_network(routes_file, visa_file, self.next_snapshot(), directed),
+                     (routes_file, visa_file))
+
+    def next_snapshot(self):
+        self.compiled += 1
+        return os.path.join(self.snapshot_dir, f"red-{self.compiled}.snap")
+
+    def publish(self, snapshot_file, sources):
+        # Cambio atómico: las consultas nuevas ya usan `snapshot_file`
+        previous = self.snapshot_file
+        self.snapshot_file = snapshot_file
+        self.sources = sources
+        self.generation += 1
+        if previous is not None:
+            self.retired.add(previous)
+            self._collect(previous)
+
+    def _collect(self, snapshot_file):
+        if snapshot_file in self.retired and not self.in_flight.get(snapshot_file):
+            self.retired.discard(snapshot_file)
+            self.in_flight.pop(snapshot_file, None)
+            os.remove(snapshot_file)  # Los trabajadores que lo mapearon conservan sus páginas
+
+    async def route(self, origin, destination, has_visa, criterion="cost"):
+        snapshot_file = self.snapshot_file  # La consulta termina sobre este snapshot aunque llegue otro
+        self.in_flight[snapshot_file] = self.in_flight.get(snapshot_file, 0) + 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.pool, answer, snapshot_file, self.directed,
+                                              origin, destination, has_visa, criterion)
+        finally:
+            self.in_flight[snapshot_file] -= 1
+            self.served += 1
+            self._collect(snapshot_file)
+
+    async def reload(self, routes_file, visa_file):
+        # Compilar fuera del bucle; mientras tanto se sigue respondiendo con el snapshot actual
+        if self.reload_lock is None:
+            self.reload_lock = asyncio.Lock()
+        async with self.reload_lock:
+            loop = asyncio.get_running_loop()
+            snapshot_file = await loop.run_in_executor(self.compiler, compile_network, routes_file, visa_file,
+                                                       self.next_snapshot(), self.directed)
+            self.publish(snapshot_file, (routes_file, visa_file))
+        return self.status()
+
+    def status(self):
+        return {"generation": self.generation, "directed": self.directed, "workers": self.workers,
+                "routes": self.sources[0], "visa": self.sources[1], "served": self.served,
+                "in_flight": sum(self.in_flight.values()), "uptime_s": round(time.time() - self.started, 1)}
+
+    async def dispatch(self, method, target, body):
+        # (código HTTP, objeto JSON) para una petición
+        url = urlsplit(target)
+        if url.path == "/route" and method in ("GET", "POST"):
+            if method == "GET":
+                params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            else:
+                params = json.loads(body or b"{}")
+                if not isinstance(params, dict):
+                    return 400, {"error": "El cuerpo de /route debe ser un objeto JSON"}
+            criterion = params.get("criterion", "cost")
+            if not params.get("origin") or not params.get("destination") or criterion not in CRITERIA:
+                return 400, {"error": "Se requieren origin, destination y criterion en "
+                                      f"{'/'.join(CRITERIA)}"}
+            return 200, await self.route(params["origin"], params["destination"],
+                                         parse_flag(params.get("visa", False)), criterion)
+        if url.path == "/reload" and method == "POST":
+            params = json.loads(body or b"{}")
+            if not isinstance(params, dict):
+                return 400, {"error": "El cuerpo de /reload debe ser un objeto JSON"}
+            routes_file = params.get("routes", self.sources[0])
+            visa_file = params.get("visa", self.sources[1])
+            for filename in (routes_file, visa_file):
+                if not isinstance(filename, str) or not os.path.exists(filename):
+                    return 400, {"error": f"No existe {filename}"}
+            return 200, await self.reload(routes_file, visa_file)
+        if url.path == "/status" and method == "GET":
+            return 200, self.status()
+        return 404, {"error": f"No existe {method} {url.path}"}
+
+    async def handle(self, reader, writer):
+        # HTTP/1.1 mínimo con conexiones persistentes
+        self.connections[asyncio.current_task()] = writer
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, _ = request_line.decode('latin-1').split(" ", 2)
+                    headers = {}
+                    while True:
+                        line = await reader.readline()
+                        if line in (b"\r\n", b"\n", b""):
+                            break
+                        name, _, value = line.decode('latin-1').partition(":")
+                        headers[name.strip().lower()] = value.strip()
+                    length = int(headers.get("content-length", 0))
+                    if length < 0:
+                        raise ValueError(f"Content-Length negativo: {length}")
+                except ValueError as error:  # Línea de petición o encabezados mal formados
+                    # No se sabe dónde empieza la próxima petición: responder y cerrar
+                    await self.respond(writer, 400, {"error": f"Petición mal formada: {error}"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                try:
+                    status, payload = await self.dispatch(method, target, body)
+                except ValueError as error:  # JSON mal formado
+                    status, payload = 400, {"error": str(error)}
+                except Exception as error:  # p. ej. una recarga con archivos ilegibles
+                    status, payload = 500, {"error": f"{type(error).__name__}: {error}"}
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self.respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.connections.pop(asyncio.current_task(), None)
+            writer.close()
+
+    async def respond(self, writer, status, payload, keep_alive):
+        encoded = json.dumps(payload).encode('utf-8')
+        writer.write(f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                     f"Content-Type: application/json\r\nContent-Length: {len(encoded)}\r\n"
+                     f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1')
+                     + encoded)
+        await writer.drain()
+
+    async def serve(self, host="127.0.0.1", port=8765, ready=None):
+        # Atender hasta SIGINT/SIGTERM; al salir se cierran las conexiones y se
+        # espera a que terminen las consultas en curso
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, stop.set)
+            except (NotImplementedError, RuntimeError):  # Windows, o fuera del hilo principal
+                pass
+        server = await asyncio.start_server(self.handle, host, port)
+        if ready is not None:
+            ready(server)
+        async with server:
+            await stop.wait()
+            server.close()
+            for writer in self.connections.values():
+                writer.close()
+            if self.connections:
+                await asyncio.wait(list(self.connections), timeout=10)
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+        self.compiler.shutdown()
+        if self.own_dir:
+            shutil.rmtree(self.snapshot_dir, ignore_errors=True)
+
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+
+def parse_flag(value):
+    # "visa" de una consulta (JSON, query string o CSV) como booleano
+    if isinstance(value, str):
+        return value.lower() in ("1", "true", "si", "sí", "yes")
+    return bool(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio local de rutas por HTTP/JSON")
+    parser.add_argument("routes", nargs="?", default="caminos.txt")
+    parser.add_argument("visa", nargs="?", default="visa_requirements.txt")
+    parser.add_argument("--directed", action="store_true", help="grafo dirigido (proyecto_dirigido.py)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--threads", action="store_true", help="pool de hilos en vez de procesos")
+    args = parser.parse_args(argv)
+
+    service = RoutingService(args.routes, args.visa, args.directed, args.workers, not args.threads)
+
+    def ready(server):
+        host, port = server.sockets[0].getsockname()[:2]
+        print(f"Escuchando en http://{host}:{port} ({service.workers} trabajadores)", flush=True)
+
+    try:
+        asyncio.run(service.serve(args.host, args.port, ready))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import hashlib
+import json
+import os
+import struct
+
+import numpy as np
+
+from .csr import CSRGraph
+
+# Archivo binario que se puede mapear en memoria:
+#   MAGIC | versión (uint16) | largo del encabezado (uint32) | encabezado JSON
+#   | arreglos alineados a 64 bytes (codes, indptr, indices, weights, visa)
+# Los códigos van ordenados, de modo que el id de un aeropuerto es su
+# posición y se busca con searchsorted sin construir un diccionario.
+MAGIC = b"MTSNAP"
+VIEWS_MAGIC = b"MTVIEW"  # write_views: las dos vistas de visa, con los ids del grafo
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+_PREFIX = struct.Struct("<6sHI")
+
+
+def fingerprint(filename, with_hash=True):
+    # Identificar una versión de un archivo fuente: mtime, tamaño y sha256
+    stat = os.stat(filename)
+    result = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+    if with_hash:
+        digest = hashlib.sha256()
+        with open(filename, 'rb') as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                digest.update(block)
+        result["sha256"] = digest.hexdigest()
+    return result
+
+
+class SnapshotCodes:
+    # Vista de `codes` sobre el arreglo mapeado: id -> código
+    def __init__(self, array):
+        self.array = array
+
+    def __len__(self):
+        return len(self.array)
+
+    def __getitem__(self, node):
+        return str(self.array[node])
+
+    def __iter__(self):
+        return iter(self.array.tolist())
+
+
+class SnapshotIds:
+    # Vista de `ids` sobre el mismo arreglo ordenado: código -> id
+    def __init__(self, array):
+        self.array = array
+
+    def __len__(self):
+        return len(self.array)
+
+    def get(self, code, default=None):
+        node = int(np.searchsorted(self.array, code))
+        if node < len(self.array) and self.array[node] == code:
+            return node
+        return default
+
+    def __getitem__(self, code):
+        node = self.get(code)
+        if node is None:
+            raise KeyError(code)
+        return node
+
+    def __contains__(self, code):
+        return self.get(code) is not None
+
+    def __iter__(self):
+        return iter(self.array.tolist())
+
+
+class Snapshot:
+    # Grafo congelado leído de un archivo de snapshot; los diccionarios
+    # graph_dict y visa_requirements solo se construyen si alguien los pide.
+    def __init__(self, header, arrays):
+        self.header = header
+        codes = arrays["codes"]
+        self.csr = CSRGraph(SnapshotCodes(codes), arrays["indptr"], arrays["indices"], arrays["weights"],
+                            header["directed"], SnapshotIds(codes))
+        self.visa = arrays["visa"]
+        self.visa_values = header["visa_values"]
+        self.visa_extra = header["visa_extra"]
+
+    def visa_value(self, node):
+        # Requisito de visa del aeropuerto con id `node`, o None si no aparece
+        index = int(self.visa[node])
+        return self.visa_values[index - 1] if index else None
+
+    def requires_visa(self, code):
+        node = self.csr.ids.get(code)
+        value = self.visa_value(node) if node is not None else self.visa_extra.get(code)
+        return value == "Requiere Visa"
+
+    def visa_mask(self):
+        required = np.array([False] + [value == "Requiere Visa" for value in self.visa_values])
+        return required[self.visa]
+
+    def visa_requirements(self):
+        requirements = {}
+        for node, index in enumerate(self.visa.tolist()):
+            if index:
+                requirements[self.csr.codes[node]] = self.visa_values[index - 1]
+        requirements.update(self.visa_extra)
+        return requirements
+
+
+def write_snapshot(filename, frozen, visa_requirements, sources):
+    # Guardar un CSRGraph con los ids reasignados en orden de código
+    codes = np.array(list(frozen.codes), dtype=str)
+    order = np.argsort(codes, kind='stable')
+    rank = np.empty(len(codes), dtype=np.int32)
+    rank[order] = np.arange(len(codes), dtype=np.int32)
+    edge_sources = np.repeat(np.arange(frozen.num_nodes, dtype=np.int32), np.diff(frozen.indptr))
+    relabeled = CSRGraph.from_edges(codes[order], rank[edge_sources], rank[frozen.indices], frozen.weights)
+
+    visa_values = sorted(set(visa_requirements.values()))
+    value_index = {value: i + 1 for i, value in enumerate(visa_values)}
+    visa = np.zeros(len(codes), dtype=np.uint8)
+    visa_extra = {}
+    for code, value in visa_requirements.items():
+        node = frozen.ids.get(code)
+        if node is None:
+            visa_extra[code] = value
+        else:
+            visa[rank[node]] = value_index[value]
+
+    arrays = {"codes": relabeled.codes, "indptr": relabeled.indptr, "indices": relabeled.indices,
+              "weights": relabeled.weights, "visa": visa}
+    header = {"directed": bool(frozen.directed), "sources": sources,
+              "visa_values": visa_values, "visa_extra": visa_extra}
+    _write_arrays(filename, MAGIC, header, arrays)
+
+
+def write_views(filename, views):
+    # Las vistas de visa (sin visa, con visa) con los mismos ids del grafo,
+    # para pasárselas a procesos arrancados con "spawn" sin copiarlas: cada
+    # uno las mapea con load_views y todos leen las mismas páginas. Solo
+    # llevan los arreglos de aristas; los códigos quedan en el proceso que llama.
+    arrays = {}
+    for side, view in enumerate(views):
+        arrays.update({f"{side}.indptr": view.indptr, f"{side}.indices": view.indices,
+                       f"{side}.weights": view.weights})
+    header = {"num_nodes": views[0].num_nodes, "directed": [bool(view.directed) for view in views]}
+    _write_arrays(filename, VIEWS_MAGIC, header, arrays)
+
+
+def load_views(filename):
+    header = read_header(filename, VIEWS_MAGIC)
+    if header is None:
+        raise ValueError(f"{filename} no es un archivo de vistas válido")
+    arrays = _map_arrays(filename, header)
+    nodes = range(header["num_nodes"])  # Solo ids enteros
+    return tuple(CSRGraph(nodes, arrays[f"{side}.indptr"], arrays[f"{side}.indices"], arrays[f"{side}.weights"],
+                          directed, nodes)
+                 for side, directed in enumerate(header["directed"]))
+
+
+def _write_arrays(filename, magic, header, arrays):
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        layout[name] = [offset, array.dtype.str, len(array)]
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+    header = dict(header, arrays=layout)
+    encoded = json.dumps(header).encode('utf-8')
+    data_start = -(-(_PREFIX.size + len(encoded)) // ALIGNMENT) * ALIGNMENT
+
+    # Escribir a un temporal y renombrar, para no dejar un archivo a medias
+    partial = filename + ".tmp"
+    with open(partial, 'wb') as file:
+        file.write(_PREFIX.pack(magic, FORMAT_VERSION, len(encoded)))
+        file.write(encoded)
+        for name, array in arrays.items():
+            file.seek(data_start + layout[name][0])
+            file.write(np.ascontiguousarray(array).tobytes())
+        file.truncate(data_start + offset)
+    os.replace(partial, filename)
+
+
+def _map_arrays(filename, header):
+    # Mapear el archivo en memoria: no se copia ni se recorre ningún arreglo
+    data_start = header["data_start"]
+    buffer = np.memmap(filename, dtype=np.uint8, mode='r')
+    arrays = {}
+    for name, (offset, dtype, count) in header["arrays"].items():
+        dtype = np.dtype(dtype)
+        start = data_start + offset
+        arrays[name] = buffer[start:start + count * dtype.itemsize].view(dtype)
+    return arrays
+
+
+def read_header(filename, expected=MAGIC):
+    # Encabezado del snapshot, o None si el archivo no existe o es de otro formato
+    try:
+        with open(filename, 'rb') as file:
+            magic, version, length = _PREFIX.unpack(file.read(_PREFIX.size))
+            if magic != expected or version != FORMAT_VERSION:
+                return None
+            header = json.loads(file.read(length))
+    except (OSError, struct.error, ValueError):
+        return None
+    header["data_start"] = -(-(_PREFIX.size + length) // ALIGNMENT) * ALIGNMENT
+    return header
+
+
+def load_snapshot(filename, header=None):
+    # Mapear el archivo en memoria: no se copia ni se recorre ningún arreglo
+    if header is None:
+        header = read_header(filename)
+        if header is None:
+            raise ValueError(f"{filename} no es un snapshot válido")
+    return Snapshot(header, _map_arrays(filename, header))
+
+
+def is_current(header, sources):
+    # ¿El snapshot corresponde a los archivos fuente? Primero mtime y tamaño;
+    # si cambiaron, se compara el sha256 (p. ej. tras un checkout que solo toca la fecha).
+    if header is None or set(header["sources"]) != set(sources):
+        return False
+    for name, filename in sources.items():
+        recorded = header["sources"][name]
+        current = fingerprint(filename, with_hash=False)
+        if current["size"] != recorded["size"]:
+            return False
+        if current["mtime_ns"] != recorded["mtime_ns"] and \
+                fingerprint(filename)["sha256"] != recorded["sha256"]:
+            return False
+    return True
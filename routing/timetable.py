@@ -0,0 +1,276 @@
+import os
+
+import numpy as np
+
+from .engine import SearchCancelled, cancel_event
+from .ingest import LoadStats, RouteTable, _gather, _to_float, field, read_route_chunks, split_fields
+
+# Horario opcional: vuelos concretos en vez de un precio fijo por tramo. Cada
+# línea es "origen,destino,salida,llegada,precio" con horas HH:MM contadas
+# desde la medianoche del primer día; una llegada anterior a la salida es del
+# día siguiente, y cualquier hora acepta un sufijo de días (+1, +2, ...).
+# Además de la duración del vuelo, en cada aeropuerto hace falta un tiempo
+# mínimo de conexión entre llegar y volver a salir (MIN_CONNECTION minutos, o
+# el del archivo opcional de conexiones con líneas "codigo,minutos").
+#
+# Las consultas usan el Connection Scan Algorithm: los vuelos ordenados por
+# salida, en arreglos planos, se recorren una sola vez. En vez de uno por uno
+# se recorren por bloques de salidas más cercanas entre sí que el menor
+# (duración + conexión) del horario: dentro de un bloque ningún vuelo puede
+# alimentar a otro, así que cada bloque se resuelve con numpy de una vez.
+MIN_CONNECTION = 30
+NEVER = np.iinfo(np.int64).max // 2  # Hora "infinita": aeropuerto aún no alcanzado
+DAY = 1440
+COLON, PLUS, ZERO = ord(':'), ord('+'), ord('0')
+
+
+def format_time(minutes):
+    # 1805 -> "06:05+1"
+    days, minutes = divmod(int(minutes), DAY)
+    return f"{minutes // 60:02d}:{minutes % 60:02d}" + (f"+{days}" if days else "")
+
+
+def parse_times(buf, starts, lengths):
+    # Horas "HH:MM" o "HH:MM+D" a minutos; -1 si el campo no es una hora
+    chars = _gather(buf, starts, lengths, 7).view(np.uint8).reshape(-1, 7).astype(np.int16)
+    digits = chars - ZERO
+    clock = digits[:, [0, 1, 3, 4]]
+    hours, minutes = digits[:, 0] * 10 + digits[:, 1], digits[:, 3] * 10 + digits[:, 4]
+    suffix = lengths == 7
+    valid = (((lengths == 5) | (suffix & (chars[:, 5] == PLUS) & (digits[:, 6] >= 0) & (digits[:, 6] <= 9)))
+             & (chars[:, 2] == COLON) & (clock >= 0).all(axis=1) & (clock <= 9).all(axis=1)
+             & (hours < 24) & (minutes < 60))
+    return np.where(valid, np.where(suffix, digits[:, 6], 0).astype(np.int64) * DAY + hours * 60 + minutes, -1)
+
+
+def parse_timetable_chunk(block):
+    # Como ingest.parse_route_chunk, para las líneas del horario. Devuelve
+    # (origenes, destinos, salidas, llegadas, precios, líneas, descartadas).
+    buf = np.frombuffer(block, dtype=np.uint8)
+    starts, lengths, num_lines = split_fields(buf, 5)
+    departures = parse_times(buf, starts[2], lengths[2])
+    arrivals = parse_times(buf, starts[3], lengths[3])
+    arrivals += DAY * ((arrivals >= 0) & (arrivals < departures) & (lengths[3] == 5))
+    prices = _to_float(field(buf, starts[4], lengths[4]))
+    parsed = (departures >= 0) & (arrivals > departures) & ~np.isnan(prices)
+    origins = field(buf, starts[0], lengths[0])[parsed]
+    destinations = field(buf, starts[1], lengths[1])[parsed]
+    num_parsed = int(parsed.sum())
+    return (origins, destinations, departures[parsed], arrivals[parsed], prices[parsed], num_lines,
+            num_lines - num_parsed)
+
+
+def read_min_connections(filename):
+    # Generar (codigo, minutos) a partir de un archivo de tiempos de conexión
+    with open(filename, 'r', encoding='utf-8') as file:
+        for line in file:
+            fields = line.strip().split(',')
+            if len(fields) == 2:
+                yield fields[0], int(fields[1])
+
+
+class ScanWorkspace:
+    # Arreglos de una consulta, reutilizados: reset() solo limpia los
+    # aeropuertos que alcanzó la consulta anterior
+    def __init__(self, num_stops):
+        self.ready = np.full(num_stops, NEVER, dtype=np.int64)  # Desde cuándo se puede salir de cada aeropuerto
+        self.via = np.full(num_stops, -1, dtype=np.int64)       # Vuelo con el que se llegó
+        self.touched = []
+
+    def reset(self):
+        if self.touched:
+            touched = np.concatenate(self.touched)
+            self.ready[touched] = NEVER
+            self.via[touched] = -1
+            self.touched = []
+        return self
+
+
+class Timetable:
+    # Vuelos ordenados por salida en arreglos paralelos (ids de aeropuerto
+    # int32, minutos int64, precios float64). `transfer` es el tiempo mínimo
+    # de conexión por aeropuerto y `ready` la hora desde la que se puede tomar
+    # otro vuelo tras cada uno (llegada + conexión en el destino).
+    def __init__(self, codes, ids, transfer, departure_stops, arrival_stops, departures, arrivals, prices):
+        self.codes = codes
+        self.ids = ids
+        self.transfer = transfer
+        self.departure_stops = departure_stops
+        self.arrival_stops = arrival_stops
+        self.departures = departures
+        self.arrivals = arrivals
+        self.prices = prices
+        self.ready = arrivals + transfer[arrival_stops]
+        self.stats = None
+        self._workspace = None
+        self._by_origin = None
+        # Bloques: salidas en [primera + k * window, primera + (k + 1) * window)
+        self.window = max(1, int((self.ready - departures).min(initial=DAY)))
+        first = int(departures[0]) if len(departures) else 0
+        last = int(departures[-1]) if len(departures) else 0
+        grid = first + self.window * np.arange((last - first) // self.window + 2)
+        self.block_starts = np.searchsorted(departures, grid)
+
+    @property
+    def num_stops(self):
+        return len(self.codes)
+
+    @property
+    def num_flights(self):
+        return len(self.departures)
+
+    @classmethod
+    def from_flights(cls, codes, departure_stops, arrival_stops, departures, arrivals, prices,
+                     min_connection=MIN_CONNECTION, min_connections=None, ids=None):
+        # Ordenar los vuelos por salida; min_connections: {codigo: minutos} que
+        # reemplazan a min_connection en esos aeropuertos
+        ids = ids if ids is not None else {code: i for i, code in enumerate(codes)}
+        transfer = np.full(len(codes), min_connection, dtype=np.int64)
+        for code, minutes in (min_connections or {}).items():
+            if code in ids:
+                transfer[ids[code]] = minutes
+        order = np.argsort(departures, kind='stable')
+        return cls(codes, ids, transfer, np.asarray(departure_stops, dtype=np.int32)[order],
+                   np.asarray(arrival_stops, dtype=np.int32)[order], np.asarray(departures, dtype=np.int64)[order],
+                   np.asarray(arrivals, dtype=np.int64)[order], np.asarray(prices, dtype=np.float64)[order])
+
+    @classmethod
+    def load(cls, filename, connections_file=None, min_connection=MIN_CONNECTION, progress=None,
+             chunk_bytes=1 << 24):
+        # Leer un horario completo por bloques, como ingest.load_route_table.
+        # Los vuelos repetidos se conservan: son salidas distintas.
+        stats = LoadStats(os.path.getsize(filename))
+        table = RouteTable(False, "keep")
+        parts = []
+        for block, consumed in read_route_chunks(filename, chunk_bytes):
+            origins, destinations, departures, arrivals, prices, num_lines, skipped = parse_timetable_chunk(block)
+            sources, targets = table.intern(origins, destinations)
+            parts.append((sources, targets, departures, arrivals, prices))
+            stats.bytes_read += consumed
+            stats.lines += num_lines
+            stats.skipped += skipped
+            stats.edges += len(sources)
+            if progress is not None:
+                progress(stats)
+        columns = [np.concatenate(column) for column in zip(*parts)] if parts else [np.zeros(0, dtype=np.int64)] * 5
+        min_connections = dict(read_min_connections(connections_file)) if connections_file else None
+        timetable = cls.from_flights(table.codes, *columns, min_connection, min_connections, table.ids)
+        timetable.stats = stats
+        return timetable
+
+    def without_arrivals(self, mask):
+        # Horario sin los vuelos que llegan a aeropuertos marcados en `mask`
+        # (como CSRGraph.without_targets para la consulta sin visa)
+        keep = ~mask[self.arrival_stops]
+        return Timetable(self.codes, self.ids, self.transfer, self.departure_stops[keep], self.arrival_stops[keep],
+                         self.departures[keep], self.arrivals[keep], self.prices[keep])
+
+    def workspace(self):
+        if self._workspace is None:
+            self._workspace = ScanWorkspace(self.num_stops)
+        return self._workspace.reset()
+
+    def departures_from(self, stop):
+        # Índices de los vuelos que salen de `stop`, en orden de salida
+        if self._by_origin is None:
+            order = np.argsort(self.departure_stops, kind='stable')
+            indptr = np.zeros(self.num_stops + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.departure_stops, minlength=self.num_stops), out=indptr[1:])
+            self._by_origin = (order, indptr)
+        order, indptr = self._by_origin
+        return order[indptr[stop]:indptr[stop + 1]]
+
+    def flights(self, legs):
+        # Vuelos como (origen, destino, salida, llegada, precio)
+        return [(self.codes[self.departure_stops[c]], self.codes[self.arrival_stops[c]], int(self.departures[c]),
+                 int(self.arrivals[c]), float(self.prices[c])) for c in legs]
+
+
+def earliest_arrival(timetable, source, target, departure=0, limit=NEVER, last_departure=NEVER):
+    # Connection Scan desde `departure`: (hora de llegada, índices de los
+    # vuelos) o (NEVER, None). Se deja de recorrer cuando las salidas ya no
+    # pueden llegar antes que la mejor llegada al destino ni que `limit`. Del
+    # origen solo se sale hasta `last_departure`.
+    if source == target:
+        return departure, []
+    ws = timetable.workspace()
+    ready, via = ws.ready, ws.via
+    ready[source] = departure
+    ws.touched.append(np.array([source]))
+    departure_stops, arrival_stops = timetable.departure_stops, timetable.arrival_stops
+    departures, arrivals, ready_after = timetable.departures, timetable.arrivals, timetable.ready
+    block_starts = timetable.block_starts
+    cancel = cancel_event()
+
+    position = int(np.searchsorted(departures, departure))
+    block = int(np.searchsorted(block_starts, position, side='right'))
+    cutoff = int(np.searchsorted(departures, last_departure, side='right'))
+    arrival = NEVER
+    while position < timetable.num_flights and departures[position] < min(arrival, limit):
+        if cancel is not None and cancel.is_set():
+            raise SearchCancelled
+        if position >= cutoff:
+            ready[source] = NEVER  # Ya no quedan salidas permitidas desde el origen
+        end = int(block_starts[block])
+        if position < cutoff < end:
+            end = cutoff  # Partir el bloque en el corte también lo deja sin dependencias
+        else:
+            block += 1
+        usable = np.flatnonzero(departures[position:end] >= ready[departure_stops[position:end]]) + position
+        position = end
+        if not len(usable):
+            continue
+        stops, times = arrival_stops[usable], ready_after[usable]
+        better = times < ready[stops]
+        if not better.any():
+            continue
+        usable, stops, times = usable[better], stops[better], times[better]
+        # Varios vuelos del bloque al mismo aeropuerto: el que deja salir antes
+        order = np.lexsort((times, stops))
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = stops[order[1:]] != stops[order[:-1]]
+        chosen = order[first]
+        ready[stops[chosen]] = times[chosen]
+        via[stops[chosen]] = usable[chosen]
+        ws.touched.append(stops[chosen])
+        if via[target] >= 0:
+            arrival = int(arrivals[via[target]])
+
+    if arrival == NEVER or arrival >= limit:
+        return NEVER, None
+    legs = [int(via[target])]
+    while departure_stops[legs[-1]] != source:
+        legs.append(int(via[departure_stops[legs[-1]]]))
+    legs.reverse()
+    return arrival, legs
+
+
+def departure_profile(timetable, source, target, earliest=0, latest=NEVER):
+    # Todas las salidas que valen la pena entre `earliest` y `latest`: lista de
+    # (salida, llegada, vuelos) sin dominadas (salir antes solo sirve si se
+    # llega antes), ordenada por salida. Una primera búsqueda desde `earliest`
+    # da la llegada más temprana posible y la salida desde la que se logra:
+    # salir antes no sirve. Después se prueban las salidas del origen de la
+    # última a esa, y cada búsqueda se corta en la mejor llegada encontrada
+    # con una salida posterior.
+    if source == target:
+        return []
+    first_arrival, legs = earliest_arrival(timetable, source, target, earliest, NEVER, latest)
+    if legs is None:
+        return []
+    candidates = timetable.departures[timetable.departures_from(source)]
+    candidates = np.unique(candidates[(candidates >= timetable.departures[legs[0]]) & (candidates <= latest)])
+    cancel = cancel_event()
+    front = []
+    best = NEVER
+    for departure in candidates[::-1].tolist():
+        if best == first_arrival:
+            break
+        if cancel is not None and cancel.is_set():
+            raise SearchCancelled
+        arrival, legs = earliest_arrival(timetable, source, target, departure, best, latest)
+        if legs is not None:
+            front.append((int(timetable.departures[legs[0]]), arrival, legs))
+            best = arrival
+    front.reverse()
+    return front
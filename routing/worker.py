@@ -0,0 +1,99 @@
+import threading
+from collections import deque
+
+from .engine import SearchCancelled, cancellation
+
+# Hilo de fondo para las interfaces: ejecuta una tarea a la vez fuera del hilo
+# de la ventana. Una tarea nueva reemplaza a la que esperaba y cancela la que
+# está corriendo (los motores la cortan con SearchCancelled, ver engine.py).
+# Los resultados no se entregan desde el hilo de fondo: la interfaz llama a
+# poll() desde su propio bucle (en Tk, con after()) y recibe solo el de la
+# última tarea pedida; los de tareas reemplazadas se descartan.
+
+
+class Job:
+    def __init__(self, generation, task, callback):
+        self.generation = generation
+        self.task = task
+        self.callback = callback  # callback(resultado, error) en el hilo que llama a poll()
+        self.cancel = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SearchWorker:
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._pending = None   # Próxima tarea (solo la última pedida)
+        self._running = None
+        self._finished = deque()
+        self._thread = None
+        self._closed = False
+        self.generation = 0
+
+    def submit(self, task, callback):
+        # Ejecutar task() en el fondo; devuelve el número de la tarea
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("El hilo de búsqueda ya se cerró")
+            self.generation += 1
+            if self._running is not None:
+                self._running.cancel.set()
+            self._pending = Job(self.generation, task, callback)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="search-worker", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+            return self.generation
+
+    def cancel(self):
+        # Cancelar la tarea en curso y la pendiente, sin entregar resultado
+        with self._condition:
+            self.generation += 1
+            self._pending = None
+            if self._running is not None:
+                self._running.cancel.set()
+
+    def busy(self):
+        with self._condition:
+            return self._pending is not None or self._running is not None
+
+    def poll(self):
+        # Desde el hilo de la interfaz: llamar al callback de la última tarea
+        # si ya terminó. Devuelve True mientras quede trabajo en el fondo.
+        with self._condition:
+            finished = [job for job in self._finished if job.generation == self.generation]
+            self._finished.clear()
+            busy = self._pending is not None or self._running is not None
+        for job in finished:
+            job.callback(job.result, job.error)
+        return busy
+
+    def close(self):
+        with self._condition:
+            self._closed = True
+            self._pending = None
+            if self._running is not None:
+                self._running.cancel.set()
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                job, self._pending = self._pending, None
+                self._running = job
+            try:
+                with cancellation(job.cancel):
+                    job.result = job.task()
+            except SearchCancelled:
+                job = None
+            except Exception as error:
+                job.error = error
+            with self._condition:
+                self._running = None
+                if job is not None and job.generation == self.generation:
+                    self._finished.append(job)